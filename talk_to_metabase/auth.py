@@ -2,13 +2,23 @@
 Authentication module for Metabase API.
 """
 
+import asyncio
+import importlib.util
 import json
 import logging
-from typing import Dict, Optional, Tuple
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import httpx
 
-from .config import MetabaseConfig
+from . import json_backend
+from .circuit import CIRCUIT_OPEN_ERROR, CircuitBreaker, CircuitBreakerRegistry
+from .config import MetabaseConfig, TimeoutProfile
+from .endpoints import METADATA, WRITE, classify_endpoint, endpoint_key
+from .retry import RetryPolicy, parse_retry_after
+from .session_cache import SessionCache
+from .stats import ToolCounters
+from .throttle import Throttle
 
 logger = logging.getLogger(__name__)
 
@@ -20,24 +30,216 @@ class MetabaseAuth:
         """Initialize with Metabase configuration."""
         self.config = config
         self.session_token = config.session_token
-        self.client = httpx.AsyncClient(base_url=config.url, timeout=30.0)
+        self.limits = httpx.Limits(
+            max_connections=config.http_max_connections,
+            max_keepalive_connections=config.http_max_keepalive_connections,
+            keepalive_expiry=config.http_keepalive_expiry,
+        )
+        self.http2 = config.http2 and self._http2_available()
+        self.timeouts = {
+            family: self._build_timeout(profile) for family, profile in config.timeouts.items()
+        }
+        # Login and session validation use the metadata profile
+        self.client = httpx.AsyncClient(
+            base_url=config.url,
+            timeout=self.timeouts.get(METADATA, httpx.Timeout(30.0)),
+            limits=self.limits,
+            http2=self.http2,
+        )
+        if self.uses_api_key:
+            self.client.headers.update({"X-API-Key": config.api_key})
+        self.requests_in_flight = 0
+        self.peak_requests_in_flight = 0
+        self.retry_policy = RetryPolicy(
+            max_attempts=config.retry_max_attempts,
+            backoff_base=config.retry_backoff_base,
+            backoff_max=config.retry_backoff_max,
+            budget=config.retry_budget,
+        )
+        self.retry_stats = ToolCounters()
+        # Priority lanes need a finite capacity; default to the connection pool size
+        max_concurrency = config.max_concurrent_requests
+        if not max_concurrency and any(value > 0 for value in config.lane_reservations.values()):
+            max_concurrency = config.http_max_connections
+        self.throttle = Throttle(
+            max_concurrency=max_concurrency,
+            rate=config.rate_limit,
+            burst=config.rate_limit_burst,
+            family_concurrency=config.family_concurrency_limits,
+            family_rates=config.family_rate_limits,
+            lane_reservations=config.lane_reservations,
+        )
+        self.circuits = CircuitBreakerRegistry(
+            failure_threshold=config.circuit_failure_threshold,
+            reset_timeout=config.circuit_reset_timeout,
+            latency_thresholds=config.circuit_latency_thresholds,
+        )
+        # Monotonic time at which the session token was last known to be valid
+        self.session_validated_at: Optional[float] = None
+        self.validations_skipped = 0
+        self.session_cache: Optional[SessionCache] = None
+        if config.session_cache_enabled and not self.uses_api_key:
+            self.session_cache = SessionCache(config.session_cache_path)
+            if not self.session_token:
+                self._load_cached_session()
+        # Serializes logins so concurrent 401s trigger a single POST api/session
+        self._auth_lock = asyncio.Lock()
+        self.reauthentications_shared = 0
+        # Called with (method, path) after each successful write request
+        self.write_listeners: List[Callable[[str, str], None]] = []
+
+    @property
+    def uses_api_key(self) -> bool:
+        """Whether requests authenticate with an API key instead of a session."""
+        return bool(self.config.api_key)
+
+    @staticmethod
+    def _build_timeout(profile: TimeoutProfile) -> httpx.Timeout:
+        """Convert a configured timeout profile into an httpx timeout."""
+        return httpx.Timeout(
+            connect=profile.connect, read=profile.read, write=profile.read, pool=profile.pool
+        )
+
+    @staticmethod
+    def _http2_available() -> bool:
+        """Check whether the optional h2 package needed for HTTP/2 is installed."""
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            return False
+        return True
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Report connection pool configuration and utilization.
+        
+        Returns:
+            Dictionary with pool limits, in-flight request counts and, when the
+            transport exposes them, open and idle connection counts
+        """
+        max_connections = self.limits.max_connections
+        stats: Dict[str, Any] = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "http2": self.http2,
+            "requests_in_flight": self.requests_in_flight,
+            "peak_requests_in_flight": self.peak_requests_in_flight,
+            "utilization": (
+                round(self.requests_in_flight / max_connections, 3) if max_connections else None
+            ),
+        }
+        
+        # httpcore does not expose pool state publicly, so read it defensively
+        pool = getattr(getattr(self.client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if isinstance(connections, list):
+            stats["open_connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for conn in connections if conn.is_idle())
+        
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Collect client-side counters for diagnostics."""
+        return {
+            "session": {
+                "mode": "api_key" if self.uses_api_key else "session",
+                "validations_skipped": self.validations_skipped,
+                "reauthentications_shared": self.reauthentications_shared,
+            },
+            "pool": self.pool_stats(),
+            "retries_by_tool": self.retry_stats.snapshot(),
+            "circuit_breakers": self.circuits.snapshot(),
+            "throttle": self.throttle.snapshot(),
+        }
+
+    def _load_cached_session(self) -> None:
+        """Reuse a session token persisted by a previous process.
+        
+        The token is not checked here: if it is older than ``session_max_age`` it
+        is validated on first use, otherwise a 401 triggers a fresh login.
+        """
+        cached = self.session_cache.load(self.config.url, self.config.username)
+        if cached is None:
+            return
+        
+        token, created_at = cached
+        self.session_token = token
+        self.config.session_token = token
+        self.client.headers.update({"X-Metabase-Session": token})
+        
+        age = time.time() - created_at
+        if 0 <= age < self.config.session_max_age:
+            self.session_validated_at = time.monotonic() - age
+        logger.info("Loaded cached Metabase session token")
+
+    def is_session_fresh(self) -> bool:
+        """Whether the session token was validated within the configured max age."""
+        if not self.session_token or self.session_validated_at is None:
+            return False
+        return time.monotonic() - self.session_validated_at < self.config.session_max_age
+
+    def mark_session_valid(self) -> None:
+        """Record that the current session token was just accepted by Metabase."""
+        self.session_validated_at = time.monotonic()
+
+    def invalidate_session(self) -> None:
+        """Forget that the current session token was validated."""
+        self.session_validated_at = None
 
     async def ensure_authenticated(self) -> bool:
-        """Ensure we have a valid session token, authenticating if needed."""
+        """Ensure we have a valid session token, authenticating if needed.
+        
+        A token that was validated less than ``session_max_age`` seconds ago is
+        trusted without a round-trip; expiry in between is caught by the 401
+        handling in ``make_request``. In API-key mode there is no session and
+        this returns immediately.
+        """
+        if self.uses_api_key:
+            return True
+        
         if not self.session_token:
-            return await self.authenticate()
+            return await self.reauthenticate(None)
+        
+        if self.is_session_fresh():
+            self.validations_skipped += 1
+            return True
         
         # Test if the token is still valid
         try:
             self.client.headers.update({"X-Metabase-Session": self.session_token})
             response = await self.client.get("api/user/current")
             if response.status_code == 200:
+                self.mark_session_valid()
                 return True
             
             # If not valid, authenticate again
-            return await self.authenticate()
+            return await self.reauthenticate(self.session_token)
         except Exception as e:
             logger.error(f"Error testing authentication: {e}")
+            return await self.reauthenticate(self.session_token)
+
+    async def reauthenticate(self, stale_token: Optional[str]) -> bool:
+        """Replace a rejected session token, sharing one login across callers.
+        
+        Callers pass the token their request was rejected with. The first caller
+        to acquire the lock logs in; callers that were waiting meanwhile find a
+        different token already in place and reuse it instead of logging in again.
+        
+        Args:
+            stale_token: Session token that was rejected (None if there was none)
+            
+        Returns:
+            True if a usable session token is available
+        """
+        if self.uses_api_key:
+            # A rejected API key cannot be refreshed by logging in
+            return False
+        
+        async with self._auth_lock:
+            if self.session_token and self.session_token != stale_token:
+                self.reauthentications_shared += 1
+                return True
+            self.invalidate_session()
             return await self.authenticate()
 
     async def authenticate(self) -> bool:
@@ -67,6 +269,9 @@ class MetabaseAuth:
             # Update the client headers with the new session token
             self.client.headers.update({"X-Metabase-Session": self.session_token})
             self.config.session_token = self.session_token
+            self.mark_session_valid()
+            if self.session_cache:
+                self.session_cache.save(self.config.url, self.config.username, self.session_token)
             return True
         
         except Exception as e:
@@ -77,43 +282,316 @@ class MetabaseAuth:
         """Close the HTTP client."""
         await self.client.aclose()
 
+    def add_write_listener(self, listener: Callable[[str, str], None]) -> None:
+        """
+        Register a callback for successful write requests.
+        
+        Caches of Metabase content use it to drop entries that a write may
+        have changed.
+        
+        Args:
+            listener: Called with the HTTP method and API path of each write
+        """
+        self.write_listeners.append(listener)
+
+    def _notify_write(self, method: str, path: str) -> None:
+        for listener in self.write_listeners:
+            try:
+                listener(method, path.strip("/"))
+            except Exception as e:
+                logger.warning(f"Write listener failed for {method} {path}: {e}")
+
+    async def _send(self, method_func, path: str, family: str, **kwargs) -> Tuple[httpx.Response, float]:
+        """
+        Send a single request within the throttle limits, tracking pool utilization.
+        
+        Returns:
+            Tuple of (response, latency in seconds); the latency excludes the
+            time spent waiting for a throttle slot
+        """
+        async with self.throttle.slot(family):
+            self.requests_in_flight += 1
+            self.peak_requests_in_flight = max(
+                self.peak_requests_in_flight, self.requests_in_flight
+            )
+            started_at = time.monotonic()
+            try:
+                response = await method_func(f"api/{path.lstrip('/')}", **kwargs)
+                return response, time.monotonic() - started_at
+            finally:
+                self.requests_in_flight -= 1
+
+    async def _send_with_retries(
+        self, method: str, method_func, path: str, family: str, **kwargs
+    ) -> Tuple[httpx.Response, float]:
+        """
+        Send a request, retrying transient failures according to the retry policy.
+        
+        Throttled (429) requests and requests that never reached Metabase are
+        retried for any method; gateway errors and broken connections only for
+        idempotent methods. The server's Retry-After header is honored.
+        
+        Returns:
+            Tuple of (response, latency in seconds of the attempt that produced it)
+        """
+        policy = self.retry_policy
+        started_at = time.monotonic()
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            try:
+                response, latency = await self._send(method_func, path, family, **kwargs)
+            except httpx.TransportError as e:
+                if not policy.should_retry_exception(method, e):
+                    raise
+                delay = policy.backoff(attempt)
+                if not policy.allows(attempt, started_at, delay):
+                    self.retry_stats.increment("exhausted")
+                    raise
+                logger.warning(f"{method} {path} failed ({e!r}), retrying in {delay:.2f}s")
+            else:
+                if not policy.should_retry_status(method, response.status_code):
+                    if attempt > 1:
+                        self.retry_stats.increment("recovered")
+                    return response, latency
+                delay = policy.backoff(
+                    attempt, parse_retry_after(response.headers.get("Retry-After"))
+                )
+                if not policy.allows(attempt, started_at, delay):
+                    self.retry_stats.increment("exhausted")
+                    return response, latency
+                logger.warning(
+                    f"{method} {path} returned {response.status_code}, retrying in {delay:.2f}s"
+                )
+            
+            self.retry_stats.increment("retries")
+            await asyncio.sleep(delay)
+
+    def _check_circuit(
+        self, path: str, family: str
+    ) -> Tuple[Optional[CircuitBreaker], Optional[Tuple[Dict[str, Any], int, str]]]:
+        """
+        Look up the circuit breaker of an endpoint and check that it lets a request through.
+        
+        Returns:
+            Tuple of (circuit or None if disabled, make_request-style error tuple if rejected)
+        """
+        if self.config.circuit_failure_threshold <= 0:
+            return None, None
+        
+        circuit_key = endpoint_key(path)
+        circuit = self.circuits.get(circuit_key, family)
+        if circuit.allow():
+            return circuit, None
+        
+        retry_after = round(circuit.retry_after(), 1)
+        message = (
+            f"Metabase endpoint {circuit_key} is failing ({circuit.open_reason}); "
+            f"failing fast, retry in {retry_after}s"
+        )
+        return circuit, ({
+            "error_type": CIRCUIT_OPEN_ERROR,
+            "endpoint": circuit_key,
+            "reason": circuit.open_reason,
+            "retry_after": retry_after,
+        }, 503, message)
+
     async def make_request(
         self, method: str, path: str, **kwargs
     ) -> Tuple[Optional[Dict], int, Optional[str]]:
         """
         Make an authenticated request to the Metabase API.
         
+        Unless the caller passes an explicit ``timeout``, the timeout profile of
+        the request's endpoint family (metadata, search, query or write) is used.
+        Requests to an endpoint whose circuit breaker is open fail fast with a
+        503 and ``error_type`` "circuit_open" in the response data.
+        
         Returns:
             Tuple of (response_data, status_code, error_message)
         """
         if not await self.ensure_authenticated():
             return None, 401, "Authentication failed"
 
+        family = classify_endpoint(method, path)
+        if "timeout" not in kwargs and family in self.timeouts:
+            kwargs["timeout"] = self.timeouts[family]
+
+        circuit, rejection = self._check_circuit(path, family)
+        if rejection:
+            return rejection
+
         try:
             method_func = getattr(self.client, method.lower())
-            response = await method_func(f"api/{path.lstrip('/')}", **kwargs)
+            request_token = self.session_token
+            try:
+                response, latency = await self._send_with_retries(
+                    method, method_func, path, family, **kwargs
+                )
+                
+                if response.status_code == 401:
+                    # Token might have expired, try to authenticate again
+                    if await self.reauthenticate(request_token):
+                        # Retry the request
+                        response, latency = await self._send_with_retries(
+                            method, method_func, path, family, **kwargs
+                        )
+                    else:
+                        if circuit:
+                            circuit.release()
+                        if self.uses_api_key:
+                            return None, 401, "Authentication failed: API key rejected by Metabase"
+                        return None, 401, "Authentication failed"
+            except Exception:
+                if circuit:
+                    circuit.record_failure()
+                raise
+            except BaseException:
+                # A cancelled request says nothing about the endpoint's health,
+                # but a half-open probe must be given back
+                if circuit:
+                    circuit.release()
+                raise
             
-            if response.status_code == 401:
-                # Token might have expired, try to authenticate again
-                if await self.authenticate():
-                    # Retry the request
-                    response = await method_func(f"api/{path.lstrip('/')}", **kwargs)
+            if circuit:
+                if response.status_code >= 500:
+                    circuit.record_failure()
                 else:
-                    return None, 401, "Authentication failed"
+                    circuit.record_success(latency)
             
+            content = response.content
             try:
-                data = response.json() if response.content else None
-                # Debug: Log the JSON structure
-                logger.info(f"API response for {path}: Status {response.status_code}, data structure: {list(data.keys()) if isinstance(data, dict) else type(data)}")
+                data = json_backend.loads(content) if content else None
             except json.JSONDecodeError:
                 data = {"text": response.text}
             
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "API response for %s: status %s, %d bytes, data structure: %s",
+                    path,
+                    response.status_code,
+                    len(content),
+                    list(data.keys()) if isinstance(data, dict) else type(data).__name__,
+                )
+            
+            if response.status_code < 400:
+                self.mark_session_valid()
+            
             if response.status_code >= 400:
                 error_msg = data.get("message", response.text) if data else response.text
                 return data, response.status_code, error_msg
             
+            if family == WRITE:
+                self._notify_write(method.upper(), path)
+            
             return data, response.status_code, None
         
+        except httpx.TimeoutException as e:
+            logger.error(f"Request to {path} timed out ({family} timeout profile): {e!r}")
+            return None, 504, f"Request to {path} timed out ({family} timeout profile)"
         except Exception as e:
             logger.error(f"Request failed: {e}")
             return None, 500, str(e)
+
+    async def stream_request(
+        self, method: str, path: str, sink: Callable[[bytes], None], **kwargs
+    ) -> Tuple[Optional[Dict], int, Optional[str]]:
+        """
+        Make an authenticated request and stream the response body into a sink.
+        
+        The body is passed to ``sink`` chunk by chunk as it arrives, so memory use
+        does not depend on the response size. Timeouts, circuit breakers and
+        throttling apply as in make_request; a 401 re-authenticates and retries
+        once, but other failures are not retried since part of the body may
+        already have been consumed.
+        
+        Args:
+            method: HTTP method
+            path: API path relative to /api/
+            sink: Called with each chunk of the response body
+            
+        Returns:
+            Tuple of ({"bytes": total bytes streamed} or error data, status_code, error_message)
+        """
+        if not await self.ensure_authenticated():
+            return None, 401, "Authentication failed"
+
+        family = classify_endpoint(method, path)
+        if "timeout" not in kwargs and family in self.timeouts:
+            kwargs["timeout"] = self.timeouts[family]
+
+        circuit, rejection = self._check_circuit(path, family)
+        if rejection:
+            return rejection
+
+        try:
+            for attempt in (1, 2):
+                request_token = self.session_token
+                async with self.throttle.slot(family):
+                    self.requests_in_flight += 1
+                    self.peak_requests_in_flight = max(
+                        self.peak_requests_in_flight, self.requests_in_flight
+                    )
+                    started_at = time.monotonic()
+                    try:
+                        async with self.client.stream(
+                            method, f"api/{path.lstrip('/')}", **kwargs
+                        ) as response:
+                            status = response.status_code
+                            if status < 400:
+                                total = 0
+                                async for chunk in response.aiter_bytes():
+                                    sink(chunk)
+                                    total += len(chunk)
+                            elif status != 401 or attempt == 2:
+                                # Error bodies are small; read them for the message
+                                content = await response.aread()
+                                try:
+                                    data = json_backend.loads(content) if content else None
+                                except json.JSONDecodeError:
+                                    data = {"text": response.text}
+                                error_msg = (
+                                    data.get("message", response.text)
+                                    if isinstance(data, dict) else response.text
+                                )
+                    finally:
+                        self.requests_in_flight -= 1
+                    latency = time.monotonic() - started_at
+
+                if status == 401 and attempt == 1:
+                    if await self.reauthenticate(request_token):
+                        continue
+                    if circuit:
+                        circuit.release()
+                    if self.uses_api_key:
+                        return None, 401, "Authentication failed: API key rejected by Metabase"
+                    return None, 401, "Authentication failed"
+                break
+        except httpx.TimeoutException as e:
+            if circuit:
+                circuit.record_failure()
+            logger.error(f"Streaming request to {path} timed out ({family} timeout profile): {e!r}")
+            return None, 504, f"Request to {path} timed out ({family} timeout profile)"
+        except Exception as e:
+            if circuit:
+                circuit.record_failure()
+            logger.error(f"Streaming request failed: {e}")
+            return None, 500, str(e)
+        except BaseException:
+            # Give back a half-open probe that was cancelled
+            if circuit:
+                circuit.release()
+            raise
+
+        if circuit:
+            if status >= 500:
+                circuit.record_failure()
+            else:
+                circuit.record_success(latency)
+
+        if status >= 400:
+            return data, status, error_msg
+
+        self.mark_session_valid()
+        return {"bytes": total}, status, None
@@ -0,0 +1,208 @@
+"""
+Circuit breakers that fail fast while a Metabase endpoint is degraded.
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+CIRCUIT_OPEN_ERROR = "circuit_open"
+
+
+class CircuitOpenError(ValueError):
+    """Raised when a request was rejected because its endpoint's circuit is open."""
+
+    def __init__(self, message: str, details: Dict[str, Any]):
+        """
+        Initialize the error.
+        
+        Args:
+            message: Error message
+            details: Rejection data (endpoint, reason and retry_after)
+        """
+        super().__init__(message)
+        self.details = details
+
+
+def circuit_rejection(data: Any) -> Optional[Dict[str, Any]]:
+    """Return the rejection details if response data is a circuit breaker rejection, else None."""
+    if isinstance(data, dict) and data.get("error_type") == CIRCUIT_OPEN_ERROR:
+        return data
+    return None
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one endpoint.
+    
+    The circuit opens after ``failure_threshold`` consecutive failures, or when
+    the configured percentile of recent latencies exceeds ``latency_threshold``.
+    Once ``reset_timeout`` seconds have passed, a single probe request is let
+    through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        latency_threshold: Optional[float] = None,
+        latency_percentile: float = 0.95,
+        latency_window: int = 50,
+        latency_min_samples: int = 20,
+    ):
+        """
+        Initialize a closed circuit.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds to stay open before probing
+            latency_threshold: Latency in seconds that opens the circuit (None disables)
+            latency_percentile: Percentile of recent latencies compared to the threshold
+            latency_window: Number of recent latencies kept
+            latency_min_samples: Samples required before latency can open the circuit
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_threshold = latency_threshold
+        self.latency_percentile = latency_percentile
+        self.latency_min_samples = latency_min_samples
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+        
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.open_reason: Optional[str] = None
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; rejected requests are counted."""
+        if self.state == OPEN and self.retry_after() == 0:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+        
+        if self.state == CLOSED:
+            return True
+        
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        
+        self.rejected += 1
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until the open circuit lets a probe request through."""
+        if self.state != OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful request and its latency."""
+        self.consecutive_failures = 0
+        if self.state == HALF_OPEN:
+            self._close()
+            return
+        
+        self.latencies.append(latency)
+        percentile = self.latency_at_percentile()
+        if (
+            self.latency_threshold
+            and len(self.latencies) >= self.latency_min_samples
+            and percentile is not None
+            and percentile > self.latency_threshold
+        ):
+            self._open(f"p{int(self.latency_percentile * 100)} latency {percentile:.1f}s")
+
+    def record_failure(self) -> None:
+        """Record a failed request."""
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            self._open("probe request failed")
+        elif self.consecutive_failures >= self.failure_threshold:
+            self._open(f"{self.consecutive_failures} consecutive failures")
+
+    def release(self) -> None:
+        """Give up a half-open probe without recording an outcome."""
+        self.probe_in_flight = False
+
+    def latency_at_percentile(self) -> Optional[float]:
+        """Latency at the configured percentile of the recent window."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(self.latency_percentile * len(ordered)))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe the circuit state for diagnostics."""
+        return {
+            "state": self.state,
+            "open_reason": self.open_reason,
+            "retry_after": round(self.retry_after(), 1),
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+    def _open(self, reason: str) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.open_reason = reason
+        self.probe_in_flight = False
+        self.times_opened += 1
+        # Latencies from before the incident must not reopen the circuit after a probe
+        self.latencies.clear()
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self.opened_at = None
+        self.open_reason = None
+        self.probe_in_flight = False
+        self.consecutive_failures = 0
+        self.latencies.clear()
+
+
+class CircuitBreakerRegistry:
+    """Circuit breakers created on demand, one per endpoint key."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        latency_thresholds: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Initialize the registry.
+        
+        Args:
+            failure_threshold: Consecutive failures that open a circuit
+            reset_timeout: Seconds a circuit stays open before probing
+            latency_thresholds: Latency threshold in seconds per endpoint family
+                (missing or 0 disables latency-based opening for that family)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_thresholds = latency_thresholds or {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str, family: str) -> CircuitBreaker:
+        """Get the circuit breaker for an endpoint key, creating it if needed."""
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=self.failure_threshold,
+                reset_timeout=self.reset_timeout,
+                latency_threshold=self.latency_thresholds.get(family) or None,
+            )
+            self.breakers[key] = breaker
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Describe every circuit that has seen traffic."""
+        return {key: breaker.snapshot() for key, breaker in self.breakers.items()}
@@ -4,13 +4,23 @@ Metabase API client.
 
 import json
 import logging
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from .auth import MetabaseAuth
+from .circuit import CircuitOpenError, circuit_rejection
+from .query_cache import QueryCache, query_cache_key
 
 logger = logging.getLogger(__name__)
 
 
+def _request_error(data: Any, message: str) -> ValueError:
+    """Build the error raised for a failed request, keeping circuit breaker rejections typed."""
+    details = circuit_rejection(data)
+    if details is not None:
+        return CircuitOpenError(message, details)
+    return ValueError(message)
+
+
 class MetabaseClient:
     """Client for the Metabase API."""
 
@@ -34,7 +44,7 @@ class MetabaseClient:
         )
         
         if error:
-            raise ValueError(f"Failed to get {resource_type}/{resource_id}: {error}")
+            raise _request_error(data, f"Failed to get {resource_type}/{resource_id}: {error}")
         
         return data
 
@@ -56,7 +66,7 @@ class MetabaseClient:
         )
         
         if error:
-            raise ValueError(f"Failed to create {resource_type}: {error}")
+            raise _request_error(data, f"Failed to create {resource_type}: {error}")
         
         return data
 
@@ -79,7 +89,7 @@ class MetabaseClient:
         )
         
         if error:
-            raise ValueError(f"Failed to update {resource_type}/{resource_id}: {error}")
+            raise _request_error(data, f"Failed to update {resource_type}/{resource_id}: {error}")
         
         return data
 
@@ -101,7 +111,7 @@ class MetabaseClient:
         )
         
         if error:
-            raise ValueError(f"Failed to delete {resource_type}/{resource_id}: {error}")
+            raise _request_error(data, f"Failed to delete {resource_type}/{resource_id}: {error}")
         
         return data
 
@@ -125,6 +135,7 @@ class MetabaseClient:
         model_ancestors: bool = False,
         page: int = 1,
         page_size: int = 20,
+        result_cache: Optional[QueryCache] = None,
     ) -> Dict[str, Any]:
         """
         Search for resources across Metabase with pagination.
@@ -149,6 +160,8 @@ class MetabaseClient:
             model_ancestors: Include model ancestors
             page: Page number for pagination (default: 1)
             page_size: Number of results per page (default: 20)
+            result_cache: Cache for full result lists of searches that Metabase
+                cannot paginate, so their later pages are served from memory
             
         Returns:
             Dict containing paginated search results and pagination metadata
@@ -205,28 +218,57 @@ class MetabaseClient:
         if model_ancestors:
             params["model_ancestors"] = "true"
         
+        offset = (page - 1) * page_size
+        
+        # Full result lists are cached under the filters, whatever the page
+        cache_key = query_cache_key(params) if result_cache is not None else None
+        cached = result_cache.get(cache_key) if cache_key and result_cache.enabled else None
+        if cached is not None:
+            all_results, _ = cached
+            total_count = len(all_results)
+            total_pages = (total_count + page_size - 1) // page_size if total_count > 0 else 1
+            return {
+                "results": all_results[offset:offset + page_size],
+                "pagination": {
+                    "page": page,
+                    "page_size": page_size,
+                    "total_count": total_count,
+                    "total_pages": total_pages,
+                    "has_more": page < total_pages,
+                    "server_side": False,
+                    "cached": True
+                }
+            }
+        
+        # Let Metabase paginate so that only the requested page is transferred
+        params["limit"] = str(page_size)
+        params["offset"] = str(offset)
+        
         data, status, error = await self.auth.make_request(
             "GET", "search", params=params
         )
         
         if error:
-            raise ValueError(f"Search failed: {error}")
+            raise _request_error(data, f"Search failed: {error}")
         
-        # Get all results first
-        all_results = []
+        results = []
         if isinstance(data, dict) and 'data' in data:
-            all_results = data['data'] if isinstance(data['data'], list) else []
+            results = data['data'] if isinstance(data['data'], list) else []
         elif isinstance(data, list):
-            all_results = data
+            results = data
         
-        # Calculate pagination metadata
-        total_count = len(all_results)
-        total_pages = (total_count + page_size - 1) // page_size if total_count > 0 else 1
-        start_idx = (page - 1) * page_size
-        end_idx = min(start_idx + page_size, total_count)
+        server_side = isinstance(data, dict) and isinstance(data.get("total"), int) and len(results) <= page_size
+        if server_side:
+            total_count = data["total"]
+            paginated_results = results if offset < total_count else []
+        else:
+            # Metabase versions without limit/offset support return every result
+            total_count = len(results)
+            paginated_results = results[offset:offset + page_size]
+            if cache_key and result_cache.enabled:
+                result_cache.put(cache_key, results)
         
-        # Slice the results for the requested page
-        paginated_results = all_results[start_idx:end_idx] if start_idx < total_count else []
+        total_pages = (total_count + page_size - 1) // page_size if total_count > 0 else 1
         
         # Return results with pagination metadata
         return {
@@ -236,7 +278,8 @@ class MetabaseClient:
                 "page_size": page_size,
                 "total_count": total_count,
                 "total_pages": total_pages,
-                "has_more": page < total_pages
+                "has_more": page < total_pages,
+                "server_side": server_side
             }
         }
 
@@ -258,6 +301,63 @@ class MetabaseClient:
         )
         
         if error:
-            raise ValueError(f"Query execution failed: {error}")
+            raise _request_error(data, f"Query execution failed: {error}")
         
         return data
+
+    async def export_card(
+        self,
+        card_id: int,
+        export_format: str,
+        sink: Callable[[bytes], None],
+        parameters: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Stream a card's full result through Metabase's export endpoint.
+        
+        Args:
+            card_id: ID of the card
+            export_format: "csv" or "json"
+            sink: Called with each chunk of the exported file
+            parameters: Parameter values to apply
+            
+        Returns:
+            Transfer details ({"bytes": ...})
+        """
+        form = {"parameters": json.dumps(parameters or [])}
+        data, status, error = await self.auth.stream_request(
+            "POST", f"card/{card_id}/query/{export_format}", sink, data=form
+        )
+        
+        if error:
+            raise _request_error(data, f"Failed to export card {card_id}: {error}")
+        
+        return data
+
+    async def export_dataset(
+        self,
+        query_data: Dict[str, Any],
+        export_format: str,
+        sink: Callable[[bytes], None],
+    ) -> Dict[str, Any]:
+        """
+        Stream the full result of an ad-hoc query through Metabase's export endpoint.
+        
+        Args:
+            query_data: Dataset query (database, type and native or query)
+            export_format: "csv" or "json"
+            sink: Called with each chunk of the exported file
+            
+        Returns:
+            Transfer details ({"bytes": ...})
+        """
+        form = {"query": json.dumps(query_data)}
+        data, status, error = await self.auth.stream_request(
+            "POST", f"dataset/{export_format}", sink, data=form
+        )
+        
+        if error:
+            raise _request_error(data, f"Query export failed: {error}")
+        
+        return data
+
@@ -2,16 +2,128 @@
 Configuration module for the Talk to Metabase MCP Server.
 """
 
+import logging
 import os
 from typing import Dict, Optional
 
 from pydantic import BaseModel, Field, validator
 from dotenv import load_dotenv
 
+from .export import DEFAULT_EXPORT_DIR
+from .session_cache import DEFAULT_SESSION_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
 # Load environment variables from a .env file if it exists
 load_dotenv()
 
 
+def _env_int(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back to the default if invalid."""
+    try:
+        return int(os.environ.get(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float environment variable, falling back to the default if invalid."""
+    try:
+        return float(os.environ.get(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean environment variable ("true"/"false")."""
+    return os.environ.get(name, str(default).lower()).lower() == "true"
+
+
+class TimeoutProfile(BaseModel):
+    """Timeouts in seconds applied to one endpoint family."""
+
+    connect: float = Field(..., description="Seconds to wait for a connection to be established")
+    read: float = Field(..., description="Seconds to wait for response data (also used for sending the body)")
+    pool: float = Field(..., description="Seconds to wait for a free connection from the pool")
+
+
+DEFAULT_TIMEOUT_PROFILES: Dict[str, TimeoutProfile] = {
+    "metadata": TimeoutProfile(connect=5.0, read=15.0, pool=5.0),
+    "search": TimeoutProfile(connect=5.0, read=20.0, pool=5.0),
+    "query": TimeoutProfile(connect=10.0, read=300.0, pool=30.0),
+    "write": TimeoutProfile(connect=5.0, read=60.0, pool=10.0),
+}
+
+
+def _timeout_profiles_from_env() -> Dict[str, TimeoutProfile]:
+    """Read METABASE_TIMEOUT_<FAMILY>_<CONNECT|READ|POOL> overrides."""
+    profiles = {}
+    for family, default in DEFAULT_TIMEOUT_PROFILES.items():
+        prefix = f"METABASE_TIMEOUT_{family.upper()}"
+        profiles[family] = TimeoutProfile(
+            connect=_env_float(f"{prefix}_CONNECT", default.connect),
+            read=_env_float(f"{prefix}_READ", default.read),
+            pool=_env_float(f"{prefix}_POOL", default.pool),
+        )
+    return profiles
+
+
+DEFAULT_CIRCUIT_LATENCY_THRESHOLDS: Dict[str, float] = {
+    "metadata": 10.0,
+    "search": 15.0,
+    "query": 0.0,
+    "write": 30.0,
+}
+
+
+def _circuit_latency_thresholds_from_env() -> Dict[str, float]:
+    """Read METABASE_CIRCUIT_LATENCY_<FAMILY> overrides."""
+    return {
+        family: _env_float(f"METABASE_CIRCUIT_LATENCY_{family.upper()}", default)
+        for family, default in DEFAULT_CIRCUIT_LATENCY_THRESHOLDS.items()
+    }
+
+
+RESPONSE_FORMATS = ("pretty", "compact")
+DEFAULT_RESPONSE_FORMAT = "pretty"
+
+
+def _env_response_format() -> str:
+    """Read RESPONSE_FORMAT, falling back to the default if invalid."""
+    value = os.environ.get("RESPONSE_FORMAT", DEFAULT_RESPONSE_FORMAT).lower()
+    if value not in RESPONSE_FORMATS:
+        logger.warning(
+            f"Invalid RESPONSE_FORMAT {value!r} (expected one of: {', '.join(RESPONSE_FORMATS)}); "
+            f"using {DEFAULT_RESPONSE_FORMAT!r}"
+        )
+        return DEFAULT_RESPONSE_FORMAT
+    return value
+
+DEFAULT_LANE_RESERVATIONS: Dict[str, int] = {
+    "interactive": 10,
+    "write": 5,
+    "query": 5,
+}
+
+
+def _lane_reservations_from_env() -> Dict[str, int]:
+    """Read METABASE_LANE_RESERVED_<LANE> overrides."""
+    return {
+        lane: _env_int(f"METABASE_LANE_RESERVED_{lane.upper()}", default)
+        for lane, default in DEFAULT_LANE_RESERVATIONS.items()
+    }
+
+
+def _family_limits_from_env(prefix: str, read) -> Dict[str, float]:
+    """Read per-family limits named <prefix>_<FAMILY>, skipping unset ones."""
+    limits = {}
+    for family in DEFAULT_TIMEOUT_PROFILES:
+        name = f"{prefix}_{family.upper()}"
+        if name in os.environ:
+            limits[family] = read(name, 0)
+    return limits
+
+
 class MetabaseConfig(BaseModel):
     """Configuration for Metabase connection."""
 
@@ -19,8 +131,66 @@ class MetabaseConfig(BaseModel):
     username: str = Field(..., description="Username for authentication")
     password: str = Field(..., description="Password for authentication")
     session_token: Optional[str] = Field(None, description="Session token after authentication")
+    api_key: Optional[str] = Field(None, description="Metabase API key; when set, session login is skipped entirely")
     response_size_limit: int = Field(100000, description="Maximum size in characters for responses sent to Claude")
     context_auto_inject: bool = Field(True, description="Whether to automatically load context guidelines")
+    response_format: str = Field(
+        DEFAULT_RESPONSE_FORMAT,
+        description="JSON encoding of tool responses: 'pretty' (indented) or 'compact'",
+    )
+    session_max_age: int = Field(3600, description="Seconds a validated session token is trusted before it is checked again")
+    session_cache_enabled: bool = Field(False, description="Whether to persist the session token on disk across restarts")
+    session_cache_path: str = Field(DEFAULT_SESSION_CACHE_PATH, description="File used to persist session tokens")
+    http_max_connections: int = Field(100, description="Maximum number of concurrent connections to Metabase")
+    http_max_keepalive_connections: int = Field(20, description="Maximum number of idle connections kept alive for reuse")
+    http_keepalive_expiry: float = Field(30.0, description="Seconds an idle keep-alive connection is kept open")
+    http2: bool = Field(False, description="Whether to negotiate HTTP/2 with Metabase (requires the h2 package)")
+    timeouts: Dict[str, TimeoutProfile] = Field(
+        default_factory=lambda: dict(DEFAULT_TIMEOUT_PROFILES),
+        description="Timeout profile per endpoint family (metadata, search, query, write)",
+    )
+    retry_max_attempts: int = Field(3, description="Total attempts for retryable requests, including the first one")
+    retry_backoff_base: float = Field(0.5, description="Backoff ceiling in seconds for the first retry")
+    retry_backoff_max: float = Field(8.0, description="Maximum backoff ceiling in seconds between retries")
+    retry_budget: float = Field(30.0, description="Maximum seconds a request may spend including retries")
+    circuit_failure_threshold: int = Field(5, description="Consecutive failures that open an endpoint's circuit (0 disables circuit breakers)")
+    circuit_reset_timeout: float = Field(30.0, description="Seconds an open circuit waits before letting a probe request through")
+    circuit_latency_thresholds: Dict[str, float] = Field(
+        default_factory=lambda: dict(DEFAULT_CIRCUIT_LATENCY_THRESHOLDS),
+        description="p95 latency in seconds per endpoint family that opens a circuit (0 disables)",
+    )
+    max_concurrent_requests: int = Field(0, description="Maximum requests in flight to Metabase (0 for unlimited; when priority lanes are enabled, 0 means capped at http_max_connections)")
+    rate_limit: float = Field(0.0, description="Maximum requests per second to Metabase (0 for unlimited)")
+    rate_limit_burst: int = Field(10, description="Requests allowed back-to-back before the rate limit applies")
+    family_concurrency_limits: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Maximum requests in flight per endpoint family (metadata, search, query, write)",
+    )
+    family_rate_limits: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Maximum requests per second per endpoint family",
+    )
+    result_store_max_mb: int = Field(256, description="Memory bound in MB for query results kept for paging (0 disables result handles)")
+    result_ttl: float = Field(900.0, description="Seconds a query result is kept for paging")
+    result_spill_threshold_mb: int = Field(8, description="Kept query results larger than this many MB are spilled to a memory-mapped temp file (0 keeps them in memory)")
+    search_index_enabled: bool = Field(False, description="Whether the search_local tool keeps an in-process full-text index of Metabase content")
+    search_index_refresh_interval: float = Field(300.0, description="Seconds after which search_local refreshes the local index before searching")
+    search_cache_ttl: float = Field(60.0, description="Seconds full search result lists are kept for paging when Metabase cannot paginate a search (0 disables the cache)")
+    search_cache_max_mb: int = Field(16, description="Memory bound in MB for cached search result lists")
+    dashboard_cache_ttl: float = Field(300.0, description="Seconds get_dashboard_tab serves later pages from the cached dashboard (0 disables the cache)")
+    dashboard_query_concurrency: int = Field(8, description="Maximum number of cards execute_dashboard_tab runs at once")
+    max_concurrent_jobs: int = Field(4, description="Maximum number of background query jobs running at once (0 for unlimited)")
+    job_ttl: float = Field(3600.0, description="Seconds a finished background query job and its result are kept")
+    dataset_max_rows: int = Field(200, description="Default row limit of run_dataset_query (0 for Metabase's own limit of 2000 rows)")
+    validation_max_rows: int = Field(10, description="Row limit of the query run that validates native SQL before a card is saved")
+    query_cache_max_mb: int = Field(64, description="Memory bound in MB for cached run_dataset_query results (0 disables the cache)")
+    query_cache_ttl: float = Field(300.0, description="Seconds a run_dataset_query result is served from the cache (0 disables the cache)")
+    result_spill_dir: Optional[str] = Field(None, description="Directory for spilled query results (default: the system temp directory)")
+    export_dir: str = Field(DEFAULT_EXPORT_DIR, description="Directory that streamed CSV/JSON exports are written to")
+    lane_reservations: Dict[str, int] = Field(
+        default_factory=lambda: dict(DEFAULT_LANE_RESERVATIONS),
+        description="Concurrent request slots reserved per priority lane (interactive, write, query); all 0 disables lanes",
+    )
 
     @validator("url")
     def validate_url(cls, v: str) -> str:
@@ -29,22 +199,61 @@ class MetabaseConfig(BaseModel):
             v = f"{v}/"
         return v
 
+    @validator("response_format")
+    def validate_response_format(cls, v: str) -> str:
+        """Ensure the response format is supported."""
+        v = v.lower()
+        if v not in RESPONSE_FORMATS:
+            raise ValueError(f"response_format must be one of: {', '.join(RESPONSE_FORMATS)}")
+        return v
+
     @classmethod
     def from_env(cls) -> "MetabaseConfig":
         """Create a configuration instance from environment variables."""
-        # Get the response size limit with a default value if not set
-        try:
-            response_size_limit = int(os.environ.get("RESPONSE_SIZE_LIMIT", "100000"))
-        except ValueError:
-            response_size_limit = 100000
-        
-        # Get context loading setting
-        context_auto_inject = os.environ.get("METABASE_CONTEXT_AUTO_INJECT", "true").lower() == "true"
-            
         return cls(
             url=os.environ.get("METABASE_URL", ""),
             username=os.environ.get("METABASE_USERNAME", ""),
             password=os.environ.get("METABASE_PASSWORD", ""),
-            response_size_limit=response_size_limit,
-            context_auto_inject=context_auto_inject,
+            api_key=os.environ.get("METABASE_API_KEY") or None,
+            response_size_limit=_env_int("RESPONSE_SIZE_LIMIT", 100000),
+            context_auto_inject=_env_bool("METABASE_CONTEXT_AUTO_INJECT", True),
+            response_format=_env_response_format(),
+            session_max_age=_env_int("METABASE_SESSION_MAX_AGE", 3600),
+            session_cache_enabled=_env_bool("METABASE_SESSION_CACHE", False),
+            session_cache_path=os.environ.get("METABASE_SESSION_CACHE_PATH", DEFAULT_SESSION_CACHE_PATH),
+            http_max_connections=_env_int("METABASE_HTTP_MAX_CONNECTIONS", 100),
+            http_max_keepalive_connections=_env_int("METABASE_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20),
+            http_keepalive_expiry=_env_float("METABASE_HTTP_KEEPALIVE_EXPIRY", 30.0),
+            http2=_env_bool("METABASE_HTTP2", False),
+            timeouts=_timeout_profiles_from_env(),
+            retry_max_attempts=_env_int("METABASE_RETRY_MAX_ATTEMPTS", 3),
+            retry_backoff_base=_env_float("METABASE_RETRY_BACKOFF_BASE", 0.5),
+            retry_backoff_max=_env_float("METABASE_RETRY_BACKOFF_MAX", 8.0),
+            retry_budget=_env_float("METABASE_RETRY_BUDGET", 30.0),
+            circuit_failure_threshold=_env_int("METABASE_CIRCUIT_FAILURE_THRESHOLD", 5),
+            circuit_reset_timeout=_env_float("METABASE_CIRCUIT_RESET_TIMEOUT", 30.0),
+            circuit_latency_thresholds=_circuit_latency_thresholds_from_env(),
+            max_concurrent_requests=_env_int("METABASE_MAX_CONCURRENT_REQUESTS", 0),
+            rate_limit=_env_float("METABASE_RATE_LIMIT", 0.0),
+            rate_limit_burst=_env_int("METABASE_RATE_LIMIT_BURST", 10),
+            family_concurrency_limits=_family_limits_from_env("METABASE_MAX_CONCURRENT", _env_int),
+            family_rate_limits=_family_limits_from_env("METABASE_RATE_LIMIT", _env_float),
+            lane_reservations=_lane_reservations_from_env(),
+            result_store_max_mb=_env_int("METABASE_RESULT_STORE_MAX_MB", 256),
+            result_ttl=_env_float("METABASE_RESULT_TTL", 900.0),
+            result_spill_threshold_mb=_env_int("METABASE_RESULT_SPILL_THRESHOLD_MB", 8),
+            result_spill_dir=os.environ.get("METABASE_RESULT_SPILL_DIR") or None,
+            search_index_enabled=_env_bool("METABASE_SEARCH_INDEX_ENABLED", False),
+            search_index_refresh_interval=_env_float("METABASE_SEARCH_INDEX_REFRESH_INTERVAL", 300.0),
+            search_cache_ttl=_env_float("METABASE_SEARCH_CACHE_TTL", 60.0),
+            search_cache_max_mb=_env_int("METABASE_SEARCH_CACHE_MAX_MB", 16),
+            dashboard_cache_ttl=_env_float("METABASE_DASHBOARD_CACHE_TTL", 300.0),
+            dashboard_query_concurrency=_env_int("METABASE_DASHBOARD_QUERY_CONCURRENCY", 8),
+            max_concurrent_jobs=_env_int("METABASE_MAX_CONCURRENT_JOBS", 4),
+            job_ttl=_env_float("METABASE_JOB_TTL", 3600.0),
+            dataset_max_rows=_env_int("METABASE_DATASET_MAX_ROWS", 200),
+            validation_max_rows=_env_int("METABASE_VALIDATION_MAX_ROWS", 10),
+            query_cache_max_mb=_env_int("METABASE_QUERY_CACHE_MAX_MB", 64),
+            query_cache_ttl=_env_float("METABASE_QUERY_CACHE_TTL", 300.0),
+            export_dir=os.environ.get("METABASE_EXPORT_DIR", DEFAULT_EXPORT_DIR),
         )
@@ -0,0 +1,130 @@
+"""
+Cache of dashboard payloads for paging through dashboard tabs.
+
+Paging through a large dashboard tab would otherwise fetch and re-process the
+whole dashboard for every page. Entries keep the dashboard together with an
+index of each tab's processed dashcards in display order. The index is always
+built from the payload just fetched, since card changes do not touch the
+dashboard's ``updated_at``, and writes to a dashboard or card drop the
+affected entries.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+# Tab ID (None for dashboards without tabs) -> dashcards in display order
+TabIndex = Dict[Optional[int], List[Dict[str, Any]]]
+
+_DASHBOARD_PATH = re.compile(r"^dashboard/(\d+)(?:/|$)")
+
+
+class CachedDashboard:
+    """A dashboard payload with its prebuilt tab index."""
+
+    def __init__(self, data: Dict[str, Any], tab_index: TabIndex):
+        """
+        Initialize the entry.
+
+        Args:
+            data: Dashboard data as returned by Metabase
+            tab_index: Processed dashcards of each tab
+        """
+        self.data = data
+        self.tab_index = tab_index
+        self.fetched_at = time.monotonic()
+
+
+class DashboardCache:
+    """LRU cache of dashboards with a TTL."""
+
+    def __init__(self, ttl: float, max_entries: int = 64):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds an entry is served without refetching the dashboard
+                (0 disables the cache)
+            max_entries: Maximum number of dashboards kept
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[int, CachedDashboard]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.index_builds = 0
+        self.invalidations = 0
+
+    def get(self, dashboard_id: int) -> Optional[CachedDashboard]:
+        """Return a cached dashboard, or None if it is not cached or too old."""
+        entry = self.entries.get(dashboard_id)
+        if entry is not None and time.monotonic() - entry.fetched_at <= self.ttl:
+            self.entries.move_to_end(dashboard_id)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        dashboard_id: int,
+        data: Dict[str, Any],
+        build_index: Callable[[Dict[str, Any]], TabIndex],
+    ) -> CachedDashboard:
+        """
+        Store a freshly fetched dashboard with a tab index built from it.
+
+        Args:
+            dashboard_id: Dashboard ID
+            data: Dashboard data as returned by Metabase
+            build_index: Builds the tab index of a dashboard
+
+        Returns:
+            The cache entry (also returned when the cache is disabled)
+        """
+        entry = CachedDashboard(data, build_index(data))
+        self.index_builds += 1
+
+        if self.ttl > 0:
+            self.entries[dashboard_id] = entry
+            self.entries.move_to_end(dashboard_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, dashboard_id: Optional[int] = None) -> None:
+        """Drop one dashboard, or every dashboard when dashboard_id is None."""
+        if dashboard_id is None:
+            count = len(self.entries)
+            self.entries.clear()
+        else:
+            count = 1 if self.entries.pop(dashboard_id, None) is not None else 0
+        self.invalidations += count
+
+    def on_write(self, method: str, path: str) -> None:
+        """
+        Drop the dashboards a successful write request may have changed.
+
+        Args:
+            method: HTTP method of the write
+            path: API path relative to /api/
+        """
+        path = path.strip("/")
+        match = _DASHBOARD_PATH.match(path)
+        if match:
+            self.invalidate(int(match.group(1)))
+        elif path.startswith("card"):
+            # Card changes show up in every dashboard that displays the card
+            self.invalidate()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe the cache's usage."""
+        return {
+            "entries": len(self.entries),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "index_builds": self.index_builds,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,75 @@
+"""
+Classification of Metabase API endpoints into families.
+
+Endpoint families group API paths with similar cost and latency so that
+client-side policies (timeouts, etc.) can be tuned per family.
+"""
+
+import re
+
+# Cheap reads: resource definitions, database/table metadata, collections
+METADATA = "metadata"
+# Full-text search across Metabase
+SEARCH = "search"
+# Warehouse query execution (ad-hoc datasets and saved card queries)
+QUERY = "query"
+# Requests that create, update or delete resources
+WRITE = "write"
+
+ENDPOINT_FAMILIES = (METADATA, SEARCH, QUERY, WRITE)
+
+_READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_QUERY_PATTERNS = [
+    re.compile(r"^dataset(/(csv|json|xlsx|api|pivot))?$"),
+    re.compile(r"^card/\d+/query(/\w+)?$"),
+    re.compile(r"^dashboard/\d+/dashcard/\d+/card/\d+/query(/\w+)?$"),
+]
+
+# POST endpoints that only compute something from the request body
+_READ_ONLY_POSTS = {"dataset/native"}
+
+
+def classify_endpoint(method: str, path: str) -> str:
+    """
+    Classify a Metabase API request into an endpoint family.
+    
+    Args:
+        method: HTTP method
+        path: API path relative to /api/ (e.g. "card/1/query")
+        
+    Returns:
+        One of the ENDPOINT_FAMILIES names
+    """
+    method = method.upper()
+    path = path.strip("/")
+    
+    if method in _READ_METHODS:
+        if path == "search":
+            return SEARCH
+        return METADATA
+    
+    if any(pattern.match(path) for pattern in _QUERY_PATTERNS):
+        return QUERY
+    
+    if path in _READ_ONLY_POSTS:
+        return METADATA
+    
+    return WRITE
+
+
+_ID_SEGMENT = re.compile(r"^\d+$")
+
+
+def endpoint_key(path: str) -> str:
+    """
+    Normalize an API path into a template by replacing numeric IDs with "*".
+    
+    Args:
+        path: API path relative to /api/ (e.g. "card/12/query")
+        
+    Returns:
+        Path template such as "card/*/query" or "database/*/metadata"
+    """
+    segments = path.strip("/").split("/")
+    return "/".join("*" if _ID_SEGMENT.match(segment) else segment for segment in segments)
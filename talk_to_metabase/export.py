@@ -0,0 +1,175 @@
+"""
+Streaming export of query results to local files.
+
+Metabase's export endpoints (``card/{id}/query/{format}`` and
+``dataset/{format}``) return the full result in CSV or JSON without the row
+cap of ``POST dataset``. Exports are written to disk chunk by chunk while rows
+are counted incrementally, so memory use does not grow with the result size.
+"""
+
+import os
+import re
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+EXPORT_FORMATS = ("csv", "json")
+
+DEFAULT_EXPORT_DIR = os.path.join(tempfile.gettempdir(), "talk-to-metabase-exports")
+
+_JSON_TOKENS = re.compile(rb'[\\"{}\[\]]')
+
+
+class CsvRowCounter:
+    """
+    Count CSV records across chunks, ignoring line breaks inside quoted fields.
+
+    The header line is not counted.
+    """
+
+    def __init__(self):
+        """Initialize the counter."""
+        self.in_quotes = False
+        self.line_breaks = 0
+        self.ends_with_newline = True
+
+    def feed(self, chunk: bytes) -> None:
+        """Count the records completed by a chunk."""
+        if not chunk:
+            return
+        if not self.in_quotes and b'"' not in chunk:
+            self.line_breaks += chunk.count(b"\n")
+        else:
+            for i, part in enumerate(chunk.split(b'"')):
+                if i:
+                    # Escaped quotes ("") toggle twice and leave the state unchanged
+                    self.in_quotes = not self.in_quotes
+                if not self.in_quotes:
+                    self.line_breaks += part.count(b"\n")
+        self.ends_with_newline = chunk.endswith(b"\n")
+
+    @property
+    def rows(self) -> int:
+        """Number of data rows seen so far."""
+        lines = self.line_breaks + (0 if self.ends_with_newline else 1)
+        return max(0, lines - 1)
+
+
+class JsonRowCounter:
+    """Count the objects of a top-level JSON array across chunks."""
+
+    def __init__(self):
+        """Initialize the counter."""
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.rows = 0
+
+    def feed(self, chunk: bytes) -> None:
+        """Count the rows started in a chunk."""
+        # Tokens before this position are escaped characters inside a string
+        skip_before = 0
+        if self.escaped:
+            self.escaped = False
+            skip_before = 1
+        for match in _JSON_TOKENS.finditer(chunk):
+            position = match.start()
+            if position < skip_before:
+                continue
+            token = match.group()
+            if self.in_string:
+                if token == b"\\":
+                    skip_before = position + 2
+                    self.escaped = skip_before > len(chunk)
+                elif token == b'"':
+                    self.in_string = False
+            elif token == b'"':
+                self.in_string = True
+            elif token in (b"{", b"["):
+                self.depth += 1
+                if self.depth == 2 and token == b"{":
+                    self.rows += 1
+            else:
+                self.depth -= 1
+
+
+class ExportFile:
+    """
+    Export destination written chunk by chunk.
+
+    Data goes to a ``.part`` file that replaces the destination only once the
+    export completes, so a failed export never leaves a truncated file behind.
+    """
+
+    def __init__(self, path: str, export_format: str):
+        """
+        Open the export file.
+
+        Args:
+            path: Destination path
+            export_format: "csv" or "json", used to count rows
+        """
+        self.path = path
+        self.part_path = f"{path}.part"
+        self.counter = CsvRowCounter() if export_format == "csv" else JsonRowCounter()
+        self.bytes_written = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(self.part_path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        """Append a chunk and count the rows it contains."""
+        self._file.write(chunk)
+        self.counter.feed(chunk)
+        self.bytes_written += len(chunk)
+
+    @property
+    def rows(self) -> int:
+        """Number of data rows written so far."""
+        return self.counter.rows
+
+    def commit(self) -> None:
+        """Finish the export and move it into place."""
+        self._file.close()
+        os.replace(self.part_path, self.path)
+
+    def abort(self) -> None:
+        """Discard a failed export."""
+        self._file.close()
+        try:
+            os.unlink(self.part_path)
+        except OSError:
+            pass
+
+
+def resolve_export_path(export_dir: str, filename: Optional[str], export_format: str, default_stem: str) -> str:
+    """
+    Build the destination path of an export inside the export directory.
+
+    Args:
+        export_dir: Directory exports are written to
+        filename: Requested file name (no directories), or None for a generated one
+        export_format: "csv" or "json"
+        default_stem: Stem of the generated file name
+
+    Raises:
+        ValueError: If the file name contains a directory part
+    """
+    if filename is None:
+        filename = f"{default_stem}-{int(time.time())}.{export_format}"
+    elif os.path.basename(filename) != filename or filename in (".", ".."):
+        raise ValueError(f"Export filename must not contain directories: {filename}")
+    elif not filename.endswith(f".{export_format}"):
+        filename = f"{filename}.{export_format}"
+    return os.path.join(os.path.expanduser(export_dir), filename)
+
+
+def export_summary(export: ExportFile, export_format: str, source: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe a completed export."""
+    return {
+        "success": True,
+        "path": export.path,
+        "format": export_format,
+        "rows": export.rows,
+        "bytes": export.bytes_written,
+        "source": source,
+    }
@@ -0,0 +1,190 @@
+"""
+Background query jobs.
+
+Long warehouse queries can outlast the MCP client's patience. A job runs the
+query in an asyncio task owned by the server, so the work survives the tool
+call that started it: the caller polls for the result instead of re-running
+the query. Cancelling a job cancels its task, which closes the in-flight
+HTTP request; Metabase cancels a query whose client disconnects.
+"""
+
+import asyncio
+import contextlib
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobFailed(Exception):
+    """Raised by a job's coroutine when the query returned an error."""
+
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the error.
+
+        Args:
+            message: Error message reported as the job's error
+            details: Structured error reported alongside the message
+        """
+        super().__init__(message)
+        self.details = details
+
+
+class Job:
+    """A query running in the background."""
+
+    def __init__(self, job_id: str, description: Dict[str, Any]):
+        """
+        Initialize a queued job.
+
+        Args:
+            job_id: Opaque job ID
+            description: What the job runs, reported back to the caller
+        """
+        self.id = job_id
+        self.description = description
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.error_details: Optional[Dict[str, Any]] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has reached a final state."""
+        return self.status in FINISHED_STATES
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        """Describe the job."""
+        info: Dict[str, Any] = {
+            "job_id": self.id,
+            "status": self.status,
+            "query": self.description,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        end = self.finished_at or time.time()
+        if self.started_at is not None:
+            info["elapsed_seconds"] = round(end - self.started_at, 3)
+        if self.error is not None:
+            info["error"] = self.error
+        if self.error_details is not None:
+            info["error_details"] = self.error_details
+        if include_result and self.status == COMPLETED:
+            info["result"] = self.result
+        return info
+
+
+class JobManager:
+    """
+    Runs jobs with bounded concurrency and keeps finished jobs for a TTL.
+
+    Jobs beyond the concurrency limit wait in the queued state.
+    """
+
+    def __init__(self, max_concurrency: int, ttl: float):
+        """
+        Initialize the manager.
+
+        Args:
+            max_concurrency: Maximum number of jobs running at once (0 for unlimited)
+            ttl: Seconds a finished job (and its result) is kept
+        """
+        self.max_concurrency = max_concurrency
+        self.ttl = ttl
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def submit(self, run: Callable[[], Awaitable[Any]], description: Dict[str, Any]) -> Job:
+        """
+        Start a job.
+
+        Args:
+            run: Coroutine function that performs the query and returns its result
+            description: What the job runs
+
+        Returns:
+            The queued job
+        """
+        self._expire()
+        if self._semaphore is None and self.max_concurrency > 0:
+            # Created lazily so it binds to the running event loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        job = Job(f"job_{secrets.token_urlsafe(9)}", description)
+        job.task = asyncio.create_task(self._run(job, run))
+        self.jobs[job.id] = job
+        return job
+
+    async def _run(self, job: Job, run: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            async with self._semaphore or contextlib.nullcontext():
+                job.status = RUNNING
+                job.started_at = time.time()
+                job.result = await run()
+                job.status = COMPLETED
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.status = FAILED
+            job.error = str(e)
+            if isinstance(e, JobFailed):
+                job.error_details = e.details
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job, or None if it is unknown or has expired."""
+        self._expire()
+        return self.jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job and wait for it to stop.
+
+        Returns:
+            The job, or None if it is unknown or has expired
+        """
+        job = self.get(job_id)
+        if job is not None and not job.finished and job.task is not None:
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    async def close(self) -> None:
+        """Cancel every unfinished job."""
+        tasks = [job.task for job in self.jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl
+        for job_id in [
+            job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < cutoff
+        ]:
+            del self.jobs[job_id]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Count jobs by status."""
+        self._expire()
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"jobs": counts, "max_concurrency": self.max_concurrency, "ttl": self.ttl}
@@ -0,0 +1,88 @@
+"""
+Pluggable JSON backend for decoding Metabase responses and encoding tool output.
+
+orjson is used when it is installed (``pip install talk-to-metabase[fast]``);
+otherwise the standard library json module is used. Both produce the same
+data (values orjson would not keep exact, such as integers beyond 64 bits,
+go through the standard library); orjson is several times faster on large
+query results.
+"""
+
+import json
+import re
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+JSON_BACKENDS = ("orjson", "json")
+
+_backend = "orjson" if orjson is not None else "json"
+
+# orjson decodes integers beyond 64 bits as floats; 19+ digit runs may be such integers
+_LONG_DIGITS = re.compile(rb"\d{19,}")
+_LONG_DIGITS_STR = re.compile(r"\d{19,}")
+
+
+def get_backend() -> str:
+    """Return the name of the active JSON backend."""
+    return _backend
+
+
+def set_backend(name: str) -> None:
+    """
+    Select the JSON backend.
+
+    Args:
+        name: "orjson" or "json"
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    global _backend
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    if name == "orjson" and orjson is None:
+        raise ValueError("orjson is not installed")
+    _backend = name
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """
+    Decode a JSON document.
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON (orjson's error
+            type subclasses it)
+    """
+    if _backend == "orjson":
+        pattern = _LONG_DIGITS_STR if isinstance(data, str) else _LONG_DIGITS
+        # Large DECIMAL/NUMERIC values must keep their exact integer value
+        if pattern.search(data) is None:
+            return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """
+    Encode an object as a JSON string.
+
+    Args:
+        obj: Object to encode
+        indent: 2 for pretty output, None for compact output; other values
+            always use the standard library
+    """
+    if _backend == "orjson" and indent in (None, 2):
+        option = orjson.OPT_NON_STR_KEYS
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option).decode("utf-8")
+        except TypeError:
+            # Integers beyond 64 bits and other types only the stdlib handles
+            pass
+    if indent is None:
+        return json.dumps(obj, separators=(",", ":"))
+    return json.dumps(obj, indent=indent)
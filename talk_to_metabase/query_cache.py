@@ -0,0 +1,152 @@
+"""
+In-process cache of ad-hoc query results.
+
+Agents often re-run the same native SQL or MBQL query within minutes. Results
+are cached under a hash of the canonical form of the query, so queries that
+only differ in key order or SQL formatting share an entry, and are dropped
+after a TTL or when the cache exceeds its size bound. The same cache class
+keeps full search result lists that Metabase could not paginate.
+"""
+
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from . import json_backend
+
+# Quoted SQL literals and identifiers, and comments, whose whitespace is significant
+# (the newline ending a line comment decides what the comment covers)
+_SQL_QUOTED = re.compile(
+    r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|--[^\n]*(?:\n|$)|/\*.*?\*/)", re.DOTALL
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside quoted literals, identifiers and comments."""
+    parts = _SQL_QUOTED.split(sql)
+    # Odd indexes are the quoted sections captured by the split
+    return "".join(
+        part if i % 2 else _WHITESPACE.sub(" ", part) for i, part in enumerate(parts)
+    ).strip().rstrip(";").rstrip()
+
+
+def query_cache_key(query_data: Dict[str, Any], *extra: Any) -> str:
+    """
+    Hash the canonical form of a dataset query.
+
+    Args:
+        query_data: Dataset query (database, type and native or query)
+        extra: Further values that change the result (e.g. a row limit)
+
+    Returns:
+        Hex digest identifying the query
+    """
+    canonical = dict(query_data)
+    native = canonical.get("native")
+    if isinstance(native, dict) and isinstance(native.get("query"), str):
+        canonical["native"] = {**native, "query": normalize_sql(native["query"])}
+    encoded = json.dumps([canonical, list(extra)], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """
+    LRU cache of JSON-serializable results with a TTL and a total size bound.
+
+    Cached values are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum size of all cached results (0 disables the cache)
+            ttl: Seconds a result is served from the cache (0 disables the cache)
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> (value, size in bytes, time stored)
+        self.entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether results are cached at all."""
+        return self.max_bytes > 0 and self.ttl > 0
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Look up a result.
+
+        Returns:
+            Tuple of (cached value, age in seconds), or None on a miss
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[2]
+            if age <= self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], age
+            self.discard(key)
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any) -> bool:
+        """
+        Cache a result.
+
+        Returns:
+            Whether the result was cached (results larger than the bound are not)
+        """
+        if not self.enabled:
+            return False
+        size = len(json_backend.dumps(value))
+        self.discard(key)
+        if size > self.max_bytes:
+            return False
+        self._expire()
+        while self.entries and self.total_bytes + size > self.max_bytes:
+            _, (_, evicted_size, _) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+            self.evictions += 1
+        self.entries[key] = (value, size, time.monotonic())
+        self.total_bytes += size
+        return True
+
+    def discard(self, key: str) -> None:
+        """Remove a cached result."""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        for key in [key for key, entry in self.entries.items() if entry[2] < cutoff]:
+            self.discard(key)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe the cache's usage."""
+        self._expire()
+        return {
+            "entries": len(self.entries),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,360 @@
+"""
+Server-side storage of query results behind opaque handles.
+
+Results that are too large to return in one response are kept here so they
+can be read page by page without re-running the warehouse query. Rows are
+stored column by column in a compact binary layout: fixed-width numbers in
+packed arrays, text and other values as UTF-8 with an offsets array, and a
+null mask per column. Results above a threshold are written to a temporary
+file and read back through mmap, so holding many large results does not grow
+the process's resident memory.
+"""
+
+import logging
+import mmap
+import os
+import secrets
+import shutil
+import tempfile
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import json_backend
+
+logger = logging.getLogger(__name__)
+
+# Column encodings
+INT = "int"
+FLOAT = "float"
+BOOL = "bool"
+TEXT = "text"
+JSON = "json"
+
+_INT64_MIN = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
+
+# (start, length) of a segment in the result buffer
+Segment = Tuple[int, int]
+
+
+def _column_kind(values: List[Any]) -> str:
+    """Pick the most compact encoding that stores every value exactly."""
+    kinds = set()
+    for value in values:
+        if value is None:
+            continue
+        value_type = type(value)
+        if value_type is bool:
+            kinds.add(BOOL)
+        elif value_type is int:
+            kinds.add(INT if _INT64_MIN <= value <= _INT64_MAX else JSON)
+        elif value_type is float:
+            kinds.add(FLOAT)
+        elif value_type is str:
+            kinds.add(TEXT)
+        else:
+            kinds.add(JSON)
+        if len(kinds) > 1:
+            return JSON
+    return kinds.pop() if kinds else INT
+
+
+class _BufferWriter:
+    """Accumulates 8-byte aligned segments of a result buffer."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def add(self, data: bytes) -> Segment:
+        start = self.size
+        padding = -len(data) % 8
+        self.chunks.append(data)
+        if padding:
+            self.chunks.append(b"\0" * padding)
+        self.size += len(data) + padding
+        return start, len(data)
+
+
+def _encode_column(values: List[Any], kind: str, writer: _BufferWriter) -> Dict[str, Any]:
+    spec: Dict[str, Any] = {"kind": kind}
+    spec["nulls"] = writer.add(bytes(value is None for value in values))
+    if kind == INT:
+        spec["values"] = writer.add(array("q", (value or 0 for value in values)).tobytes())
+    elif kind == FLOAT:
+        spec["values"] = writer.add(array("d", (value or 0.0 for value in values)).tobytes())
+    elif kind == BOOL:
+        spec["values"] = writer.add(bytes(bool(value) for value in values))
+    else:
+        if kind == TEXT:
+            encoded = [value.encode("utf-8") if value is not None else b"" for value in values]
+        else:
+            encoded = [json_backend.dumps(value).encode("utf-8") if value is not None else b"" for value in values]
+        offsets = [0]
+        total = 0
+        for item in encoded:
+            total += len(item)
+            offsets.append(total)
+        # 32-bit offsets unless the column holds 4 GB of data
+        spec["offset_type"] = "I" if total < 2 ** 32 else "Q"
+        spec["offsets"] = writer.add(array(spec["offset_type"], offsets).tobytes())
+        spec["values"] = writer.add(b"".join(encoded))
+    return spec
+
+
+class StoredResult:
+    """A query result held by the result store in columnar form."""
+
+    def __init__(self, handle: str, cols: List[Dict[str, Any]], rows: List[Any], source: Dict[str, Any]):
+        """
+        Encode a result.
+
+        Args:
+            handle: Opaque handle identifying the result
+            cols: Column metadata as returned by Metabase
+            rows: Result rows
+            source: Description of the query that produced the result
+        """
+        self.handle = handle
+        self.cols = cols
+        self.source = source
+        self.created_at = time.monotonic()
+        self.row_count = len(rows)
+
+        writer = _BufferWriter()
+        self.columns = [
+            _encode_column(values, _column_kind(values), writer)
+            for values in ([row[i] for row in rows] for i in range(len(cols)))
+        ]
+        self.size_bytes = writer.size
+        self._buffer: Optional[bytes] = b"".join(writer.chunks)
+        self._view = memoryview(self._buffer)
+        self._mmap: Optional[mmap.mmap] = None
+        self.path: Optional[str] = None
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the result lives in a memory-mapped file rather than in memory."""
+        return self._mmap is not None
+
+    def spill(self, directory: str) -> None:
+        """Move the result buffer to a file in directory and map it read-only."""
+        fd, path = tempfile.mkstemp(prefix="result-", suffix=".bin", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._buffer)
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            os.unlink(path)
+            raise
+        self.path = path
+        self._view.release()
+        self._view = memoryview(self._mmap)
+        self._buffer = None
+
+    def close(self) -> None:
+        """Release the buffer and remove the spill file, if any."""
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.path = None
+        self._buffer = None
+
+    def column_indexes(self, columns: Optional[List[str]]) -> List[int]:
+        """
+        Resolve column names to positions.
+
+        Args:
+            columns: Column names, or None for all columns
+
+        Raises:
+            KeyError: If a column name is not part of the result
+        """
+        if not columns:
+            return list(range(len(self.cols)))
+        positions = {col.get("name"): i for i, col in enumerate(self.cols)}
+        missing = [name for name in columns if name not in positions]
+        if missing:
+            raise KeyError(", ".join(missing))
+        return [positions[name] for name in columns]
+
+    def _segment(self, segment: Segment) -> memoryview:
+        start, length = segment
+        return self._view[start:start + length]
+
+    def _read_column(self, index: int, start: int, stop: int) -> List[Any]:
+        spec = self.columns[index]
+        kind = spec["kind"]
+        nulls = self._segment(spec["nulls"])[start:stop]
+        if kind in (INT, FLOAT):
+            values = self._segment(spec["values"]).cast("q" if kind == INT else "d")[start:stop].tolist()
+        elif kind == BOOL:
+            values = [bool(value) for value in self._segment(spec["values"])[start:stop]]
+        else:
+            offsets = self._segment(spec["offsets"]).cast(spec["offset_type"])[start:stop + 1].tolist()
+            blob = self._segment(spec["values"])
+            raw = [bytes(blob[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+            if kind == TEXT:
+                values = [item.decode("utf-8") for item in raw]
+            else:
+                values = [json_backend.loads(item) if item else None for item in raw]
+        return [None if null else value for value, null in zip(values, nulls)]
+
+    def page(self, offset: int, limit: int, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Slice the result.
+
+        Args:
+            offset: Index of the first row
+            limit: Maximum number of rows
+            columns: Column names to include, or None for all columns
+
+        Returns:
+            Dictionary with the selected cols and rows
+        """
+        indexes = self.column_indexes(columns)
+        start = min(offset, self.row_count)
+        stop = min(offset + limit, self.row_count)
+        values = [self._read_column(i, start, stop) for i in indexes]
+        return {
+            "cols": [self.cols[i] for i in indexes],
+            "rows": [list(row) for row in zip(*values)] if values else [[] for _ in range(stop - start)],
+        }
+
+
+class ResultStore:
+    """
+    Store of query results with a TTL and a total size bound.
+
+    The least recently used results are evicted first when the bound is
+    reached; results larger than the bound are not stored at all. Results
+    above the spill threshold are kept in memory-mapped temporary files.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        spill_threshold: int = 8 * 1024 * 1024,
+        spill_dir: Optional[str] = None,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            max_bytes: Maximum size of all stored results (0 disables the store)
+            ttl: Seconds a result is kept after it was stored
+            spill_threshold: Results larger than this many bytes are spilled to disk
+                (0 keeps every result in memory)
+            spill_dir: Parent directory for spill files (default: the system temp dir)
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self._spill_path: Optional[str] = None
+        self.results: "OrderedDict[str, StoredResult]" = OrderedDict()
+        self.total_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _spill_directory(self) -> str:
+        if self._spill_path is None:
+            self._spill_path = tempfile.mkdtemp(prefix="talk-to-metabase-results-", dir=self.spill_dir)
+        return self._spill_path
+
+    def put(self, cols: List[Dict[str, Any]], rows: List[Any], source: Dict[str, Any]) -> Optional[str]:
+        """
+        Store a result.
+
+        Args:
+            cols: Column metadata
+            rows: Result rows
+            source: Description of the query that produced the result
+
+        Returns:
+            Handle of the stored result, or None if it cannot be stored
+        """
+        if self.max_bytes <= 0:
+            return None
+
+        result = StoredResult(f"res_{secrets.token_urlsafe(12)}", cols, rows, source)
+        if result.size_bytes > self.max_bytes:
+            logger.info(
+                f"Result of {result.size_bytes} bytes exceeds the result store limit ({self.max_bytes} bytes)"
+            )
+            result.close()
+            return None
+
+        if self.spill_threshold and result.size_bytes > self.spill_threshold:
+            try:
+                result.spill(self._spill_directory())
+            except OSError as e:
+                logger.warning(f"Could not spill result to disk, keeping it in memory: {e}")
+
+        self._expire()
+        while self.results and self.total_bytes + result.size_bytes > self.max_bytes:
+            _, evicted = self.results.popitem(last=False)
+            self.total_bytes -= evicted.size_bytes
+            evicted.close()
+            self.evictions += 1
+
+        self.results[result.handle] = result
+        self.total_bytes += result.size_bytes
+        return result.handle
+
+    def get(self, handle: str) -> Optional[StoredResult]:
+        """Return a stored result, or None if it is unknown or has expired."""
+        self._expire()
+        result = self.results.get(handle)
+        if result is not None:
+            self.results.move_to_end(handle)
+        return result
+
+    def discard(self, handle: str) -> None:
+        """Remove a stored result."""
+        result = self.results.pop(handle, None)
+        if result is not None:
+            self.total_bytes -= result.size_bytes
+            result.close()
+
+    def close(self) -> None:
+        """Remove every stored result and the spill directory."""
+        for handle in list(self.results):
+            self.discard(handle)
+        if self._spill_path is not None:
+            shutil.rmtree(self._spill_path, ignore_errors=True)
+            self._spill_path = None
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        for handle in [handle for handle, result in self.results.items() if result.created_at < cutoff]:
+            self.discard(handle)
+            self.expirations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe the store's usage."""
+        self._expire()
+        spilled = [result for result in self.results.values() if result.spilled]
+        disk_bytes = sum(result.size_bytes for result in spilled)
+        return {
+            "results": len(self.results),
+            "total_bytes": self.total_bytes,
+            "memory_bytes": self.total_bytes - disk_bytes,
+            "disk_bytes": disk_bytes,
+            "spilled_results": len(spilled),
+            "max_bytes": self.max_bytes,
+            "spill_threshold": self.spill_threshold,
+            "ttl": self.ttl,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
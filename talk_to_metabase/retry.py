@@ -0,0 +1,117 @@
+"""
+Retry policy for transient Metabase API failures.
+"""
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+# Methods that can be repeated without changing the outcome
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Gateway errors: the request may or may not have reached Metabase
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+# Throttling: Metabase rejected the request without processing it
+THROTTLED_STATUS_CODE = 429
+
+# The request never left the client, so any method can be retried
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# The connection broke mid-request, so only idempotent methods are retried
+_CONNECTION_ERRORS = (httpx.ReadError, httpx.WriteError, httpx.RemoteProtocolError)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into a number of seconds.
+    
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+        
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter, bounded by attempts and time."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        budget: float = 30.0,
+    ):
+        """
+        Initialize the policy.
+        
+        Args:
+            max_attempts: Total attempts per request, including the first one
+            backoff_base: Backoff ceiling in seconds for the first retry
+            backoff_max: Maximum backoff ceiling in seconds
+            budget: Maximum seconds a request may spend including retries
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.budget = budget
+
+    def should_retry_status(self, method: str, status_code: int) -> bool:
+        """Whether a response status is worth retrying for this method."""
+        if status_code == THROTTLED_STATUS_CODE:
+            return True
+        return status_code in RETRYABLE_STATUS_CODES and method.upper() in IDEMPOTENT_METHODS
+
+    def should_retry_exception(self, method: str, error: Exception) -> bool:
+        """Whether a transport error is worth retrying for this method."""
+        if isinstance(error, _UNSENT_ERRORS):
+            return True
+        return isinstance(error, _CONNECTION_ERRORS) and method.upper() in IDEMPOTENT_METHODS
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Compute the delay before the next attempt.
+        
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            retry_after: Delay requested by the server, if any
+            
+        Returns:
+            Seconds to sleep
+        """
+        if retry_after is not None:
+            return retry_after
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def allows(self, attempt: int, started_at: float, delay: float) -> bool:
+        """
+        Whether another attempt fits within the attempt count and time budget.
+        
+        Args:
+            attempt: Number of attempts made so far
+            started_at: Monotonic time of the first attempt
+            delay: Backoff that would be slept before the next attempt
+        """
+        if attempt >= self.max_attempts:
+            return False
+        return time.monotonic() - started_at + delay <= self.budget
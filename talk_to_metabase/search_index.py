@@ -0,0 +1,377 @@
+"""
+Local full-text index over Metabase content.
+
+Metabase's /api/search takes seconds on large instances and matches field
+names and native SQL poorly. This module keeps an in-process inverted index
+of cards (including their native SQL), dashboards, collections, tables and
+fields, ranked with BM25. It is built from bulk metadata endpoints and
+refreshed incrementally: only items whose last edit time changed are
+re-indexed, and items that disappeared are dropped.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Name matches count this many times the other text of a document
+NAME_WEIGHT = 3
+
+_CAMEL_CASE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Document key: (model, id)
+DocKey = Tuple[str, Any]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase alphanumeric terms, breaking up camelCase and snake_case names."""
+    if not text:
+        return []
+    return _TOKEN.findall(_CAMEL_CASE.sub(" ", text).lower())
+
+
+class _Document:
+    def __init__(self, result: Dict[str, Any], term_counts: Counter, version: Any):
+        self.result = result
+        self.term_counts = term_counts
+        self.length = sum(term_counts.values())
+        self.version = version
+
+
+class SearchIndex:
+    """Inverted index with BM25 ranking."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.documents: Dict[DocKey, _Document] = {}
+        # term -> document key -> term frequency
+        self.postings: Dict[str, Dict[DocKey, int]] = defaultdict(dict)
+        self.total_length = 0
+
+    def version(self, key: DocKey) -> Any:
+        """Return the version a document was indexed at, or None if it is not indexed."""
+        document = self.documents.get(key)
+        return document.version if document is not None else None
+
+    def add(self, key: DocKey, result: Dict[str, Any], name: Optional[str], texts: Iterable[Optional[str]], version: Any = None) -> None:
+        """
+        Index a document, replacing any previous version.
+
+        Args:
+            key: (model, id) of the document
+            result: Search result returned for the document
+            name: Name of the document; its terms are weighted higher
+            texts: Other text of the document (descriptions, SQL, ...)
+            version: Last edit time, used to skip unchanged documents on refresh
+        """
+        self.remove(key)
+        term_counts: Counter = Counter()
+        for term in tokenize(name):
+            term_counts[term] += NAME_WEIGHT
+        for text in texts:
+            term_counts.update(tokenize(text))
+
+        document = _Document(result, term_counts, version)
+        self.documents[key] = document
+        self.total_length += document.length
+        for term, count in term_counts.items():
+            self.postings[term][key] = count
+
+    def remove(self, key: DocKey) -> None:
+        """Remove a document from the index."""
+        document = self.documents.pop(key, None)
+        if document is None:
+            return
+        self.total_length -= document.length
+        for term in document.term_counts:
+            postings = self.postings[term]
+            postings.pop(key, None)
+            if not postings:
+                del self.postings[term]
+
+    def keys(self, model: str) -> List[DocKey]:
+        """Return the keys of the documents of a model."""
+        return [key for key in self.documents if key[0] == model]
+
+    def search(self, query: str, models: Optional[List[str]] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Rank the documents matching any term of the query.
+
+        Args:
+            query: Search text
+            models: Only return results of these models (card, dataset, metric,
+                dashboard, collection, table, field)
+
+        Returns:
+            List of (score, result), best first
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.documents:
+            return []
+        count = len(self.documents)
+        average_length = self.total_length / count or 1.0
+        scores: Dict[DocKey, float] = defaultdict(float)
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, frequency in postings.items():
+                if models and self.documents[key].result.get("model") not in models:
+                    continue
+                length = self.documents[key].length
+                scores[key] += idf * frequency * (K1 + 1) / (
+                    frequency + K1 * (1 - B + B * length / average_length)
+                )
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))
+        return [(score, self.documents[key].result) for key, score in ranked]
+
+
+def _items(data: Any) -> List[Dict[str, Any]]:
+    """Return the list of a list endpoint response (plain list or {"data": [...]})."""
+    if isinstance(data, dict):
+        data = data.get("data")
+    return [item for item in data or [] if isinstance(item, dict)]
+
+
+def _edited_at(item: Dict[str, Any]) -> Any:
+    return item.get("last_edited_at") or item.get("updated_at")
+
+
+def _collection_fields(item: Dict[str, Any]) -> Dict[str, Any]:
+    collection = item.get("collection") or {}
+    return {"collection_id": item.get("collection_id"), "collection_name": collection.get("name")}
+
+
+class MetabaseSearchIndex(SearchIndex):
+    """Search index of a Metabase instance, refreshed from its bulk endpoints."""
+
+    def __init__(self, refresh_interval: float):
+        """
+        Initialize an empty index.
+
+        Args:
+            refresh_interval: Seconds after which a search refreshes the index first
+        """
+        super().__init__()
+        self.refresh_interval = refresh_interval
+        self.refreshed_at: Optional[float] = None
+        self.refresh_seconds: Optional[float] = None
+        self.stale = True
+        self.refreshes = 0
+        self.documents_updated = 0
+        self._database_versions: Dict[int, Any] = {}
+        self._lock = asyncio.Lock()
+
+    def mark_stale(self, *args: Any) -> None:
+        """Refresh before the next search; usable as an auth write listener."""
+        self.stale = True
+
+    def needs_refresh(self) -> bool:
+        """Whether the index is stale or older than the refresh interval."""
+        return (
+            self.stale
+            or self.refreshed_at is None
+            or time.monotonic() - self.refreshed_at > self.refresh_interval
+        )
+
+    async def ensure_fresh(self, auth) -> None:
+        """Refresh the index if needed; concurrent callers share one refresh."""
+        if not self.needs_refresh():
+            return
+        async with self._lock:
+            if self.needs_refresh():
+                await self.refresh(auth)
+
+    async def refresh(self, auth) -> None:
+        """
+        Pull cards, dashboards, collections and databases and re-index what changed.
+
+        Args:
+            auth: MetabaseAuth used for the requests
+
+        Raises:
+            ValueError: If a bulk endpoint fails
+        """
+        started_at = time.monotonic()
+        # Cleared first so that writes during the refresh trigger another one
+        self.stale = False
+        try:
+            responses = await asyncio.gather(*(
+                auth.make_request("GET", path) for path in ("card", "dashboard", "collection", "database")
+            ))
+            for path, (data, status, error) in zip(("card", "dashboard", "collection", "database"), responses):
+                if error:
+                    raise ValueError(f"Failed to load {path} list for the search index: {error}")
+            cards, dashboards, collections, databases = (_items(data) for data, _, _ in responses)
+
+            updated = self._sync("card", cards, self._index_card)
+            updated += self._sync("dashboard", dashboards, self._index_dashboard)
+            updated += self._sync(
+                "collection",
+                [item for item in collections if isinstance(item.get("id"), int)],
+                self._index_collection,
+            )
+            updated += await self._sync_databases(auth, databases)
+        except BaseException:
+            self.stale = True
+            raise
+
+        self.documents_updated += updated
+        self.refreshes += 1
+        self.refreshed_at = time.monotonic()
+        self.refresh_seconds = self.refreshed_at - started_at
+        logger.info(
+            f"Search index refreshed in {self.refresh_seconds:.2f}s: "
+            f"{updated} documents updated, {len(self.documents)} indexed"
+        )
+
+    def _sync(self, model: str, items: List[Dict[str, Any]], index_item) -> int:
+        """Index new and edited items of a model and drop archived or deleted ones."""
+        current = {}
+        for item in items:
+            if not item.get("archived"):
+                current[item["id"]] = item
+        for key in self.keys(model):
+            if key[1] not in current:
+                self.remove(key)
+        updated = 0
+        for item_id, item in current.items():
+            version = _edited_at(item)
+            if version is None or self.version((model, item_id)) != version:
+                index_item(item, version)
+                updated += 1
+        return updated
+
+    def _index_card(self, card: Dict[str, Any], version: Any) -> None:
+        model = {"model": "dataset", "metric": "metric"}.get(card.get("type"), "card")
+        dataset_query = card.get("dataset_query") or {}
+        native = dataset_query.get("native") or {}
+        result = {
+            "id": card["id"],
+            "name": card.get("name"),
+            "description": card.get("description"),
+            "model": model,
+            "display": card.get("display"),
+            "database_id": card.get("database_id") or dataset_query.get("database"),
+            "table_id": card.get("table_id"),
+            **_collection_fields(card),
+            "updated_at": card.get("updated_at"),
+        }
+        texts = [card.get("description"), native.get("query"), result["collection_name"]]
+        # Cards of all three kinds share one ID space; keep them under one key model
+        self.add(("card", card["id"]), result, card.get("name"), texts, version)
+
+    def _index_dashboard(self, dashboard: Dict[str, Any], version: Any) -> None:
+        result = {
+            "id": dashboard["id"],
+            "name": dashboard.get("name"),
+            "description": dashboard.get("description"),
+            "model": "dashboard",
+            **_collection_fields(dashboard),
+            "updated_at": dashboard.get("updated_at"),
+        }
+        self.add(("dashboard", dashboard["id"]), result, dashboard.get("name"),
+                 [dashboard.get("description"), result["collection_name"]], version)
+
+    def _index_collection(self, collection: Dict[str, Any], version: Any) -> None:
+        result = {
+            "id": collection["id"],
+            "name": collection.get("name"),
+            "description": collection.get("description"),
+            "model": "collection",
+            "collection_id": collection["id"],
+            "location": collection.get("location"),
+        }
+        self.add(("collection", collection["id"]), result, collection.get("name"),
+                 [collection.get("description")], version)
+
+    async def _sync_databases(self, auth, databases: List[Dict[str, Any]]) -> int:
+        """Re-index the tables and fields of databases whose metadata changed."""
+        current = {database["id"]: database for database in databases if isinstance(database.get("id"), int)}
+        for database_id in list(self._database_versions):
+            if database_id not in current:
+                self._drop_database(database_id)
+
+        changed = [
+            database for database_id, database in current.items()
+            if _edited_at(database) is None or self._database_versions.get(database_id) != _edited_at(database)
+        ]
+        responses = await asyncio.gather(*(
+            auth.make_request("GET", f"database/{database['id']}/metadata") for database in changed
+        ))
+        updated = 0
+        for database, (data, status, error) in zip(changed, responses):
+            if error:
+                logger.warning(f"Skipping metadata of database {database['id']} in the search index: {error}")
+                continue
+            self._drop_database(database["id"])
+            updated += self._index_database(database, data or {})
+            self._database_versions[database["id"]] = _edited_at(database)
+        return updated
+
+    def _drop_database(self, database_id: int) -> None:
+        for model in ("table", "field"):
+            for key in self.keys(model):
+                if self.documents[key].result.get("database_id") == database_id:
+                    self.remove(key)
+        self._database_versions.pop(database_id, None)
+
+    def _index_database(self, database: Dict[str, Any], metadata: Dict[str, Any]) -> int:
+        count = 0
+        for table in metadata.get("tables") or []:
+            if table.get("visibility_type") in ("hidden", "retired"):
+                continue
+            table_result = {
+                "id": table["id"],
+                "name": table.get("display_name") or table.get("name"),
+                "description": table.get("description"),
+                "model": "table",
+                "table_name": table.get("name"),
+                "table_schema": table.get("schema"),
+                "database_id": database["id"],
+                "database_name": database.get("name"),
+            }
+            self.add(("table", table["id"]), table_result, table.get("name"),
+                     [table.get("display_name"), table.get("description"), table.get("schema")])
+            count += 1
+            for field in table.get("fields") or []:
+                field_result = {
+                    "id": field["id"],
+                    "name": field.get("display_name") or field.get("name"),
+                    "description": field.get("description"),
+                    "model": "field",
+                    "field_name": field.get("name"),
+                    "base_type": field.get("base_type"),
+                    "table_id": table["id"],
+                    "table_name": table.get("name"),
+                    "database_id": database["id"],
+                }
+                self.add(("field", field["id"]), field_result, field.get("name"),
+                         [field.get("display_name"), field.get("description")])
+                count += 1
+        return count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe the index."""
+        counts = Counter(key[0] for key in self.documents)
+        return {
+            "documents": len(self.documents),
+            "by_model": dict(counts),
+            "terms": len(self.postings),
+            "refreshes": self.refreshes,
+            "documents_updated": self.documents_updated,
+            "last_refresh_seconds": round(self.refresh_seconds, 3) if self.refresh_seconds is not None else None,
+            "age_seconds": round(time.monotonic() - self.refreshed_at, 1) if self.refreshed_at is not None else None,
+            "stale": self.stale,
+        }
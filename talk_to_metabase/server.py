@@ -13,6 +13,12 @@ from mcp.server.fastmcp import Context, FastMCP
 
 from .auth import MetabaseAuth
 from .config import MetabaseConfig
+from .dashboard_cache import DashboardCache
+from .jobs import JobManager
+from .query_cache import QueryCache
+from .results import ResultStore
+from .search_index import MetabaseSearchIndex
+from .stats import current_tool
 
 # Set up logging
 log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
@@ -30,6 +36,44 @@ class MetabaseContext:
     def __init__(self, auth: MetabaseAuth):
         """Initialize with authentication."""
         self.auth = auth
+        self.results = ResultStore(
+            max_bytes=auth.config.result_store_max_mb * 1024 * 1024,
+            ttl=auth.config.result_ttl,
+            spill_threshold=auth.config.result_spill_threshold_mb * 1024 * 1024,
+            spill_dir=auth.config.result_spill_dir,
+        )
+        self.query_cache = QueryCache(
+            max_bytes=auth.config.query_cache_max_mb * 1024 * 1024,
+            ttl=auth.config.query_cache_ttl,
+        )
+        self.search_cache = QueryCache(
+            max_bytes=auth.config.search_cache_max_mb * 1024 * 1024,
+            ttl=auth.config.search_cache_ttl,
+        )
+        # Any write may add, rename or remove search results
+        auth.add_write_listener(lambda method, path: self.search_cache.clear())
+        self.search_index: Optional[MetabaseSearchIndex] = None
+        if auth.config.search_index_enabled:
+            self.search_index = MetabaseSearchIndex(auth.config.search_index_refresh_interval)
+            auth.add_write_listener(self.search_index.mark_stale)
+        self.dashboards = DashboardCache(ttl=auth.config.dashboard_cache_ttl)
+        auth.add_write_listener(self.dashboards.on_write)
+        self.jobs = JobManager(
+            max_concurrency=auth.config.max_concurrent_jobs,
+            ttl=auth.config.job_ttl,
+        )
+
+
+class MetabaseMCP(FastMCP):
+    """FastMCP server that records which tool is running for per-tool statistics."""
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        """Call a tool with its name exposed through the current_tool context variable."""
+        token = current_tool.set(name)
+        try:
+            return await super().call_tool(name, arguments)
+        finally:
+            current_tool.reset(token)
 
 
 @asynccontextmanager
@@ -38,15 +82,24 @@ async def metabase_lifespan(server: FastMCP) -> AsyncIterator[MetabaseContext]:
     config = MetabaseConfig.from_env()
     auth = MetabaseAuth(config)
     
+    if auth.uses_api_key:
+        # API keys are sent with every request, so there is no session to open
+        logger.info("Using Metabase API key authentication")
+    elif auth.session_token:
+        # Session restored from the on-disk cache; it is validated lazily on first use
+        logger.info("Reusing cached Metabase session")
     # Authenticate on startup
-    if not await auth.authenticate():
+    elif not await auth.authenticate():
         logger.error("Failed to authenticate with Metabase on startup")
         # We still continue, as we'll retry authentication on each request
     
+    metabase_ctx = MetabaseContext(auth=auth)
     try:
-        yield MetabaseContext(auth=auth)
+        yield metabase_ctx
     finally:
         # Cleanup on shutdown
+        await metabase_ctx.jobs.close()
+        metabase_ctx.results.close()
         await auth.close()
 
 
@@ -55,7 +108,7 @@ def create_server() -> FastMCP:
     logger.info("Creating MCP server...")
     server_name = "Metabase"
     logger.info(f"Server name: {server_name}")
-    mcp = FastMCP(
+    mcp = MetabaseMCP(
         server_name,
         lifespan=metabase_lifespan,
         dependencies=["httpx", "pydantic", "python-dotenv"],
@@ -115,6 +168,13 @@ def run_server() -> None:
     logger.info("- list_collections: List all collections")
     logger.info("- list_databases: List all databases")
     logger.info("- search_resources: Search for resources across Metabase")
+    logger.info("- search_local: Search the local full-text index (if enabled)")
+    logger.info("- fetch_result_page: Page through a large query result without re-running it")
+    logger.info("- export_card_results: Export the full result of a card to a CSV or JSON file")
+    logger.info("- export_dataset_results: Export the full result of a query to a CSV or JSON file")
+    logger.info("- execute_dashboard_tab: Execute every card of a dashboard tab concurrently")
+    logger.info("- submit_query / get_query_status / cancel_query: Run long queries as background jobs")
+    logger.info("- get_client_stats: Report connection pool and client counters")
     logger.info("- GET_METABASE_GUIDELINES: Get context guidelines (if enabled)")
     
     # Log context configuration status
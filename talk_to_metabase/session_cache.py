@@ -0,0 +1,84 @@
+"""
+On-disk cache of Metabase session tokens shared across process restarts.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_CACHE_PATH = os.path.join("~", ".cache", "talk-to-metabase", "sessions.json")
+
+
+class SessionCache:
+    """
+    Session tokens stored in a JSON file readable only by the current user.
+    
+    Entries are keyed by a hash of the Metabase URL and username, so one file
+    can serve several instances or accounts without exposing which ones.
+    """
+
+    def __init__(self, path: str = DEFAULT_SESSION_CACHE_PATH):
+        """Initialize with the cache file path (``~`` is expanded)."""
+        self.path = Path(path).expanduser()
+
+    @staticmethod
+    def cache_key(url: str, username: str) -> str:
+        """Build the cache key for a Metabase URL and username."""
+        return hashlib.sha256(f"{url.rstrip('/')}\n{username}".encode("utf-8")).hexdigest()
+
+    def load(self, url: str, username: str) -> Optional[Tuple[str, float]]:
+        """
+        Load a cached session token.
+        
+        Args:
+            url: Metabase URL
+            username: Metabase username
+            
+        Returns:
+            Tuple of (session_token, created_at epoch seconds), or None if absent
+        """
+        entry = self._read().get(self.cache_key(url, username))
+        if not isinstance(entry, dict) or not entry.get("token"):
+            return None
+        return entry["token"], float(entry.get("created_at", 0))
+
+    def save(self, url: str, username: str, token: str) -> None:
+        """Store a session token for a Metabase URL and username."""
+        entries = self._read()
+        entries[self.cache_key(url, username)] = {"token": token, "created_at": time.time()}
+        self._write(entries)
+
+    def discard(self, url: str, username: str) -> None:
+        """Remove the cached session token for a Metabase URL and username."""
+        entries = self._read()
+        if entries.pop(self.cache_key(url, username), None) is not None:
+            self._write(entries)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable session cache {self.path}: {e}")
+            return {}
+
+    def _write(self, entries: Dict[str, Any]) -> None:
+        try:
+            self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            # Create the file with owner-only permissions before writing the tokens
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write session cache {self.path}: {e}")
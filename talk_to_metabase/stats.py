@@ -0,0 +1,33 @@
+"""
+Per-tool statistics for outbound Metabase traffic.
+"""
+
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Name of the MCP tool whose call is currently being handled
+current_tool: ContextVar[str] = ContextVar("current_tool", default="unknown")
+
+
+class ToolCounters:
+    """Named counters grouped by the tool that was running when they changed."""
+
+    def __init__(self):
+        """Initialize with no counters."""
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def increment(self, name: str, amount: int = 1, tool: Optional[str] = None) -> None:
+        """
+        Increment a counter for a tool.
+        
+        Args:
+            name: Counter name
+            amount: Amount to add
+            tool: Tool name (defaults to the tool currently being handled)
+        """
+        self._counters[tool or current_tool.get()][name] += amount
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Return a plain-dict copy of all counters."""
+        return {tool: dict(counters) for tool, counters in self._counters.items()}
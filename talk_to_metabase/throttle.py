@@ -0,0 +1,316 @@
+"""
+Client-side rate limiting and concurrency caps for outbound Metabase traffic.
+"""
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from .endpoints import METADATA, QUERY, SEARCH, WRITE
+
+# Priority lanes, highest priority first
+INTERACTIVE_LANE = "interactive"
+WRITE_LANE = "write"
+QUERY_LANE = "query"
+LANES = (INTERACTIVE_LANE, WRITE_LANE, QUERY_LANE)
+
+LANE_BY_FAMILY = {
+    METADATA: INTERACTIVE_LANE,
+    SEARCH: INTERACTIVE_LANE,
+    WRITE: WRITE_LANE,
+    QUERY: QUERY_LANE,
+}
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+    
+    Callers reserve a token on arrival and sleep until it becomes available,
+    so waiting requests are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (requests allowed back-to-back)
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the seconds waited."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class PriorityLanes:
+    """
+    Concurrency cap split into priority lanes with reserved capacity.
+    
+    Each lane owns a number of reserved slots that only its requests can use;
+    the rest of the capacity is shared. When a slot frees up, waiting requests
+    are admitted lane by lane in priority order, so cheap interactive lookups
+    are not stuck behind long-running queries.
+    """
+
+    def __init__(self, capacity: int, reservations: Dict[str, int]):
+        """
+        Initialize the lanes.
+        
+        Args:
+            capacity: Total requests in flight across all lanes
+            reservations: Slots reserved per lane; capacity beyond their sum is shared
+        """
+        self.reserved = {lane: max(0, reservations.get(lane, 0)) for lane in LANES}
+        self.capacity = max(capacity, sum(self.reserved.values()))
+        self.shared = self.capacity - sum(self.reserved.values())
+        self.reserved_in_use = {lane: 0 for lane in LANES}
+        self.shared_in_use = 0
+        self.waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+
+    def _grant(self, lane: str, queued: bool) -> Optional[bool]:
+        """
+        Take a free slot for a lane if one is available to it.
+        
+        Returns:
+            True for a shared slot, False for a reserved slot, None if none is free
+        """
+        if self.reserved_in_use[lane] < self.reserved[lane]:
+            self.reserved_in_use[lane] += 1
+            return False
+        if self.shared_in_use < self.shared:
+            # Newcomers do not jump ahead of waiting requests of equal or higher priority
+            if not queued and any(self.waiters[other] for other in LANES[:LANES.index(lane) + 1]):
+                return None
+            self.shared_in_use += 1
+            return True
+        return None
+
+    async def acquire(self, lane: str) -> bool:
+        """
+        Wait for a slot in a lane.
+        
+        Returns:
+            Whether the slot came from the shared pool (pass it back to release)
+        """
+        if not self.waiters[lane]:
+            shared = self._grant(lane, queued=False)
+            if shared is not None:
+                return shared
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters[lane].append(waiter)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as we were cancelled
+                self.release(lane, waiter.result())
+            elif waiter in self.waiters[lane]:
+                self.waiters[lane].remove(waiter)
+            raise
+
+    def release(self, lane: str, shared: bool) -> None:
+        """Return a slot and admit waiting requests in priority order."""
+        if shared:
+            self.shared_in_use -= 1
+        else:
+            self.reserved_in_use[lane] -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        for lane in LANES:
+            waiters = self.waiters[lane]
+            while waiters:
+                if waiters[0].done():
+                    # Cancelled while waiting
+                    waiters.popleft()
+                    continue
+                shared = self._grant(lane, queued=True)
+                if shared is None:
+                    break
+                waiters.popleft().set_result(shared)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe reserved and shared slot usage per lane."""
+        return {
+            "capacity": self.capacity,
+            "shared": self.shared,
+            "shared_in_use": self.shared_in_use,
+            "lanes": {
+                lane: {
+                    "reserved": self.reserved[lane],
+                    "reserved_in_use": self.reserved_in_use[lane],
+                    "waiting": len(self.waiters[lane]),
+                }
+                for lane in LANES
+            },
+        }
+
+
+class Throttle:
+    """
+    Global and per-endpoint-family rate limits and concurrency caps.
+    
+    A limit of 0 disables that limit. Queue depth and waiting time are recorded
+    per family so the server can be sized without overloading Metabase.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 0,
+        rate: float = 0.0,
+        burst: int = 10,
+        family_concurrency: Optional[Dict[str, int]] = None,
+        family_rates: Optional[Dict[str, float]] = None,
+        lane_reservations: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Initialize the throttle.
+        
+        Args:
+            max_concurrency: Maximum requests in flight across all families
+            rate: Maximum requests per second across all families
+            burst: Bucket capacity for every rate limit
+            family_concurrency: Maximum requests in flight per endpoint family
+            family_rates: Maximum requests per second per endpoint family
+            lane_reservations: Slots of max_concurrency reserved per priority lane;
+                when set, the global cap is scheduled by priority instead of FIFO
+        """
+        self.lanes: Optional[PriorityLanes] = None
+        self.global_semaphore: Optional[asyncio.Semaphore] = None
+        if max_concurrency > 0:
+            if lane_reservations and any(value > 0 for value in lane_reservations.values()):
+                self.lanes = PriorityLanes(max_concurrency, lane_reservations)
+            else:
+                self.global_semaphore = asyncio.Semaphore(max_concurrency)
+        self.global_bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.family_semaphores = {
+            family: asyncio.Semaphore(limit)
+            for family, limit in (family_concurrency or {}).items()
+            if limit > 0
+        }
+        self.family_buckets = {
+            family: TokenBucket(family_rate, burst)
+            for family, family_rate in (family_rates or {}).items()
+            if family_rate > 0
+        }
+        self.limits = {
+            "max_concurrency": max_concurrency,
+            "rate": rate,
+            "burst": burst,
+            "family_concurrency": dict(family_concurrency or {}),
+            "family_rates": dict(family_rates or {}),
+            "lane_reservations": dict(lane_reservations or {}) if self.lanes else {},
+        }
+        
+        self.queued: Dict[str, int] = defaultdict(int)
+        self.max_queued: Dict[str, int] = defaultdict(int)
+        self.in_flight: Dict[str, int] = defaultdict(int)
+        self.delayed_requests: Dict[str, int] = defaultdict(int)
+        self.wait_seconds: Dict[str, float] = defaultdict(float)
+
+    def _semaphores(self, family: str) -> List[asyncio.Semaphore]:
+        # Family semaphore first, so a saturated family does not hold global slots
+        semaphores = []
+        if family in self.family_semaphores:
+            semaphores.append(self.family_semaphores[family])
+        if self.global_semaphore is not None:
+            semaphores.append(self.global_semaphore)
+        return semaphores
+
+    def _buckets(self, family: str) -> List[TokenBucket]:
+        buckets = []
+        if family in self.family_buckets:
+            buckets.append(self.family_buckets[family])
+        if self.global_bucket is not None:
+            buckets.append(self.global_bucket)
+        return buckets
+
+    @asynccontextmanager
+    async def slot(self, family: str) -> AsyncIterator[None]:
+        """
+        Hold a request slot for an endpoint family, waiting for limits if needed.
+        
+        Args:
+            family: Endpoint family of the request
+        """
+        semaphores = self._semaphores(family)
+        buckets = self._buckets(family)
+        if not semaphores and not buckets and self.lanes is None:
+            yield
+            return
+        
+        started_at = time.monotonic()
+        acquired: List[asyncio.Semaphore] = []
+        lane = LANE_BY_FAMILY.get(family, QUERY_LANE)
+        lane_slot: Optional[bool] = None
+        self.queued[family] += 1
+        self.max_queued[family] = max(self.max_queued[family], self.queued[family])
+        try:
+            for bucket in buckets:
+                await bucket.acquire()
+            for semaphore in semaphores:
+                await semaphore.acquire()
+                acquired.append(semaphore)
+            if self.lanes is not None:
+                lane_slot = await self.lanes.acquire(lane)
+        except BaseException:
+            for semaphore in reversed(acquired):
+                semaphore.release()
+            raise
+        finally:
+            self.queued[family] -= 1
+        
+        waited = time.monotonic() - started_at
+        if waited > 0.001:
+            self.delayed_requests[family] += 1
+            self.wait_seconds[family] += waited
+        
+        self.in_flight[family] += 1
+        try:
+            yield
+        finally:
+            self.in_flight[family] -= 1
+            if lane_slot is not None:
+                self.lanes.release(lane, lane_slot)
+            for semaphore in reversed(acquired):
+                semaphore.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe limits, queue depth and waiting time per family."""
+        families = sorted(set(self.queued) | set(self.in_flight) | set(self.delayed_requests))
+        snapshot = {
+            "limits": self.limits,
+            "families": {
+                family: {
+                    "queued": self.queued[family],
+                    "max_queued": self.max_queued[family],
+                    "in_flight": self.in_flight[family],
+                    "delayed_requests": self.delayed_requests[family],
+                    "wait_seconds": round(self.wait_seconds[family], 3),
+                }
+                for family in families
+            },
+        }
+        if self.lanes is not None:
+            snapshot["lanes"] = self.lanes.snapshot()
+        return snapshot
@@ -38,6 +38,15 @@ try:
     from . import dashcards
     logger.info("Loaded dashcards tools module")
     
+    from . import diagnostics
+    logger.info("Loaded diagnostics tools module")
+    
+    from . import export
+    logger.info("Loaded export tools module")
+    
+    from . import jobs
+    logger.info("Loaded query job tools module")
+    
     from . import parameters
     logger.info("Loaded parameters tools module")
     
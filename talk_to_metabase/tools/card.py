@@ -9,7 +9,7 @@ from typing import Dict, Optional, Any, List, Union
 from mcp.server.fastmcp import Context, FastMCP
 
 from ..server import get_server_instance
-from .common import format_error_response, get_metabase_client, check_response_size
+from .common import format_error_response, get_metabase_client, check_response_size, serialize_response
 from .visualization import validate_visualization_settings_helper
 
 # Set up logging for this module
@@ -276,14 +276,19 @@ def detect_sql_parameter_mistakes(query: str, parameter_names: List[str]) -> Lis
     return warnings
 
 
-async def execute_sql_query(client, database_id: int, query: str) -> Dict[str, Any]:
+async def execute_sql_query(client, database_id: int, query: str, max_rows: int = 10) -> Dict[str, Any]:
     """
     Execute a SQL query to validate it before creating a card.
     
+    The run is capped to a few rows through the dataset constraints: only the
+    columns matter, and they are saved as the card's result_metadata so that
+    Metabase does not run the query again to compute them.
+    
     Args:
         client: Metabase client
         database_id: Database ID
         query: SQL query string
+        max_rows: Maximum number of rows the validation run returns
     
     Returns:
         Dictionary with execution result (success/error info)
@@ -296,6 +301,10 @@ async def execute_sql_query(client, database_id: int, query: str) -> Dict[str, A
             "native": {
                 "query": query,
                 "template-tags": {}
+            },
+            "constraints": {
+                "max-results": max_rows,
+                "max-results-bare-rows": max_rows
             }
         }
         
@@ -366,6 +375,7 @@ async def get_card_definition(id: int, ctx: Context, ignore_view: Optional[bool]
         if error:
             return format_error_response(
                 status_code=status,
+                response_data=data,
                 error_type="retrieval_error",
                 message=error,
                 request_info={
@@ -385,12 +395,10 @@ async def get_card_definition(id: int, ctx: Context, ignore_view: Optional[bool]
             if sql_translation:
                 essential_info["sql_translation"] = sql_translation
         
-        # Convert to JSON string
-        response = json.dumps(essential_info, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response = serialize_response(essential_info, config)
         return check_response_size(response, config)
     except Exception as e:
         logger.error(f"Error getting card definition {id}: {e}")
@@ -570,18 +578,18 @@ async def create_card(
         if MBQL_AVAILABLE:
             validation_result = validate_mbql_query_helper(query)
             if not validation_result["valid"]:
-                return json.dumps({
+                return serialize_response({
                     "success": False,
                     "error": "Invalid MBQL query",
                     "validation_errors": validation_result["errors"],
                     "help": "Call GET_MBQL_SCHEMA first to understand the correct MBQL format"
-                }, indent=2)
+                })
         else:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "MBQL functionality not available",
                 "message": "MBQL validation module could not be imported"
-            }, indent=2)
+            })
     
     # Validate card type
     valid_card_types = ["question", "model", "metric"]
@@ -597,13 +605,13 @@ async def create_card(
     if visualization_settings is not None:
         validation_result = validate_visualization_settings_helper(display, visualization_settings)
         if not validation_result["valid"]:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "Invalid visualization settings",
                 "validation_errors": validation_result["errors"],
                 "chart_type": display,
                 "help": "Call GET_VISUALIZATION_DOCUMENT first to understand the correct format"
-            }, indent=2)
+            })
     
     # Parse and validate parameters if provided
     processed_parameters = None
@@ -617,27 +625,27 @@ async def create_card(
                 # Process card parameters with validation
                 processed_parameters, template_tags, errors = await process_card_parameters(client, parsed_parameters)
                 if errors:
-                    return json.dumps({
+                    return serialize_response({
                         "success": False,
                         "error": "Invalid card parameters",
                         "validation_errors": errors,
                         "parameters_count": len(parsed_parameters),
                         "help": "Call GET_CARD_PARAMETERS_DOCUMENTATION for format details"
-                    }, indent=2)
+                    })
             elif parsed_parameters:
                 # Parameters provided but card parameters module not available
-                return json.dumps({
+                return serialize_response({
                     "success": False,
                     "error": "Card parameters functionality not available",
                     "message": "Card parameters module could not be imported"
-                }, indent=2)
+                })
                 
         except ValueError as e:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "Parameter parsing error",
                 "message": str(e)
-            }, indent=2)
+            })
     
     # Check for common SQL parameter mistakes and parameter consistency if parameters are provided
     sql_warnings = []
@@ -653,7 +661,10 @@ async def create_card(
     # Step 1: For native queries, execute the query to validate it
     # For MBQL queries, we skip execution validation per requirements
     if query_type == "native":
-        execution_result = await execute_sql_query(client, database_id, query)
+        config = ctx.request_context.lifespan_context.auth.config
+        execution_result = await execute_sql_query(
+            client, database_id, query, max_rows=config.validation_max_rows
+        )
         
         if not execution_result["success"]:
             # Return a concise error response if query validation fails
@@ -666,7 +677,7 @@ async def create_card(
                 response["sql_warnings"] = sql_warnings
                 response["help"] = "Check your SQL parameter usage. Parameters substitute with proper formatting automatically."
             
-            return json.dumps(response, indent=2)
+            return serialize_response(response)
     else:
         # For MBQL queries, create a placeholder execution result
         execution_result = {"success": True, "result_metadata": []}
@@ -721,6 +732,7 @@ async def create_card(
         if error:
             return format_error_response(
                 status_code=status,
+                response_data=data,
                 error_type="creation_error",
                 message=error,
                 request_info={
@@ -742,7 +754,7 @@ async def create_card(
             response["sql_warnings"] = sql_warnings
             response["help"] = "Card created successfully, but check SQL parameter usage warnings above."
         
-        return json.dumps(response, indent=2)
+        return serialize_response(response)
         
     except Exception as e:
         logger.error(f"Error creating card: {e}")
@@ -931,18 +943,18 @@ async def update_card(
         if MBQL_AVAILABLE:
             validation_result = validate_mbql_query_helper(query)
             if not validation_result["valid"]:
-                return json.dumps({
+                return serialize_response({
                     "success": False,
                     "error": "Invalid MBQL query",
                     "validation_errors": validation_result["errors"],
                     "help": "Call GET_MBQL_SCHEMA first to understand the correct MBQL format"
-                }, indent=2)
+                })
         else:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "MBQL functionality not available",
                 "message": "MBQL validation module could not be imported"
-            }, indent=2)
+            })
     
     # Initialize current_data as None
     current_data = None
@@ -961,6 +973,7 @@ async def update_card(
                 if error:
                     return format_error_response(
                         status_code=status,
+                        response_data=current_data,
                         error_type="retrieval_error",
                         message=f"Cannot validate visualization settings for card {id}: {error}",
                         request_info={
@@ -983,13 +996,13 @@ async def update_card(
         
         validation_result = validate_visualization_settings_helper(chart_type, visualization_settings)
         if not validation_result["valid"]:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "Invalid visualization settings",
                 "validation_errors": validation_result["errors"],
                 "chart_type": chart_type,
                 "help": "Call GET_VISUALIZATION_DOCUMENT first to understand the correct format"
-            }, indent=2)
+            })
     
     # Parse and validate parameters if provided
     processed_parameters = None
@@ -1003,27 +1016,27 @@ async def update_card(
                 # Process card parameters with validation
                 processed_parameters, template_tags, errors = await process_card_parameters(client, parsed_parameters)
                 if errors:
-                    return json.dumps({
+                    return serialize_response({
                         "success": False,
                         "error": "Invalid card parameters",
                         "validation_errors": errors,
                         "parameters_count": len(parsed_parameters),
                         "help": "Call GET_CARD_PARAMETERS_DOCUMENTATION for format details"
-                    }, indent=2)
+                    })
             elif parsed_parameters:
                 # Parameters provided but card parameters module not available
-                return json.dumps({
+                return serialize_response({
                     "success": False,
                     "error": "Card parameters functionality not available",
                     "message": "Card parameters module could not be imported"
-                }, indent=2)
+                })
                 
         except ValueError as e:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "Parameter parsing error",
                 "message": str(e)
-            }, indent=2)
+            })
     
     try:
         # Initialize sql_warnings at function scope
@@ -1038,6 +1051,7 @@ async def update_card(
             if error:
                 return format_error_response(
                     status_code=status,
+                    response_data=current_data,
                     error_type="retrieval_error",
                     message=f"Cannot update card {id}: {error}",
                     request_info={
@@ -1114,7 +1128,10 @@ async def update_card(
             # Validate the query based on type
             if query_type == "native":
                 # Validate the SQL query
-                execution_result = await execute_sql_query(client, database_id, query)
+                config = ctx.request_context.lifespan_context.auth.config
+                execution_result = await execute_sql_query(
+                    client, database_id, query, max_rows=config.validation_max_rows
+                )
                 
                 if not execution_result["success"]:
                     # Return a concise error response if query validation fails
@@ -1127,7 +1144,7 @@ async def update_card(
                         response["sql_warnings"] = sql_warnings
                         response["help"] = "Check your SQL parameter usage. Parameters substitute with proper formatting automatically."
                     
-                    return json.dumps(response, indent=2)
+                    return serialize_response(response)
                 
                 # Add the validated SQL query to the update data
                 update_data["dataset_query"] = {
@@ -1154,10 +1171,10 @@ async def update_card(
         
         # If no fields were provided to update, return early
         if not update_data:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "No fields provided for update"
-            }, indent=2)
+            })
         
         # Perform the update
         data, status, error = await client.auth.make_request(
@@ -1167,6 +1184,7 @@ async def update_card(
         if error:
             return format_error_response(
                 status_code=status,
+                response_data=data,
                 error_type="update_error",
                 message=error,
                 request_info={
@@ -1194,7 +1212,7 @@ async def update_card(
             response["sql_warnings"] = sql_warnings
             response["help"] = "Card updated successfully, but check SQL parameter usage warnings above."
         
-        return json.dumps(response, indent=2)
+        return serialize_response(response)
         
     except Exception as e:
         logger.error(f"Error updating card {id}: {e}")
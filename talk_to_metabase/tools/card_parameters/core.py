@@ -9,7 +9,6 @@ This module provides comprehensive card parameter support including:
 - Value source management
 """
 
-import json
 import logging
 import uuid
 from typing import Dict, List, Tuple, Any, Optional, Union
@@ -19,7 +18,7 @@ from mcp.server.fastmcp import Context
 
 from ...server import get_server_instance
 from ...resources import load_card_parameters_schema, load_card_parameters_docs
-from ..common import format_error_response, get_metabase_client, check_response_size
+from ..common import format_error_response, get_metabase_client, check_response_size, serialize_response
 
 logger = logging.getLogger(__name__)
 
@@ -563,12 +562,10 @@ async def get_card_parameters_documentation(ctx: Context) -> str:
             }
         }
         
-        # Convert to JSON string
-        response = json.dumps(response_data, indent=2)
-        
         # Check response size
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response = serialize_response(response_data, config)
         return check_response_size(response, config)
         
     except Exception as e:
@@ -9,7 +9,13 @@ from typing import Dict, List, Optional, Any, Union
 from mcp.server.fastmcp import Context, FastMCP
 
 from ..server import get_server_instance
-from .common import format_error_response, get_metabase_client, check_response_size
+from .common import (
+    check_response_size,
+    fit_response_to_limit,
+    format_error_response,
+    get_metabase_client,
+    serialize_response,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -54,6 +60,7 @@ async def explore_collection_tree(
         if error:
             return format_error_response(
                 status_code=status,
+                response_data=api_response,
                 error_type="retrieval_error",
                 message=error,
                 request_info={"endpoint": f"/api/{endpoint}", "method": "GET", "params": params}
@@ -120,13 +127,18 @@ async def explore_collection_tree(
             "content_summary": content_summary
         }
         
-        # Convert data to JSON string
-        response = json.dumps(response_data, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
-        return check_response_size(response, config)
+        return fit_response_to_limit(
+            response_data,
+            ("child_collections",),
+            config,
+            how_to_fetch_rest=(
+                "Use view_collection_contents with models=[\"collection\"] on this collection, "
+                "or explore a listed child collection to narrow the tree."
+            ),
+        )
     except Exception as e:
         logger.error(f"Error exploring collection tree: {e}")
         return format_error_response(
@@ -191,6 +203,7 @@ async def view_collection_contents(
         if error:
             return format_error_response(
                 status_code=status,
+                response_data=api_response,
                 error_type="retrieval_error",
                 message=error,
                 request_info={"endpoint": f"/api/{endpoint}", "method": "GET", "params": params}
@@ -257,13 +270,18 @@ async def view_collection_contents(
             "content_summary": content_summary
         }
         
-        # Convert data to JSON string
-        response = json.dumps(response_data, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
-        return check_response_size(response, config)
+        return fit_response_to_limit(
+            response_data,
+            ("items",),
+            config,
+            how_to_fetch_rest=(
+                "Filter with models to list one item type at a time; content_summary shows "
+                "how many items of each type the collection holds."
+            ),
+        )
     except Exception as e:
         logger.error(f"Error viewing collection contents: {e}")
         return format_error_response(
@@ -317,11 +335,10 @@ async def create_collection(
             "name": data.get("name")
         }
         
-        response_json = json.dumps(response, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response_json = serialize_response(response, config)
         return check_response_size(response_json, config)
     except Exception as e:
         logger.error(f"Error creating collection: {e}")
@@ -2,13 +2,17 @@
 Common utilities and helpers for Metabase MCP tools.
 """
 
-import json
 import logging
-from typing import Any, Dict, Optional
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from mcp.server.fastmcp import Context
 
+from .. import json_backend
+from ..circuit import CIRCUIT_OPEN_ERROR, CircuitOpenError, circuit_rejection
 from ..client import MetabaseClient
+from ..config import DEFAULT_RESPONSE_FORMAT
 from ..server import MetabaseContext
 
 logger = logging.getLogger(__name__)
@@ -20,6 +24,34 @@ def get_metabase_client(ctx: Context) -> MetabaseClient:
     return MetabaseClient(metabase_ctx.auth)
 
 
+def serialize_response(data: Any, config=None) -> str:
+    """Serialize a tool response as JSON in the configured format.
+    
+    Args:
+        data: The response data
+        config: Configuration object providing response_format; when omitted,
+            the RESPONSE_FORMAT environment variable is used
+        
+    Returns:
+        Compact JSON, or JSON indented by two spaces for the "pretty" format
+    """
+    if config is not None:
+        response_format = config.response_format
+    else:
+        response_format = os.environ.get("RESPONSE_FORMAT", DEFAULT_RESPONSE_FORMAT).lower()
+    
+    indent = None if response_format == "compact" else 2
+    return json_backend.dumps(data, indent=indent)
+
+
+def circuit_error_details(data: Any) -> Optional[Dict[str, Any]]:
+    """Return the endpoint, reason and retry_after of a circuit breaker rejection, else None."""
+    circuit = circuit_rejection(data)
+    if circuit is None:
+        return None
+    return {key: circuit.get(key) for key in ("endpoint", "reason", "retry_after")}
+
+
 def format_error_response(
     status_code: int,
     error_type: str,
@@ -27,8 +59,24 @@ def format_error_response(
     metabase_error: Optional[Dict[str, Any]] = None,
     request_info: Optional[Dict[str, Any]] = None,
     raw_response: Optional[str] = None,
+    response_data: Optional[Any] = None,
 ) -> str:
-    """Format an error response for Claude."""
+    """Format an error response for Claude.
+    
+    A request rejected by an open circuit breaker is reported as a 503
+    ``circuit_open`` error with the endpoint, reason and retry_after, whether
+    the rejection is in response_data or raw_response, or is the
+    CircuitOpenError being handled.
+    """
+    circuit = circuit_error_details(response_data) or circuit_error_details(raw_response)
+    if circuit is None:
+        handled = sys.exc_info()[1]
+        if isinstance(handled, CircuitOpenError):
+            circuit = circuit_error_details(handled.details)
+    if circuit is not None:
+        status_code = 503
+        error_type = CIRCUIT_OPEN_ERROR
+    
     error_data = {
         "success": False,
         "error": {
@@ -38,6 +86,9 @@ def format_error_response(
         },
     }
     
+    if circuit is not None:
+        error_data["error"]["circuit"] = circuit
+    
     if metabase_error:
         error_data["error"]["metabase_error"] = metabase_error
     
@@ -47,7 +98,7 @@ def format_error_response(
     if raw_response:
         error_data["error"]["raw_response"] = raw_response
     
-    return json.dumps(error_data, indent=2)
+    return serialize_response(error_data)
 
 
 def check_response_size(response: str, config) -> str:
@@ -82,4 +133,147 @@ def check_response_size(response: str, config) -> str:
         }
     }
     
-    return json.dumps(error_response, indent=2)
+    return serialize_response(error_response, config)
+
+
+
+def _get_path(data: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _with_path(data: Dict[str, Any], path: Tuple[str, ...], value: Any) -> Dict[str, Any]:
+    """Return a copy of data with the value at path replaced, copying only the dicts on the path."""
+    copy = dict(data)
+    if len(path) == 1:
+        copy[path[0]] = value
+    else:
+        copy[path[0]] = _with_path(data[path[0]], path[1:], value)
+    return copy
+
+
+def fit_response_to_limit(
+    data: Dict[str, Any],
+    list_path: Tuple[str, ...],
+    config,
+    how_to_fetch_rest: str,
+    on_truncate: Optional[Callable[[], Dict[str, Any]]] = None,
+) -> str:
+    """Serialize a response, trimming a list in it to fit the response size limit.
+    
+    Items are measured one at a time until the budget left by the rest of the
+    response is used up, so large results are never serialized in full. When
+    items are dropped, a "truncation" entry reports how many were returned and
+    omitted, and how to retrieve the rest.
+    
+    Args:
+        data: The response data
+        list_path: Keys leading to the list to trim (e.g. ("data", "rows"))
+        config: Configuration object containing size limit and response format
+        how_to_fetch_rest: Guidance for retrieving the omitted items
+        on_truncate: Called once if items are dropped; the fields it returns are
+            added to the truncation entry (e.g. a result handle)
+        
+    Returns:
+        Serialized response within the size limit, or the size-exceeded error if
+        even the response without any items is too large
+    """
+    items: List[Any] = _get_path(data, list_path)
+    limit = config.response_size_limit
+    if not isinstance(items, list) or not items:
+        return check_response_size(serialize_response(data, config), config)
+    
+    total = len(items)
+    truncation = {
+        "truncated": True,
+        "field": ".".join(list_path),
+        "returned": total,
+        "omitted": total,
+        "total": total,
+        "size_limit": limit,
+        "how_to_fetch_rest": how_to_fetch_rest,
+    }
+    pretty = config.response_format != "compact"
+    # Room for the list's own closing line
+    indent = 2 * (len(list_path) + 1) if pretty else 0
+    
+    def budget() -> int:
+        envelope = _with_path(data, list_path, [])
+        envelope["truncation"] = truncation
+        return limit - len(serialize_response(envelope, config)) - indent - 2
+    
+    available = budget()
+    costs: List[int] = []
+    used = 0
+    for item in items:
+        text = serialize_response(item, config)
+        if pretty:
+            cost = len(text) + (text.count("\n") + 1) * indent + 2
+        else:
+            cost = len(text) + 1
+        used += cost
+        if used > available:
+            break
+        costs.append(cost)
+    
+    if len(costs) == total:
+        return check_response_size(serialize_response(data, config), config)
+    
+    kept = len(costs)
+    if on_truncate is not None:
+        truncation.update(on_truncate())
+        available = budget()
+        used = sum(costs)
+        while kept and used > available:
+            kept -= 1
+            used -= costs[kept]
+    
+    # The estimate is close but not exact; shrink further in the rare case it undershoots
+    for _ in range(3):
+        truncation.update(returned=kept, omitted=total - kept)
+        shaped = _with_path(data, list_path, items[:kept])
+        shaped["truncation"] = truncation
+        response = serialize_response(shaped, config)
+        if len(response) <= limit or kept == 0:
+            break
+        kept = int(kept * limit / len(response))
+    
+    logger.info(f"Trimmed {'.'.join(list_path)} to {kept} of {total} items to fit the response size limit")
+    return check_response_size(response, config)
+
+
+def page_through_result(
+    metabase_ctx: MetabaseContext,
+    cols: List[Dict[str, Any]],
+    rows: List[Any],
+    source: Dict[str, Any],
+) -> Callable[[], Dict[str, Any]]:
+    """Build an on_truncate callback that keeps the full result for fetch_result_page.
+    
+    Args:
+        metabase_ctx: Lifespan context holding the result store
+        cols: Column metadata of the result
+        rows: All rows of the result
+        source: Description of the query that produced the result
+        
+    Returns:
+        Callback storing the result and returning its handle and paging guidance,
+        or nothing if the result store cannot hold it
+    """
+    def on_truncate() -> Dict[str, Any]:
+        handle = metabase_ctx.results.put(cols, rows, source)
+        if handle is None:
+            return {}
+        return {
+            "result_handle": handle,
+            "how_to_fetch_rest": (
+                f"Call fetch_result_page with handle \"{handle}\" and offset set to \"returned\" "
+                "to read the remaining rows without re-running the query; pass columns to "
+                "select fewer columns per page."
+            ),
+        }
+    
+    return on_truncate
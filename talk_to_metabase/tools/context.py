@@ -2,14 +2,13 @@
 Context guidelines tool for Metabase MCP server.
 """
 
-import json
 import logging
 from typing import Optional
 
 from mcp.server.fastmcp import Context
 
 from ..server import get_server_instance
-from .common import format_error_response, check_response_size, get_metabase_client
+from .common import format_error_response, check_response_size, get_metabase_client, serialize_response
 
 logger = logging.getLogger(__name__)
 
@@ -269,7 +268,7 @@ async def get_metabase_guidelines(ctx: Context) -> str:
         logger.info("Guidelines provided successfully")
         
         # Convert to JSON string
-        response = json.dumps(response_data, indent=2)
+        response = serialize_response(response_data, config)
         
         # Check response size
         return check_response_size(response, config)
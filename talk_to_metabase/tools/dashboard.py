@@ -2,15 +2,25 @@
 Dashboard operations MCP tools.
 """
 
-import json
+import asyncio
 import logging
 import time
 from typing import Dict, List, Optional, Any
 
 from mcp.server.fastmcp import Context, FastMCP
 
+from ..circuit import CIRCUIT_OPEN_ERROR
+from ..dashboard_cache import TabIndex
 from ..server import get_server_instance
-from .common import format_error_response, get_metabase_client, check_response_size
+from .common import (
+    check_response_size,
+    circuit_error_details,
+    fit_response_to_limit,
+    format_error_response,
+    get_metabase_client,
+    page_through_result,
+    serialize_response,
+)
 from .dashcards import (
     validate_dashcards_helper, 
     validate_tabs_helper,
@@ -70,12 +80,10 @@ async def get_dashboard(id: int, ctx: Context) -> str:
             simplified_data["dashcard_count"] = 0
             logger.info("Dashboard has no cards")
             
-        # Convert data to JSON string
-        response = json.dumps(simplified_data, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response = serialize_response(simplified_data, config)
         return check_response_size(response, config)
     except Exception as e:
         logger.error(f"Error getting dashboard {id}: {e}")
@@ -121,12 +129,10 @@ async def create_dashboard(
     
     try:
         data = await client.create_resource("dashboard", dashboard_data)
-        # Convert data to JSON string
-        response = json.dumps(data, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response = serialize_response(data, config)
         return check_response_size(response, config)
     except Exception as e:
         logger.error(f"Error creating dashboard: {e}")
@@ -236,52 +242,52 @@ async def update_dashboard(
     if dashcards is not None:
         validation_result = validate_dashcards_helper(dashcards)
         if not validation_result["valid"]:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "Invalid dashcards format",
                 "validation_errors": validation_result["errors"],
                 "help": "Call GET_DASHCARDS_SCHEMA to understand the correct format."
-            }, indent=2)
+            })
     
     # Validate tabs if provided
     if tabs is not None:
         tabs_validation_result = validate_tabs_helper(tabs)
         if not tabs_validation_result["valid"]:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "Invalid tabs format",
                 "validation_errors": tabs_validation_result["errors"],
                 "help": "Tabs must have 'name' field (string) and optional 'id' field (integer). Use negative IDs for new tabs."
-            }, indent=2)
+            })
     
     # Validate dashboard parameters if provided
     if parameters is not None:
         parameters_validation_result = validate_dashboard_parameters_helper(parameters)
         if not parameters_validation_result["valid"]:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "Invalid dashboard parameters format",
                 "validation_errors": parameters_validation_result["errors"],
                 "help": "Call GET_DASHBOARD_PARAMETERS_DOCUMENTATION to understand the correct format. Required fields: name, type."
-            }, indent=2)
+            })
         
         # Process parameters with full validation
         try:
             processed_parameters, processing_errors = await process_dashboard_parameters(client, parameters)
             if processing_errors:
-                return json.dumps({
+                return serialize_response({
                     "success": False,
                     "error": "Dashboard parameters processing failed",
                     "validation_errors": processing_errors,
                     "help": "Check parameter configuration and ensure referenced cards are accessible."
-                }, indent=2)
+                })
             parameters = processed_parameters
         except Exception as e:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "Dashboard parameters processing error",
                 "message": str(e)
-            }, indent=2)
+            })
     
     # Process parameter mappings if both dashcards and parameters are provided
     if dashcards is not None and parameters is not None:
@@ -299,12 +305,12 @@ async def update_dashboard(
                 )
                 
                 if mapping_errors:
-                    return json.dumps({
+                    return serialize_response({
                         "success": False,
                         "error": "Parameter mapping validation failed",
                         "validation_errors": mapping_errors,
                         "help": "Check that dashboard parameter names and card parameter names match exactly."
-                    }, indent=2)
+                    })
                 
                 # Process parameter mappings to convert from name-based to ID-based
                 processed_dashcards, processing_errors = await process_parameter_mappings(
@@ -312,22 +318,22 @@ async def update_dashboard(
                 )
                 
                 if processing_errors:
-                    return json.dumps({
+                    return serialize_response({
                         "success": False,
                         "error": "Parameter mapping processing failed",
                         "validation_errors": processing_errors,
                         "help": "Check that parameter names match between dashboard and card configurations."
-                    }, indent=2)
+                    })
                 
                 # Replace original dashcards with processed ones
                 dashcards = processed_dashcards
                 
             except Exception as e:
-                return json.dumps({
+                return serialize_response({
                     "success": False,
                     "error": "Parameter mapping processing error",
                     "message": str(e)
-                }, indent=2)
+                })
     
     try:
         # Prepare update payload with only the fields to be updated
@@ -351,10 +357,10 @@ async def update_dashboard(
         
         # If no fields were provided to update, return early
         if not update_data:
-            return json.dumps({
+            return serialize_response({
                 "success": False,
                 "error": "No fields provided for update"
-            }, indent=2)
+            })
         
         # Perform the update
         data, status, error = await client.auth.make_request(
@@ -364,6 +370,7 @@ async def update_dashboard(
         if error:
             return format_error_response(
                 status_code=status,
+                response_data=data,
                 error_type="update_error",
                 message=error,
                 request_info={
@@ -372,15 +379,18 @@ async def update_dashboard(
                 }
             )
         
+        # Later get_dashboard_tab pages must not come from the old payload
+        ctx.request_context.lifespan_context.dashboards.invalidate(id)
+        
         # Return a concise success response with essential info
-        return json.dumps({
+        return serialize_response({
             "success": True,
             "dashboard_id": data.get("id"),
             "name": data.get("name"),
             "dashcard_count": len(data.get("dashcards", [])) if "dashcards" in data else None,
             "tab_count": len(data.get("tabs", [])) if "tabs" in data else None,
             "parameter_count": len(data.get("parameters", [])) if "parameters" in data else None
-        }, indent=2)
+        })
         
     except Exception as e:
         logger.error(f"Error updating dashboard {id}: {e}")
@@ -395,6 +405,123 @@ async def update_dashboard(
         )
 
 
+def _has_tabs(data: Dict[str, Any]) -> bool:
+    """Whether a dashboard has explicit tabs."""
+    return bool("tabs" in data and isinstance(data["tabs"], list) and data["tabs"])
+
+
+def _check_tab(data: Dict[str, Any], dashboard_id: int, tab_id: Optional[int]) -> Optional[str]:
+    """
+    Check that tab_id selects a tab of the dashboard.
+    
+    Args:
+        data: Dashboard data
+        dashboard_id: Dashboard ID
+        tab_id: Requested tab ID, or None for single-tab dashboards
+        
+    Returns:
+        Error response as JSON string, or None if the tab is valid
+    """
+    has_tabs = _has_tabs(data)
+    
+    # If tab_id is provided, validate it
+    if tab_id is not None:
+        if not has_tabs:
+            # No tabs but tab_id was provided
+            return format_error_response(
+                status_code=400,
+                error_type="invalid_tab",
+                message=f"Dashboard {dashboard_id} does not have explicit tabs, but tab_id {tab_id} was provided",
+                request_info={"dashboard_id": dashboard_id, "tab_id": tab_id}
+            )
+        
+        # Check if the tab_id exists
+        tab_exists = any(tab["id"] == tab_id for tab in data["tabs"])
+        if not tab_exists:
+            return format_error_response(
+                status_code=404,
+                error_type="tab_not_found",
+                message=f"Tab {tab_id} not found in dashboard {dashboard_id}",
+                request_info={"dashboard_id": dashboard_id, "tab_id": tab_id}
+            )
+    elif has_tabs:
+        # No tab_id provided but dashboard has tabs
+        return format_error_response(
+            status_code=400,
+            error_type="missing_tab_id",
+            message=f"Dashboard {dashboard_id} has multiple tabs, but no tab_id was provided",
+            request_info={"dashboard_id": dashboard_id, "available_tabs": data["tabs"]}
+        )
+    
+    return None
+
+
+def _summarize_dashcard(dashcard: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace the full card and series objects of a dashcard with summaries."""
+    # Process card data to make it more manageable
+    processed_dashcard = dashcard.copy()
+    
+    # Process regular card
+    if "card" in processed_dashcard and processed_dashcard["card"] is not None:
+        card = processed_dashcard["card"]
+        processed_dashcard["card_summary"] = {
+            "id": card.get("id"),
+            "name": card.get("name"),
+            "description": card.get("description"),
+            "display": card.get("display"),
+            "collection_id": card.get("collection_id"),
+            "database_id": card.get("database_id"),
+            "table_id": card.get("table_id"),
+            "query_type": card.get("query_type"),
+        }
+        # Remove the full card object but keep visualization settings
+        if "visualization_settings" in card:
+            processed_dashcard["card_visualization_settings"] = card["visualization_settings"]
+        processed_dashcard["card"] = None
+    
+    # Process series cards if present
+    if "series" in processed_dashcard and isinstance(processed_dashcard["series"], list):
+        series_summaries = []
+        for series_card in processed_dashcard["series"]:
+            if series_card is not None:
+                series_summaries.append({
+                    "id": series_card.get("id"),
+                    "name": series_card.get("name"),
+                    "description": series_card.get("description")
+                })
+        processed_dashcard["series_summary"] = series_summaries
+        processed_dashcard["series"] = []
+    
+    return processed_dashcard
+
+
+def _build_tab_index(data: Dict[str, Any]) -> TabIndex:
+    """
+    Group a dashboard's summarized dashcards by tab, in display order.
+    
+    Dashboards without tabs have all their dashcards under the None key.
+    """
+    has_tabs = _has_tabs(data)
+    tab_index: TabIndex = {}
+    if has_tabs:
+        for tab in data["tabs"]:
+            tab_index[tab["id"]] = []
+    else:
+        tab_index[None] = []
+    
+    if "dashcards" in data and isinstance(data["dashcards"], list):
+        for dashcard in data["dashcards"]:
+            key = dashcard.get("dashboard_tab_id") if has_tabs else None
+            if key in tab_index:
+                tab_index[key].append(_summarize_dashcard(dashcard))
+    
+    # Sort dashcards by position (top to bottom, left to right)
+    # This means sorting primarily by row and secondarily by col
+    for dashcards in tab_index.values():
+        dashcards.sort(key=lambda card: (card.get("row", 0), card.get("col", 0)))
+    return tab_index
+
+
 @mcp.tool(name="get_dashboard_tab", description="Retrieve cards for a specific dashboard tab with pagination")
 async def get_dashboard_tab(
     dashboard_id: int, 
@@ -436,87 +563,24 @@ async def get_dashboard_tab(
         )
     
     try:
-        # Get the full dashboard first
-        data = await client.get_resource("dashboard", dashboard_id)
+        # Later pages are served from the dashboard fetched for the first page;
+        # the first page always refetches so that paging starts from fresh data
+        dashboard_cache = ctx.request_context.lifespan_context.dashboards
+        entry = dashboard_cache.get(dashboard_id) if page > 1 else None
+        if entry is None:
+            data = await client.get_resource("dashboard", dashboard_id)
+            entry = dashboard_cache.put(dashboard_id, data, _build_tab_index)
+        data = entry.data
         
         # Check if the dashboard has tabs
-        has_tabs = "tabs" in data and isinstance(data["tabs"], list) and data["tabs"]
-        
-        # If tab_id is provided, validate it
-        if tab_id is not None:
-            if not has_tabs:
-                # No tabs but tab_id was provided
-                return format_error_response(
-                    status_code=400,
-                    error_type="invalid_tab",
-                    message=f"Dashboard {dashboard_id} does not have explicit tabs, but tab_id {tab_id} was provided",
-                    request_info={"dashboard_id": dashboard_id, "tab_id": tab_id}
-                )
-            
-            # Check if the tab_id exists
-            tab_exists = any(tab["id"] == tab_id for tab in data["tabs"])
-            if not tab_exists:
-                return format_error_response(
-                    status_code=404,
-                    error_type="tab_not_found",
-                    message=f"Tab {tab_id} not found in dashboard {dashboard_id}",
-                    request_info={"dashboard_id": dashboard_id, "tab_id": tab_id}
-                )
-        elif has_tabs:
-            # No tab_id provided but dashboard has tabs
-            return format_error_response(
-                status_code=400,
-                error_type="missing_tab_id",
-                message=f"Dashboard {dashboard_id} has multiple tabs, but no tab_id was provided",
-                request_info={"dashboard_id": dashboard_id, "available_tabs": data["tabs"]}
-            )
+        has_tabs = _has_tabs(data)
         
-        # Filter dashcards by tab_id if tabs exist, otherwise return all cards
-        filtered_dashcards = []
+        tab_error = _check_tab(data, dashboard_id, tab_id)
+        if tab_error:
+            return tab_error
         
-        if "dashcards" in data and isinstance(data["dashcards"], list):
-            for dashcard in data["dashcards"]:
-                # For single-tab dashboards or cards with matching tab_id
-                if (not has_tabs) or ("dashboard_tab_id" in dashcard and dashcard["dashboard_tab_id"] == tab_id):
-                    # Process card data to make it more manageable
-                    processed_dashcard = dashcard.copy()
-                    
-                    # Process regular card
-                    if "card" in processed_dashcard and processed_dashcard["card"] is not None:
-                        card = processed_dashcard["card"]
-                        processed_dashcard["card_summary"] = {
-                            "id": card.get("id"),
-                            "name": card.get("name"),
-                            "description": card.get("description"),
-                            "display": card.get("display"),
-                            "collection_id": card.get("collection_id"),
-                            "database_id": card.get("database_id"),
-                            "table_id": card.get("table_id"),
-                            "query_type": card.get("query_type"),
-                        }
-                        # Remove the full card object but keep visualization settings
-                        if "visualization_settings" in card:
-                            processed_dashcard["card_visualization_settings"] = card["visualization_settings"]
-                        processed_dashcard["card"] = None
-                    
-                    # Process series cards if present
-                    if "series" in processed_dashcard and isinstance(processed_dashcard["series"], list):
-                        series_summaries = []
-                        for series_card in processed_dashcard["series"]:
-                            if series_card is not None:
-                                series_summaries.append({
-                                    "id": series_card.get("id"),
-                                    "name": series_card.get("name"),
-                                    "description": series_card.get("description")
-                                })
-                        processed_dashcard["series_summary"] = series_summaries
-                        processed_dashcard["series"] = []
-                    
-                    filtered_dashcards.append(processed_dashcard)
-            
-        # Sort dashcards by position (top to bottom, left to right)
-        # This means sorting primarily by row and secondarily by col
-        filtered_dashcards.sort(key=lambda card: (card.get("row", 0), card.get("col", 0)))
+        # Dashcards of the requested tab (all dashcards for single-tab dashboards)
+        filtered_dashcards = entry.tab_index.get(tab_id if has_tabs else None, [])
         
         # Apply pagination
         total_cards = len(filtered_dashcards)
@@ -570,12 +634,10 @@ async def get_dashboard_tab(
                   f"for dashboard {dashboard_id}" + 
                   (f", tab {tab_id}" if tab_id is not None else ""))
         
-        # Convert data to JSON string
-        response = json.dumps(tab_data, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response = serialize_response(tab_data, config)
         return check_response_size(response, config)
     except Exception as e:
         logger.error(f"Error getting dashboard tab: {e}")
@@ -660,6 +722,7 @@ async def execute_card_query(
         if error:
             return format_error_response(
                 status_code=status,
+                response_data=data,
                 error_type="query_error",
                 message=str(error),
                 request_info={
@@ -694,13 +757,24 @@ async def execute_card_query(
             # Add metadata to the response
             data["metadata"] = metadata
         
-        # Convert to JSON string
-        response = json.dumps(data, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
-        return check_response_size(response, config)
+        return fit_response_to_limit(
+            data,
+            ("data", "rows"),
+            config,
+            how_to_fetch_rest=(
+                "Narrow the results with card parameters, or run the card's query with "
+                "run_dataset_query and page through the remaining rows with LIMIT/OFFSET."
+            ),
+            on_truncate=page_through_result(
+                metabase_ctx,
+                data.get("data", {}).get("cols", []),
+                data.get("data", {}).get("rows", []),
+                {"endpoint": f"/api/{endpoint}", "card_id": card_id},
+            ),
+        )
         
     except Exception as e:
         logger.error(f"Error executing card query: {e}")
@@ -714,3 +788,164 @@ async def execute_card_query(
                 "dashcard_id": dashcard_id
             }
         )
+
+
+def _dashcard_parameters(dashcard: Dict[str, Any], parameters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the parameter values that are mapped to a dashcard, as the Metabase UI does."""
+    mapped = {
+        mapping.get("parameter_id")
+        for mapping in dashcard.get("parameter_mappings") or []
+        if mapping.get("card_id") in (None, dashcard.get("card_id"))
+    }
+    return [param for param in parameters if param.get("id") in mapped]
+
+
+def _compact_card_result(data: Dict[str, Any], max_rows: int) -> Dict[str, Any]:
+    """Reduce a card query result to column names and the first rows."""
+    result_data = data.get("data") or {}
+    rows = result_data.get("rows") or []
+    compact = {
+        "status": data.get("status"),
+        "columns": [col.get("display_name") or col.get("name") for col in result_data.get("cols") or []],
+        "rows": rows[:max_rows],
+        "row_count": data.get("row_count", len(rows)),
+        "rows_truncated": len(rows) > max_rows,
+        "running_time_ms": data.get("running_time"),
+    }
+    if data.get("error"):
+        compact["error"] = {"message": data.get("error"), "error_type": data.get("error_type")}
+    return compact
+
+
+@mcp.tool(name="execute_dashboard_tab", description="Execute every card of a dashboard tab concurrently and return compact results per card")
+async def execute_dashboard_tab(
+    dashboard_id: int,
+    ctx: Context,
+    tab_id: Optional[int] = None,
+    parameters: Optional[List[Dict[str, Any]]] = None,
+    max_rows_per_card: int = 10
+) -> str:
+    """
+    Execute all cards of a dashboard tab at once, in the dashboard context.
+    
+    Cards run concurrently (bounded by the server's dashboard concurrency),
+    so a tab costs about as long as its slowest card instead of the sum of
+    all cards. Each card's result is reduced to its column names and first
+    rows, with per-card timings and errors; use execute_card_query with
+    dashboard_id and dashcard_id for the full result of one card.
+    
+    Args:
+        dashboard_id: Dashboard ID
+        ctx: MCP context
+        tab_id: Tab ID (required for dashboards with tabs)
+        parameters: Dashboard parameter values ({"id": ..., "value": ...}); each
+            card receives the values mapped to it
+        max_rows_per_card: Maximum number of rows returned per card (default: 10)
+        
+    Returns:
+        Per-card results, timings and errors as JSON string
+    """
+    logger.info(f"Tool called: execute_dashboard_tab(dashboard_id={dashboard_id}, tab_id={tab_id})")
+    
+    if max_rows_per_card < 0:
+        return format_error_response(
+            status_code=400,
+            error_type="invalid_parameter",
+            message="max_rows_per_card must be >= 0",
+            request_info={"dashboard_id": dashboard_id, "max_rows_per_card": max_rows_per_card}
+        )
+    
+    client = get_metabase_client(ctx)
+    metabase_ctx = ctx.request_context.lifespan_context
+    config = metabase_ctx.auth.config
+    
+    try:
+        data = await client.get_resource("dashboard", dashboard_id)
+    except Exception as e:
+        logger.error(f"Error getting dashboard {dashboard_id}: {e}")
+        return format_error_response(
+            status_code=500,
+            error_type="retrieval_error",
+            message=str(e),
+            request_info={"endpoint": f"/api/dashboard/{dashboard_id}", "method": "GET"}
+        )
+    
+    tab_error = _check_tab(data, dashboard_id, tab_id)
+    if tab_error:
+        return tab_error
+    
+    has_tabs = _has_tabs(data)
+    dashcards = [
+        dashcard for dashcard in data.get("dashcards") or []
+        if dashcard.get("card_id") is not None
+        and (not has_tabs or dashcard.get("dashboard_tab_id") == tab_id)
+    ]
+    dashcards.sort(key=lambda dashcard: (dashcard.get("row", 0), dashcard.get("col", 0)))
+    
+    semaphore = asyncio.Semaphore(max(1, config.dashboard_query_concurrency))
+    dashboard_load_id = f"query_{dashboard_id}_{int(time.time())}"
+    
+    async def run_dashcard(dashcard: Dict[str, Any]) -> Dict[str, Any]:
+        card_id = dashcard["card_id"]
+        endpoint = f"dashboard/{dashboard_id}/dashcard/{dashcard['id']}/card/{card_id}/query"
+        card_result = {
+            "dashcard_id": dashcard["id"],
+            "card_id": card_id,
+            "name": (dashcard.get("card") or {}).get("name"),
+            "display": (dashcard.get("card") or {}).get("display"),
+        }
+        async with semaphore:
+            started_at = time.monotonic()
+            try:
+                result, status, error = await client.auth.make_request(
+                    "POST",
+                    endpoint,
+                    json={
+                        "parameters": _dashcard_parameters(dashcard, parameters or []),
+                        "dashboard_load_id": dashboard_load_id,
+                    },
+                )
+            except Exception as e:
+                result, status, error = None, 500, str(e)
+            card_result["elapsed_seconds"] = round(time.monotonic() - started_at, 3)
+        
+        if error:
+            card_result["success"] = False
+            card_result["error"] = {"status_code": status, "message": str(error)}
+            circuit = circuit_error_details(result)
+            if circuit is not None:
+                card_result["error"]["error_type"] = CIRCUIT_OPEN_ERROR
+                card_result["error"]["circuit"] = circuit
+        else:
+            card_result.update(_compact_card_result(result or {}, max_rows_per_card))
+            card_result["success"] = "error" not in card_result
+        return card_result
+    
+    started_at = time.monotonic()
+    results = await asyncio.gather(*(run_dashcard(dashcard) for dashcard in dashcards))
+    elapsed = time.monotonic() - started_at
+    
+    failed = sum(1 for result in results if not result["success"])
+    logger.info(
+        f"Executed {len(results)} cards of dashboard {dashboard_id} in {elapsed:.2f}s ({failed} failed)"
+    )
+    
+    response_data = {
+        "dashboard_id": dashboard_id,
+        "name": data.get("name"),
+        "tab_id": tab_id,
+        "card_count": len(results),
+        "failed_count": failed,
+        "elapsed_seconds": round(elapsed, 3),
+        "cards": results,
+    }
+    
+    return fit_response_to_limit(
+        response_data,
+        ("cards",),
+        config,
+        how_to_fetch_rest=(
+            "Call execute_dashboard_tab again with a smaller max_rows_per_card, or run the remaining "
+            "cards one by one with execute_card_query using dashboard_id and dashcard_id."
+        ),
+    )
@@ -10,7 +10,6 @@ This module provides comprehensive dashboard parameter support including:
 - Comprehensive validation
 """
 
-import json
 import logging
 import random
 import string
@@ -21,7 +20,7 @@ from mcp.server.fastmcp import Context
 
 from ..server import get_server_instance
 from ..resources import load_json_resource, load_text_resource
-from .common import format_error_response, get_metabase_client, check_response_size
+from .common import format_error_response, get_metabase_client, check_response_size, serialize_response
 
 logger = logging.getLogger(__name__)
 
@@ -711,11 +710,10 @@ async def get_dashboard_parameters_documentation(ctx: Context) -> str:
             )
         
         # Return the schema directly - all documentation is embedded
-        response = json.dumps(schema, indent=2)
-        
         # Check response size
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response = serialize_response(schema, config)
         return check_response_size(response, config)
         
     except Exception as e:
@@ -2,14 +2,13 @@
 Database & Table operations MCP tools.
 """
 
-import json
 import logging
 from typing import Dict, List, Optional
 
 from mcp.server.fastmcp import Context, FastMCP
 
 from ..server import get_server_instance
-from .common import format_error_response, get_metabase_client, check_response_size
+from .common import format_error_response, get_metabase_client, check_response_size, serialize_response
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -42,6 +41,7 @@ async def list_databases(ctx: Context) -> str:
         if error:
             return format_error_response(
                 status_code=status,
+                response_data=data,
                 error_type="retrieval_error",
                 message=error,
                 request_info={"endpoint": "/api/database", "method": "GET"}
@@ -76,12 +76,10 @@ async def list_databases(ctx: Context) -> str:
             "databases": simplified_databases
         }
         
-        # Convert to JSON string
-        response = json.dumps(response_data, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response = serialize_response(response_data, config)
         return check_response_size(response, config)
     except Exception as e:
         logger.error(f"Error listing databases: {e}")
@@ -118,6 +116,7 @@ async def get_database_metadata(id: int, ctx: Context) -> str:
         if error:
             return format_error_response(
                 status_code=status,
+                response_data=data,
                 error_type="retrieval_error",
                 message=error,
                 request_info={"endpoint": f"/api/database/{id}/metadata", "method": "GET"}
@@ -163,12 +162,10 @@ async def get_database_metadata(id: int, ctx: Context) -> str:
         response_data["table_count"] = sum(len(tables) for tables in tables_by_schema.values())
         response_data["schema_count"] = len(tables_by_schema)
         
-        # Convert to JSON string
-        response = json.dumps(response_data, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response = serialize_response(response_data, config)
         return check_response_size(response, config)
     except Exception as e:
         logger.error(f"Error getting database metadata: {e}")
@@ -222,6 +219,7 @@ async def get_table_query_metadata(
         if error:
             return format_error_response(
                 status_code=status,
+                response_data=data,
                 error_type="retrieval_error",
                 message=error,
                 request_info={"endpoint": f"/api/table/{id}/query_metadata", "method": "GET", "params": params}
@@ -292,12 +290,10 @@ async def get_table_query_metadata(
             "date_fields": date_fields
         }
         
-        # Convert to JSON string
-        response = json.dumps(response_data, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response = serialize_response(response_data, config)
         return check_response_size(response, config)
     except Exception as e:
         logger.error(f"Error getting table query metadata: {e}")
@@ -2,14 +2,19 @@
 Dataset query operations MCP tools.
 """
 
-import json
 import logging
-from typing import Dict, Optional, Any
+from typing import Any, Dict, List, Optional
 
 from mcp.server.fastmcp import Context, FastMCP
 
+from ..query_cache import query_cache_key
 from ..server import get_server_instance
-from .common import format_error_response, get_metabase_client, check_response_size
+from .common import (
+    fit_response_to_limit,
+    format_error_response,
+    get_metabase_client,
+    page_through_result,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -25,23 +30,42 @@ async def run_dataset_query(
     ctx: Context,
     native: Optional[Dict[str, Any]] = None,
     query: Optional[Dict[str, Any]] = None,
-    type: str = "native"
+    type: str = "native",
+    use_cache: bool = True,
+    max_rows: Optional[int] = None
 ) -> str:
     """
     Execute a query directly against a database using the Metabase dataset API.
     Supports both native SQL queries and structured MBQL queries.
     
+    Results of identical queries (same database, type and query, ignoring key
+    order and SQL whitespace) are served from an in-process cache for a few
+    minutes; the "cache" field of the response says whether the result came
+    from the cache and how old it is.
+    
+    Results are limited to max_rows rows (a preview) through Metabase query
+    constraints, so the warehouse stops early; "truncated" in the response
+    says whether the query had more rows. Use export_dataset_results for
+    complete large results.
+    
     Args:
         database: Database ID
         ctx: MCP context
         native: Native query object with SQL (required for native queries)
         query: MBQL query object (required for structured queries)
         type: Query type, either "native" or "query" (default: "native")
+        use_cache: Serve a cached result if one is fresh enough (default: True);
+            False always runs the query and refreshes the cache
+        max_rows: Maximum number of rows to return (default: the server's
+            configured preview size; 0 for Metabase's own limit of 2000 rows)
         
     Returns:
         Query results as JSON string with essential fields
     """
-    logger.info(f"Tool called: run_dataset_query(database={database}, type={type})")
+    logger.info(
+        f"Tool called: run_dataset_query(database={database}, type={type}, "
+        f"use_cache={use_cache}, max_rows={max_rows})"
+    )
     
     # Validate parameters
     if type == "native" and not native:
@@ -68,6 +92,14 @@ async def run_dataset_query(
             request_info={"database": database, "type": type}
         )
     
+    if max_rows is not None and max_rows < 0:
+        return format_error_response(
+            status_code=400,
+            error_type="invalid_parameter",
+            message="max_rows must be >= 0",
+            request_info={"database": database, "type": type, "max_rows": max_rows}
+        )
+    
     client = get_metabase_client(ctx)
     
     try:
@@ -79,60 +111,110 @@ async def run_dataset_query(
         else:
             query_data["query"] = query
         
-        # Execute the query
-        data, status, error = await client.auth.make_request(
-            "POST", "dataset", json=query_data
-        )
+        metabase_ctx = ctx.request_context.lifespan_context
+        config = metabase_ctx.auth.config
+        query_cache = metabase_ctx.query_cache
+        if max_rows is None:
+            max_rows = config.dataset_max_rows
+        cache_key = query_cache_key(query_data, max_rows)
         
-        if error:
-            # For dataset errors, the response often contains useful information
-            # about SQL errors, so include it in the error response
-            return format_error_response(
-                status_code=status,
-                error_type="query_error",
-                message=error,
-                request_info={
-                    "endpoint": "/api/dataset",
-                    "method": "POST", 
-                    "database": database,
-                    "query_type": type
-                },
-                raw_response=data
+        cached = query_cache.get(cache_key) if use_cache and query_cache.enabled else None
+        if cached is not None:
+            essential_data, age = cached
+            cache_info = {"hit": True, "age_seconds": round(age, 1)}
+        else:
+            # Ask for one row more than the limit to detect truncation
+            request_data = query_data
+            if max_rows:
+                request_data = {
+                    **query_data,
+                    "constraints": {
+                        "max-results": max_rows + 1,
+                        "max-results-bare-rows": max_rows + 1
+                    }
+                }
+            
+            # Execute the query
+            data, status, error = await client.auth.make_request(
+                "POST", "dataset", json=request_data
             )
-        
-        # Extract only essential fields for the response
-        essential_data = {
-            "data": {
-                "rows": data.get("data", {}).get("rows", []),
-                "cols": data.get("data", {}).get("cols", []),
-                "native_form": data.get("data", {}).get("native_form", {})
-            },
-            "status": data.get("status"),
-            "database_id": data.get("database_id"),
-            "started_at": data.get("started_at"),
-            "running_time": data.get("running_time"),
-            "row_count": data.get("row_count", len(data.get("data", {}).get("rows", []))),
-            "results_timezone": data.get("results_timezone")
-        }
-        
-        # Include error information if present
-        if data.get("error"):
-            essential_data["error"] = data.get("error")
-            essential_data["error_type"] = data.get("error_type")
             
-            # For more detailed error information
-            if data.get("stacktrace"):
-                essential_data["stacktrace"] = data.get("stacktrace")
+            if error:
+                # For dataset errors, the response often contains useful information
+                # about SQL errors, so include it in the error response
+                return format_error_response(
+                    status_code=status,
+                    error_type="query_error",
+                    message=error,
+                    request_info={
+                        "endpoint": "/api/dataset",
+                        "method": "POST", 
+                        "database": database,
+                        "query_type": type
+                    },
+                    raw_response=data
+                )
             
-            logger.error(f"Query failed with error: {data.get('error')}")
+            # Extract only essential fields for the response
+            essential_data = {
+                "data": {
+                    "rows": data.get("data", {}).get("rows", []),
+                    "cols": data.get("data", {}).get("cols", []),
+                    "native_form": data.get("data", {}).get("native_form", {})
+                },
+                "status": data.get("status"),
+                "database_id": data.get("database_id"),
+                "started_at": data.get("started_at"),
+                "running_time": data.get("running_time"),
+                "row_count": data.get("row_count", len(data.get("data", {}).get("rows", []))),
+                "results_timezone": data.get("results_timezone")
+            }
+            
+            # Include error information if present
+            if data.get("error"):
+                essential_data["error"] = data.get("error")
+                essential_data["error_type"] = data.get("error_type")
+            
+                # For more detailed error information
+                if data.get("stacktrace"):
+                    essential_data["stacktrace"] = data.get("stacktrace")
+            
+                logger.error(f"Query failed with error: {data.get('error')}")
+            
+            rows = essential_data["data"]["rows"]
+            essential_data["truncated"] = bool(max_rows) and len(rows) > max_rows
+            if essential_data["truncated"]:
+                essential_data["data"]["rows"] = rows[:max_rows]
+                essential_data["row_count"] = max_rows
+            essential_data["max_rows"] = max_rows or None
+            
+            # Only cache complete, successful results
+            cached = (
+                not essential_data.get("error")
+                and essential_data.get("status") == "completed"
+                and query_cache.put(cache_key, essential_data)
+            )
+            cache_info = {"hit": False, "cached": cached}
         
-        # Convert to JSON string
-        response = json.dumps(essential_data, indent=2)
+        # Cached results are shared, so annotate a copy
+        essential_data = {**essential_data, "cache": cache_info}
         
         # Check response size before returning
-        metabase_ctx = ctx.request_context.lifespan_context
-        config = metabase_ctx.auth.config
-        return check_response_size(response, config)
+        return fit_response_to_limit(
+            essential_data,
+            ("data", "rows"),
+            config,
+            how_to_fetch_rest=(
+                "Page through the remaining rows with LIMIT/OFFSET in native SQL or a limit clause "
+                "in MBQL, or aggregate, filter or select fewer columns to shrink the result."
+            ),
+            on_truncate=page_through_result(
+                metabase_ctx,
+                essential_data["data"]["cols"],
+                essential_data["data"]["rows"],
+                {"endpoint": "/api/dataset", "database": database, "query_type": type},
+            ),
+        )
         
     except Exception as e:
         logger.error(f"Error executing dataset query: {e}")
@@ -147,3 +229,86 @@ async def run_dataset_query(
                 "query_type": type
             }
         )
+
+
+@mcp.tool(name="fetch_result_page", description="Read rows of a large query result kept by the server, without re-running the query")
+async def fetch_result_page(
+    handle: str,
+    ctx: Context,
+    offset: int = 0,
+    limit: int = 100,
+    columns: Optional[List[str]] = None
+) -> str:
+    """
+    Read a page of rows from a query result kept behind a handle.
+    
+    run_dataset_query and execute_card_query return a result_handle in their
+    truncation details when a result is too large for one response.
+    
+    Args:
+        handle: Result handle returned in the truncation details
+        ctx: MCP context
+        offset: Index of the first row to return (default: 0)
+        limit: Maximum number of rows to return (default: 100)
+        columns: Column names to include (default: all columns)
+        
+    Returns:
+        Page of rows as JSON string with pagination metadata; continue from
+        offset plus the number of rows returned
+    """
+    logger.info(f"Tool called: fetch_result_page(handle={handle}, offset={offset}, limit={limit})")
+    
+    request_info = {"tool": "fetch_result_page", "handle": handle, "offset": offset, "limit": limit}
+    
+    if offset < 0 or limit <= 0:
+        return format_error_response(
+            status_code=400,
+            error_type="invalid_parameter",
+            message="offset must be >= 0 and limit must be > 0",
+            request_info=request_info
+        )
+    
+    metabase_ctx = ctx.request_context.lifespan_context
+    config = metabase_ctx.auth.config
+    
+    result = metabase_ctx.results.get(handle)
+    if result is None:
+        return format_error_response(
+            status_code=404,
+            error_type="result_not_found",
+            message=f"Result {handle} is unknown or has expired; run the query again to get a new handle",
+            request_info=request_info
+        )
+    
+    try:
+        page = result.page(offset, limit, columns)
+    except KeyError as e:
+        return format_error_response(
+            status_code=400,
+            error_type="invalid_parameter",
+            message=f"Unknown column(s): {e.args[0]}. Available columns: "
+                    f"{', '.join(str(col.get('name')) for col in result.cols)}",
+            request_info=request_info
+        )
+    
+    # The page may still be trimmed to the size limit, so the next offset is
+    # offset plus the number of rows actually returned
+    response_data = {
+        "handle": handle,
+        "data": page,
+        "offset": offset,
+        "limit": limit,
+        "total_rows": result.row_count,
+        "source": result.source
+    }
+    
+    return fit_response_to_limit(
+        response_data,
+        ("data", "rows"),
+        config,
+        how_to_fetch_rest=(
+            f"Call fetch_result_page again with a smaller limit, starting at offset {offset} "
+            "plus the number of rows returned, or pass columns to select fewer columns."
+        ),
+    )
+
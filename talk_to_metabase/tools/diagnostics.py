@@ -0,0 +1,58 @@
+"""
+Client diagnostics MCP tools.
+"""
+
+import logging
+
+from mcp.server.fastmcp import Context
+
+from ..server import get_server_instance
+from .common import format_error_response, check_response_size, serialize_response
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Register tools with the server
+mcp = get_server_instance()
+logger.info("Registering diagnostics tools with the server...")
+
+
+@mcp.tool(name="get_client_stats", description="Report connection pool utilization and client-side counters for the Metabase connection")
+async def get_client_stats(ctx: Context) -> str:
+    """
+    Report connection pool utilization and client-side counters.
+    
+    Useful to size the server and to check how much traffic the client-side
+    optimizations save (e.g. skipped session validations).
+    
+    Args:
+        ctx: MCP context
+        
+    Returns:
+        Client statistics as JSON string
+    """
+    logger.info("Tool called: get_client_stats()")
+    
+    try:
+        metabase_ctx = ctx.request_context.lifespan_context
+        auth = metabase_ctx.auth
+        
+        stats = auth.get_stats()
+        stats["result_store"] = metabase_ctx.results.snapshot()
+        stats["query_cache"] = metabase_ctx.query_cache.snapshot()
+        stats["jobs"] = metabase_ctx.jobs.snapshot()
+        stats["dashboard_cache"] = metabase_ctx.dashboards.snapshot()
+        stats["search_cache"] = metabase_ctx.search_cache.snapshot()
+        if metabase_ctx.search_index is not None:
+            stats["search_index"] = metabase_ctx.search_index.snapshot()
+        response = serialize_response(stats, auth.config)
+        
+        return check_response_size(response, auth.config)
+    except Exception as e:
+        logger.error(f"Error getting client stats: {e}")
+        return format_error_response(
+            status_code=500,
+            error_type="diagnostics_error",
+            message=str(e),
+            request_info={"tool": "get_client_stats"}
+        )
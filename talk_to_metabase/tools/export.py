@@ -0,0 +1,207 @@
+"""
+Result export MCP tools.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from mcp.server.fastmcp import Context
+
+from ..export import EXPORT_FORMATS, ExportFile, export_summary, resolve_export_path
+from ..server import get_server_instance
+from .common import format_error_response, get_metabase_client, serialize_response
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Register tools with the server
+mcp = get_server_instance()
+logger.info("Registering export tools with the server...")
+
+
+def _open_export(ctx: Context, filename: Optional[str], format: str, default_stem: str) -> ExportFile:
+    """Open the destination file of an export in the configured export directory."""
+    config = ctx.request_context.lifespan_context.auth.config
+    path = resolve_export_path(config.export_dir, filename, format, default_stem)
+    return ExportFile(path, format)
+
+
+@mcp.tool(name="export_card_results", description="Export the full result of a card to a local CSV or JSON file, without the row limit of query tools")
+async def export_card_results(
+    card_id: int,
+    ctx: Context,
+    format: str = "csv",
+    parameters: Optional[List[Dict[str, Any]]] = None,
+    filename: Optional[str] = None
+) -> str:
+    """
+    Stream a card's full result to a file in the export directory.
+
+    The file is written as the data arrives, so results of any size can be
+    exported; only a summary (path, row count, size) is returned.
+
+    Args:
+        card_id: ID of the card
+        ctx: MCP context
+        format: Export format, "csv" or "json" (default: "csv")
+        parameters: Parameter values to apply, as for execute_card_query
+        filename: File name inside the export directory (default: generated)
+
+    Returns:
+        Export summary as JSON string
+    """
+    logger.info(f"Tool called: export_card_results(card_id={card_id}, format={format})")
+
+    request_info = {
+        "endpoint": f"/api/card/{card_id}/query/{format}",
+        "method": "POST",
+        "card_id": card_id,
+        "format": format
+    }
+
+    if format not in EXPORT_FORMATS:
+        return format_error_response(
+            status_code=400,
+            error_type="invalid_parameter",
+            message=f"Invalid export format: {format}. Must be one of {', '.join(EXPORT_FORMATS)}",
+            request_info=request_info
+        )
+
+    client = get_metabase_client(ctx)
+
+    try:
+        export = _open_export(ctx, filename, format, f"card-{card_id}")
+    except (ValueError, OSError) as e:
+        return format_error_response(
+            status_code=400,
+            error_type="invalid_parameter",
+            message=str(e),
+            request_info=request_info
+        )
+
+    try:
+        await client.export_card(card_id, format, export.write, parameters=parameters)
+        export.commit()
+    except Exception as e:
+        export.abort()
+        logger.error(f"Error exporting card {card_id}: {e}")
+        return format_error_response(
+            status_code=500,
+            error_type="export_error",
+            message=str(e),
+            request_info=request_info
+        )
+
+    config = ctx.request_context.lifespan_context.auth.config
+    return serialize_response(
+        export_summary(export, format, {"card_id": card_id, "parameters": parameters or []}),
+        config
+    )
+
+
+@mcp.tool(name="export_dataset_results", description="Export the full result of a native SQL or MBQL query to a local CSV or JSON file")
+async def export_dataset_results(
+    database: int,
+    ctx: Context,
+    native: Optional[Dict[str, Any]] = None,
+    query: Optional[Dict[str, Any]] = None,
+    type: str = "native",
+    format: str = "csv",
+    filename: Optional[str] = None
+) -> str:
+    """
+    Stream the full result of an ad-hoc query to a file in the export directory.
+
+    Unlike run_dataset_query, the result is not capped at 2000 rows and is
+    never held in memory; only a summary (path, row count, size) is returned.
+
+    Args:
+        database: Database ID
+        ctx: MCP context
+        native: Native query object with SQL (required for native queries)
+        query: MBQL query object (required for structured queries)
+        type: Query type, either "native" or "query" (default: "native")
+        format: Export format, "csv" or "json" (default: "csv")
+        filename: File name inside the export directory (default: generated)
+
+    Returns:
+        Export summary as JSON string
+    """
+    logger.info(f"Tool called: export_dataset_results(database={database}, type={type}, format={format})")
+
+    request_info = {
+        "endpoint": f"/api/dataset/{format}",
+        "method": "POST",
+        "database": database,
+        "query_type": type,
+        "format": format
+    }
+
+    if type not in ["native", "query"]:
+        return format_error_response(
+            status_code=400,
+            error_type="invalid_parameter",
+            message=f"Invalid query type: {type}. Must be 'native' or 'query'",
+            request_info=request_info
+        )
+
+    if type == "native" and not native:
+        return format_error_response(
+            status_code=400,
+            error_type="missing_parameter",
+            message="Native query object is required for native query type",
+            request_info=request_info
+        )
+
+    if type == "query" and not query:
+        return format_error_response(
+            status_code=400,
+            error_type="missing_parameter",
+            message="MBQL query object is required for query type",
+            request_info=request_info
+        )
+
+    if format not in EXPORT_FORMATS:
+        return format_error_response(
+            status_code=400,
+            error_type="invalid_parameter",
+            message=f"Invalid export format: {format}. Must be one of {', '.join(EXPORT_FORMATS)}",
+            request_info=request_info
+        )
+
+    client = get_metabase_client(ctx)
+
+    query_data = {"database": database, "type": type}
+    if type == "native":
+        query_data["native"] = native
+    else:
+        query_data["query"] = query
+
+    try:
+        export = _open_export(ctx, filename, format, f"query-{database}")
+    except (ValueError, OSError) as e:
+        return format_error_response(
+            status_code=400,
+            error_type="invalid_parameter",
+            message=str(e),
+            request_info=request_info
+        )
+
+    try:
+        await client.export_dataset(query_data, format, export.write)
+        export.commit()
+    except Exception as e:
+        export.abort()
+        logger.error(f"Error exporting dataset query: {e}")
+        return format_error_response(
+            status_code=500,
+            error_type="export_error",
+            message=str(e),
+            request_info=request_info
+        )
+
+    config = ctx.request_context.lifespan_context.auth.config
+    return serialize_response(
+        export_summary(export, format, {"database": database, "query_type": type}),
+        config
+    )
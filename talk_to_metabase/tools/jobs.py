@@ -0,0 +1,157 @@
+"""
+Background query job MCP tools.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from mcp.server.fastmcp import Context
+
+from .. import json_backend
+from ..jobs import JobFailed
+from ..server import get_server_instance
+from .common import check_response_size, format_error_response, serialize_response
+from .dashboard import execute_card_query
+from .dataset import run_dataset_query
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Register tools with the server
+mcp = get_server_instance()
+logger.info("Registering query job tools with the server...")
+
+
+@mcp.tool(name="submit_query", description="Start a long-running SQL, MBQL or card query in the background and return a job ID to poll")
+async def submit_query(
+    ctx: Context,
+    database: Optional[int] = None,
+    native: Optional[Dict[str, Any]] = None,
+    query: Optional[Dict[str, Any]] = None,
+    type: str = "native",
+    max_rows: Optional[int] = None,
+    card_id: Optional[int] = None,
+    parameters: Optional[List[Dict[str, Any]]] = None
+) -> str:
+    """
+    Run a query in the background so it survives client timeouts.
+
+    Pass card_id (and optionally parameters) to run a saved card as
+    execute_card_query does, or database with native/query/type/max_rows to
+    run an ad-hoc query as run_dataset_query does. Poll get_query_status with
+    the returned job_id for the result, or stop the query with cancel_query.
+
+    Args:
+        ctx: MCP context
+        database: Database ID (ad-hoc queries)
+        native: Native query object with SQL (ad-hoc native queries)
+        query: MBQL query object (ad-hoc structured queries)
+        type: Query type, either "native" or "query" (default: "native")
+        max_rows: Row limit of ad-hoc queries, as for run_dataset_query
+        card_id: Card ID (saved card queries)
+        parameters: Parameter values of the card
+
+    Returns:
+        Job details as JSON string
+    """
+    logger.info(f"Tool called: submit_query(database={database}, type={type}, card_id={card_id})")
+
+    if (card_id is None) == (database is None):
+        return format_error_response(
+            status_code=400,
+            error_type="invalid_parameter",
+            message="Provide either card_id or database, not both",
+            request_info={"card_id": card_id, "database": database}
+        )
+
+    metabase_ctx = ctx.request_context.lifespan_context
+
+    if card_id is not None:
+        description = {"card_id": card_id, "parameters": parameters or []}
+
+        async def run():
+            return await execute_card_query(card_id=card_id, ctx=ctx, parameters=parameters)
+    else:
+        description = {"database": database, "type": type, "max_rows": max_rows}
+
+        async def run():
+            return await run_dataset_query(
+                database=database, ctx=ctx, native=native, query=query, type=type, max_rows=max_rows
+            )
+
+    async def run_and_decode():
+        # The query tools return serialized JSON; keep it decoded to nest it in status responses
+        result = json_backend.loads(await run())
+        # The query tools report failures as error payloads rather than raising
+        if isinstance(result, dict) and (result.get("success") is False or "error" in result):
+            error = result.get("error")
+            if isinstance(error, dict):
+                raise JobFailed(error.get("message") or "Query failed", error)
+            raise JobFailed(str(error) if error else "Query failed")
+        return result
+
+    job = metabase_ctx.jobs.submit(run_and_decode, description)
+    return serialize_response(job.to_dict(), metabase_ctx.auth.config)
+
+
+@mcp.tool(name="get_query_status", description="Get the status of a background query job, and its result once completed")
+async def get_query_status(job_id: str, ctx: Context) -> str:
+    """
+    Report the status of a job started with submit_query.
+
+    Status is one of queued, running, completed, failed or cancelled. A
+    completed job includes the query result in the same format as
+    run_dataset_query or execute_card_query. Finished jobs are kept for a
+    limited time.
+
+    Args:
+        job_id: Job ID returned by submit_query
+        ctx: MCP context
+
+    Returns:
+        Job details as JSON string
+    """
+    logger.info(f"Tool called: get_query_status(job_id={job_id})")
+
+    metabase_ctx = ctx.request_context.lifespan_context
+    job = metabase_ctx.jobs.get(job_id)
+    if job is None:
+        return format_error_response(
+            status_code=404,
+            error_type="job_not_found",
+            message=f"Job {job_id} is unknown or has expired",
+            request_info={"job_id": job_id}
+        )
+
+    # The result was fitted to the size limit on its own; the job envelope adds to it
+    return check_response_size(serialize_response(job.to_dict(), metabase_ctx.auth.config), metabase_ctx.auth.config)
+
+
+@mcp.tool(name="cancel_query", description="Cancel a background query job")
+async def cancel_query(job_id: str, ctx: Context) -> str:
+    """
+    Cancel a job started with submit_query.
+
+    The in-flight request to Metabase is closed, which makes Metabase cancel
+    the warehouse query. Cancelling a finished job has no effect.
+
+    Args:
+        job_id: Job ID returned by submit_query
+        ctx: MCP context
+
+    Returns:
+        Job details as JSON string
+    """
+    logger.info(f"Tool called: cancel_query(job_id={job_id})")
+
+    metabase_ctx = ctx.request_context.lifespan_context
+    job = await metabase_ctx.jobs.cancel(job_id)
+    if job is None:
+        return format_error_response(
+            status_code=404,
+            error_type="job_not_found",
+            message=f"Job {job_id} is unknown or has expired",
+            request_info={"job_id": job_id}
+        )
+
+    return serialize_response(job.to_dict(include_result=False), metabase_ctx.auth.config)
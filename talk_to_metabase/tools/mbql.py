@@ -2,7 +2,6 @@
 MBQL (Metabase Query Language) schema and validation tools.
 """
 
-import json
 import logging
 from typing import Dict, List, Tuple, Any, Optional
 
@@ -11,7 +10,7 @@ from mcp.server.fastmcp import Context
 
 from ..server import get_server_instance
 from ..resources import load_json_resource
-from .common import format_error_response, check_response_size
+from .common import format_error_response, check_response_size, serialize_response
 
 logger = logging.getLogger(__name__)
 
@@ -114,12 +113,10 @@ async def get_mbql_schema(ctx: Context) -> str:
                 request_info={"tool": "GET_MBQL_SCHEMA"}
             )
         
-        # Convert to JSON string
-        response = json.dumps(schema, indent=2)
-        
         # Check response size before returning
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response = serialize_response(schema, config)
         return check_response_size(response, config)
         
     except Exception as e:
@@ -2,6 +2,8 @@
 Search operations MCP tools.
 """
 
+import base64
+import binascii
 import json
 import logging
 from typing import Dict, List, Optional, Any
@@ -9,7 +11,7 @@ from typing import Dict, List, Optional, Any
 from mcp.server.fastmcp import Context, FastMCP
 
 from ..server import get_server_instance
-from .common import format_error_response, get_metabase_client, check_response_size
+from .common import format_error_response, get_metabase_client, fit_response_to_limit
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -19,6 +21,29 @@ mcp = get_server_instance()
 logger.info("Registering search tools with the server...")
 
 
+def _encode_cursor(filters: Dict[str, Any], page: int, page_size: int) -> str:
+    """Encode the filters and position of the next page as an opaque cursor."""
+    state = {"filters": filters, "page": page, "page_size": page_size}
+    encoded = json.dumps(state, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(encoded).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor returned by search_resources.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(state, dict) or not {"filters", "page", "page_size"} <= state.keys():
+        raise ValueError("Invalid cursor")
+    return state
+
+
 @mcp.tool(name="search_resources", description="Search for resources across Metabase")
 async def search_resources(
     ctx: Context,
@@ -40,6 +65,7 @@ async def search_resources(
     model_ancestors: bool = False,
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,
 ) -> str:
     """
     Search for resources across Metabase with comprehensive filtering options and pagination.
@@ -66,9 +92,13 @@ async def search_resources(
         model_ancestors: Include model ancestors (default: False)
         page: Page number for pagination (default: 1)
         page_size: Number of results per page (default: 20)
+        cursor: next_cursor from a previous response; fetches the next page of
+            that search and replaces all other arguments
         
     Returns:
-        Search results as JSON string with pagination metadata
+        Search results as JSON string with pagination metadata; when more
+        results exist, pagination.next_cursor fetches the next page (served
+        from memory for searches that Metabase cannot paginate)
         
     Note:
         Not all item types support all filters, and the results will include only models that 
@@ -78,52 +108,82 @@ async def search_resources(
         A search query that has both filters applied will only return models and cards.
     """
     client = get_metabase_client(ctx)
+    metabase_ctx = ctx.request_context.lifespan_context
+    
+    if cursor is not None:
+        try:
+            state = _decode_cursor(cursor)
+        except ValueError as e:
+            return format_error_response(
+                status_code=400,
+                error_type="invalid_parameter",
+                message=f"{e}. Pass the next_cursor value of a previous search_resources response.",
+                request_info={"endpoint": "/api/search", "method": "GET", "cursor": cursor}
+            )
+        filters = state["filters"]
+        page = state["page"]
+        page_size = state["page_size"]
+        q = filters.get("query")
+        models = filters.get("models")
     
     try:
         # Log the search parameters
         logger.info(f"Searching Metabase resources with query: {q}, models: {models}, page: {page}, page_size: {page_size}")
         
-        # Handle models if it's a string representation of a list
-        if isinstance(models, str) and models.startswith('[') and models.endswith(']'):
-            try:
-                models = json.loads(models)
-                logger.info(f"Converted models string to list: {models}")
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse models string: {e}")
+        if cursor is None:
+            # Handle models if it's a string representation of a list
+            if isinstance(models, str) and models.startswith('[') and models.endswith(']'):
+                try:
+                    models = json.loads(models)
+                    logger.info(f"Converted models string to list: {models}")
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to parse models string: {e}")
+            
+            filters = {
+                "query": q,
+                "models": models,
+                "archived": archived,
+                "table_db_id": table_db_id,
+                "filter_items_in_personal_collection": filter_items_in_personal_collection,
+                "created_at": created_at,
+                "created_by": created_by,
+                "last_edited_at": last_edited_at,
+                "last_edited_by": last_edited_by,
+                "search_native_query": search_native_query,
+                "verified": verified,
+                "ids": ids,
+                "include_dashboard_questions": include_dashboard_questions,
+                "calculate_available_models": calculate_available_models,
+                "context": context,
+                "model_ancestors": model_ancestors,
+            }
         
         # Execute the search with pagination
         result = await client.search(
-            query=q,
-            models=models,
-            archived=archived,
-            table_db_id=table_db_id,
-            filter_items_in_personal_collection=filter_items_in_personal_collection,
-            created_at=created_at,
-            created_by=created_by,
-            last_edited_at=last_edited_at,
-            last_edited_by=last_edited_by,
-            search_native_query=search_native_query,
-            verified=verified,
-            ids=ids,
-            include_dashboard_questions=include_dashboard_questions,
-            calculate_available_models=calculate_available_models,
-            context=context,
-            model_ancestors=model_ancestors,
+            **filters,
             page=page,
             page_size=page_size,
+            result_cache=metabase_ctx.search_cache,
         )
         
+        if result["pagination"]["has_more"]:
+            result["pagination"]["next_cursor"] = _encode_cursor(filters, page + 1, page_size)
+        
         # Debug: Log the results structure
         logger.info(f"Search returned {len(result['results'])} results on page {page} of {result['pagination']['total_pages']}")
         logger.info(f"Total results across all pages: {result['pagination']['total_count']}")
         
-        # Convert data to JSON string
-        response = json.dumps(result, indent=2)
-        
         # Check response size before returning
-        metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
-        return check_response_size(response, config)
+        return fit_response_to_limit(
+            result,
+            ("results",),
+            config,
+            how_to_fetch_rest=(
+                "This page was trimmed to fit the response size limit; request a smaller "
+                "page_size and use page to go through the results, or narrow the search with models."
+            ),
+        )
     except Exception as e:
         logger.error(f"Error searching resources: {e}")
         
@@ -144,3 +204,97 @@ async def search_resources(
             message=str(e),
             request_info={"endpoint": "/api/search", "method": "GET", "params": params}
         )
+
+
+@mcp.tool(name="search_local", description="Fast full-text search over cards (including SQL), dashboards, collections, tables and fields using the server's local index")
+async def search_local(
+    q: str,
+    ctx: Context,
+    models: Optional[List[str]] = None,
+    page: int = 1,
+    page_size: int = 20,
+) -> str:
+    """
+    Search Metabase content in an in-process full-text index ranked with BM25.
+    
+    Answers in milliseconds once the index is built, and also matches field
+    names, camelCase/snake_case name parts and the SQL of native cards. The
+    index is refreshed from Metabase's bulk endpoints when it is older than the
+    refresh interval or after a write; only edited items are re-indexed.
+    Results have the same shape as search_resources, plus a relevance score.
+    
+    Args:
+        q: Search terms
+        ctx: MCP context
+        models: Only return these kinds of results. Allowed values: card, dataset,
+               metric, dashboard, collection, table, field
+        page: Page number for pagination (default: 1)
+        page_size: Number of results per page (default: 20)
+        
+    Returns:
+        Search results as JSON string with pagination metadata
+    """
+    logger.info(f"Tool called: search_local(q={q}, models={models}, page={page})")
+    
+    request_info = {"tool": "search_local", "q": q, "models": models, "page": page, "page_size": page_size}
+    metabase_ctx = ctx.request_context.lifespan_context
+    index = metabase_ctx.search_index
+    
+    if index is None:
+        return format_error_response(
+            status_code=400,
+            error_type="search_index_disabled",
+            message="The local search index is disabled; set METABASE_SEARCH_INDEX_ENABLED=true "
+                    "or use search_resources",
+            request_info=request_info
+        )
+    
+    if page < 1 or page_size < 1:
+        return format_error_response(
+            status_code=400,
+            error_type="invalid_pagination",
+            message="page and page_size must be greater than or equal to 1",
+            request_info=request_info
+        )
+    
+    try:
+        await index.ensure_fresh(metabase_ctx.auth)
+    except Exception as e:
+        logger.error(f"Error refreshing the search index: {e}")
+        if index.refreshed_at is None:
+            return format_error_response(
+                status_code=502,
+                error_type="search_index_error",
+                message=str(e),
+                request_info=request_info
+            )
+        # Serve the previous state of the index rather than failing
+    
+    ranked = index.search(q, models)
+    total_count = len(ranked)
+    total_pages = (total_count + page_size - 1) // page_size if total_count > 0 else 1
+    start_idx = (page - 1) * page_size
+    
+    result = {
+        "results": [
+            {**item, "score": round(score, 4)} for score, item in ranked[start_idx:start_idx + page_size]
+        ],
+        "pagination": {
+            "page": page,
+            "page_size": page_size,
+            "total_count": total_count,
+            "total_pages": total_pages,
+            "has_more": page < total_pages
+        },
+        "index": {
+            "documents": len(index.documents),
+            "age_seconds": index.snapshot()["age_seconds"]
+        }
+    }
+    
+    return fit_response_to_limit(
+        result,
+        ("results",),
+        metabase_ctx.auth.config,
+        how_to_fetch_rest="Request a smaller page_size and use page to go through the results, or filter with models.",
+    )
@@ -2,7 +2,6 @@
 Visualization documentation and validation tools for Metabase MCP server.
 """
 
-import json
 import logging
 from typing import Dict, List, Tuple, Any, Optional
 
@@ -11,7 +10,7 @@ from mcp.server.fastmcp import Context
 
 from ..server import get_server_instance
 from ..resources import load_visualization_schema, load_visualization_docs
-from .common import format_error_response, check_response_size
+from .common import format_error_response, check_response_size, serialize_response
 
 logger = logging.getLogger(__name__)
 
@@ -189,12 +188,10 @@ async def get_visualization_document(chart_type: str, ctx: Context) -> str:
         
         logger.info(f"Documentation provided successfully for chart type: {chart_type}")
         
-        # Convert to JSON string
-        response = json.dumps(response_data, indent=2)
-        
         # Check response size
         metabase_ctx = ctx.request_context.lifespan_context
         config = metabase_ctx.auth.config
+        response = serialize_response(response_data, config)
         return check_response_size(response, config)
         
     except Exception as e:
@@ -2,14 +2,17 @@
 Tests for authentication module.
 """
 
+import asyncio
 import json
 import os
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
 from talk_to_metabase.auth import MetabaseAuth
-from talk_to_metabase.config import MetabaseConfig
+from talk_to_metabase.config import MetabaseConfig, TimeoutProfile
+from talk_to_metabase.stats import current_tool
 
 
 @pytest.fixture
@@ -106,7 +109,7 @@ async def test_make_request_success(config):
     
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.json.return_value = {"data": "test-data"}
+    mock_response.content = json.dumps({"data": "test-data"}).encode()
     
     # Mock the HTTP client methods
     with patch("httpx.AsyncClient.get", return_value=mock_response):
@@ -125,7 +128,7 @@ async def test_make_request_error(config):
     
     mock_response = MagicMock()
     mock_response.status_code = 404
-    mock_response.json.return_value = {"message": "Resource not found"}
+    mock_response.content = json.dumps({"message": "Resource not found"}).encode()
     
     # Mock the HTTP client methods
     with patch("httpx.AsyncClient.get", return_value=mock_response):
@@ -147,3 +150,500 @@ async def test_make_request_auth_failure(config):
     assert data is None
     assert status == 401
     assert error == "Authentication failed"
+
+
+@pytest.mark.asyncio
+async def test_ensure_authenticated_skips_validation_for_fresh_token(config):
+    """Test that a recently validated token is trusted without a round-trip."""
+    config.session_token = "existing-token"
+    auth = MetabaseAuth(config)
+    
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    
+    with patch("httpx.AsyncClient.get", return_value=mock_response) as mock_get:
+        # First call validates the token against api/user/current
+        assert await auth.ensure_authenticated() is True
+        # Subsequent calls within the max age skip the validation
+        assert await auth.ensure_authenticated() is True
+        assert await auth.ensure_authenticated() is True
+        
+        assert mock_get.call_count == 1
+        assert auth.validations_skipped == 2
+
+
+@pytest.mark.asyncio
+async def test_ensure_authenticated_revalidates_after_max_age(config):
+    """Test that the token is validated again once the max age has elapsed."""
+    config.session_token = "existing-token"
+    config.session_max_age = 60
+    auth = MetabaseAuth(config)
+    
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    
+    with patch("httpx.AsyncClient.get", return_value=mock_response) as mock_get:
+        assert await auth.ensure_authenticated() is True
+        
+        # Pretend the last validation happened long ago
+        auth.session_validated_at -= 120
+        assert await auth.ensure_authenticated() is True
+        
+        assert mock_get.call_count == 2
+        assert auth.validations_skipped == 0
+
+
+@pytest.mark.asyncio
+async def test_make_request_single_round_trip_after_login(config):
+    """Test that a request right after login costs a single HTTP call."""
+    mock_post_response = MagicMock()
+    mock_post_response.status_code = 200
+    mock_post_response.json.return_value = {"id": "test-session-token"}
+    
+    mock_get_response = MagicMock()
+    mock_get_response.status_code = 200
+    mock_get_response.content = json.dumps({"id": 1, "name": "Test Card"}).encode()
+    
+    with patch("httpx.AsyncClient.post", return_value=mock_post_response), \
+         patch("httpx.AsyncClient.get", return_value=mock_get_response) as mock_get:
+        auth = MetabaseAuth(config)
+        assert await auth.authenticate() is True
+        
+        data, status, error = await auth.make_request("GET", "card/1")
+        
+        assert status == 200
+        assert error is None
+        mock_get.assert_called_once()
+        assert mock_get.call_args[0][0] == "api/card/1"
+        assert auth.validations_skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_make_request_401_forces_revalidation(config):
+    """Test that a 401 response drops the trusted session and logs in again."""
+    mock_post_response = MagicMock()
+    mock_post_response.status_code = 200
+    mock_post_response.json.return_value = {"id": "new-session-token"}
+    
+    unauthorized = MagicMock()
+    unauthorized.status_code = 401
+    ok = MagicMock()
+    ok.status_code = 200
+    ok.content = json.dumps({"data": "test-data"}).encode()
+    
+    config.session_token = "expired-token"
+    auth = MetabaseAuth(config)
+    auth.mark_session_valid()
+    
+    with patch("httpx.AsyncClient.post", return_value=mock_post_response) as mock_post, \
+         patch("httpx.AsyncClient.get", side_effect=[unauthorized, ok]):
+        data, status, error = await auth.make_request("GET", "test/endpoint")
+        
+        assert status == 200
+        assert data == {"data": "test-data"}
+        assert auth.session_token == "new-session-token"
+        mock_post.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_401s_share_a_single_login(config):
+    """Test that concurrent requests hitting an expired session log in only once."""
+    config.session_token = "expired-token"
+    auth = MetabaseAuth(config)
+    auth.mark_session_valid()
+    
+    login_calls = 0
+    
+    async def mock_post(url, **kwargs):
+        nonlocal login_calls
+        login_calls += 1
+        # Yield so that the other requests pile up behind the login
+        await asyncio.sleep(0.01)
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {"id": "new-session-token"}
+        return response
+    
+    async def mock_get(url, **kwargs):
+        response = MagicMock()
+        if auth.client.headers.get("X-Metabase-Session") == "new-session-token":
+            response.status_code = 200
+            response.content = json.dumps({"data": url}).encode()
+        else:
+            response.status_code = 401
+        # Let all requests be in flight before any of them completes
+        await asyncio.sleep(0)
+        return response
+    
+    with patch.object(auth.client, "post", side_effect=mock_post), \
+         patch.object(auth.client, "get", side_effect=mock_get):
+        results = await asyncio.gather(
+            *(auth.make_request("GET", f"card/{i}") for i in range(5))
+        )
+    
+    assert login_calls == 1
+    assert auth.reauthentications_shared == 4
+    for i, (data, status, error) in enumerate(results):
+        assert status == 200
+        assert error is None
+        assert data == {"data": f"api/card/{i}"}
+
+
+def test_client_uses_configured_pool_limits(config):
+    """Test that the shared HTTP client is built from the pool configuration."""
+    config.http_max_connections = 7
+    config.http_max_keepalive_connections = 3
+    config.http_keepalive_expiry = 15.0
+    auth = MetabaseAuth(config)
+    
+    stats = auth.pool_stats()
+    assert stats["max_connections"] == 7
+    assert stats["max_keepalive_connections"] == 3
+    assert stats["keepalive_expiry"] == 15.0
+    assert stats["requests_in_flight"] == 0
+    assert stats["utilization"] == 0
+
+
+def test_priority_lanes_sized_to_connection_pool(config):
+    """Test that priority lanes share the pool size unless a global cap is set."""
+    config.http_max_connections = 40
+    auth = MetabaseAuth(config)
+    assert auth.throttle.lanes.capacity == 40
+    assert auth.throttle.lanes.shared == 20
+    
+    config.max_concurrent_requests = 25
+    assert MetabaseAuth(config).throttle.lanes.capacity == 25
+    
+    config.lane_reservations = {"interactive": 0, "write": 0, "query": 0}
+    assert MetabaseAuth(config).throttle.lanes is None
+
+
+def test_http2_falls_back_without_h2(config):
+    """Test that HTTP/2 is disabled when the h2 package is missing."""
+    config.http2 = True
+    with patch("importlib.util.find_spec", return_value=None):
+        auth = MetabaseAuth(config)
+    
+    assert auth.http2 is False
+    assert auth.pool_stats()["http2"] is False
+
+
+@pytest.mark.asyncio
+async def test_make_request_tracks_in_flight_requests(config):
+    """Test that in-flight requests are counted for the pool readout."""
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    observed = []
+    
+    async def mock_get(url, **kwargs):
+        observed.append(auth.pool_stats()["requests_in_flight"])
+        response = MagicMock()
+        response.status_code = 200
+        response.content = b"{}"
+        return response
+    
+    with patch.object(auth.client, "get", side_effect=mock_get):
+        await asyncio.gather(*(auth.make_request("GET", "database") for _ in range(3)))
+    
+    assert max(observed) >= 1
+    assert auth.requests_in_flight == 0
+    assert auth.peak_requests_in_flight == max(observed)
+
+
+@pytest.mark.asyncio
+async def test_make_request_uses_endpoint_timeout_profile(config):
+    """Test that requests get the timeout profile of their endpoint family."""
+    config.timeouts["metadata"] = TimeoutProfile(connect=1.0, read=2.0, pool=3.0)
+    config.timeouts["query"] = TimeoutProfile(connect=4.0, read=600.0, pool=5.0)
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.content = b"{}"
+    
+    with patch("httpx.AsyncClient.get", return_value=mock_response) as mock_get, \
+         patch("httpx.AsyncClient.post", return_value=mock_response) as mock_post:
+        await auth.make_request("GET", "table/1/query_metadata")
+        await auth.make_request("POST", "dataset", json={})
+        
+        metadata_timeout = mock_get.call_args[1]["timeout"]
+        assert metadata_timeout.connect == 1.0
+        assert metadata_timeout.read == 2.0
+        assert metadata_timeout.pool == 3.0
+        
+        query_timeout = mock_post.call_args[1]["timeout"]
+        assert query_timeout.connect == 4.0
+        assert query_timeout.read == 600.0
+
+
+@pytest.mark.asyncio
+async def test_make_request_timeout_error(config):
+    """Test that a timed out request is reported as a gateway timeout."""
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    with patch("httpx.AsyncClient.get", side_effect=httpx.ReadTimeout("timed out")):
+        data, status, error = await auth.make_request("GET", "database/1/metadata")
+    
+    assert data is None
+    assert status == 504
+    assert "metadata timeout profile" in error
+
+
+def _response(status_code, data=None, headers=None):
+    """Build a mock HTTP response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = json.dumps(data if data is not None else {}).encode()
+    return response
+
+
+@pytest.mark.asyncio
+async def test_make_request_retries_gateway_errors(config):
+    """Test that idempotent requests are retried on 503 and record statistics."""
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    responses = [_response(503), _response(200, {"id": 1})]
+    token = current_tool.set("get_card_definition")
+    try:
+        with patch("httpx.AsyncClient.get", side_effect=responses) as mock_get, \
+             patch("asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            data, status, error = await auth.make_request("GET", "card/1")
+    finally:
+        current_tool.reset(token)
+    
+    assert status == 200
+    assert data == {"id": 1}
+    assert mock_get.call_count == 2
+    mock_sleep.assert_awaited_once()
+    assert auth.retry_stats.snapshot() == {
+        "get_card_definition": {"retries": 1, "recovered": 1}
+    }
+
+
+@pytest.mark.asyncio
+async def test_make_request_honors_retry_after(config):
+    """Test that throttled requests wait for the server-provided delay."""
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    responses = [_response(429, headers={"Retry-After": "2"}), _response(202, {"rows": []})]
+    with patch("httpx.AsyncClient.post", side_effect=responses), \
+         patch("asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        data, status, error = await auth.make_request("POST", "dataset", json={})
+    
+    assert status == 202
+    mock_sleep.assert_awaited_once_with(2.0)
+
+
+@pytest.mark.asyncio
+async def test_make_request_does_not_retry_non_idempotent_gateway_errors(config):
+    """Test that POST requests are not repeated after a gateway error."""
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    with patch("httpx.AsyncClient.post", return_value=_response(502, {"message": "Bad gateway"})) as mock_post:
+        data, status, error = await auth.make_request("POST", "card", json={})
+    
+    assert status == 502
+    assert error == "Bad gateway"
+    mock_post.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_make_request_gives_up_after_max_attempts(config):
+    """Test that retries stop after the configured number of attempts."""
+    config.retry_max_attempts = 3
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    with patch("httpx.AsyncClient.get", side_effect=httpx.ConnectError("refused")) as mock_get, \
+         patch("asyncio.sleep", new=AsyncMock()):
+        data, status, error = await auth.make_request("GET", "database")
+    
+    assert data is None
+    assert status == 500
+    assert mock_get.call_count == 3
+    assert auth.retry_stats.snapshot()["unknown"] == {"retries": 2, "exhausted": 1}
+
+
+@pytest.mark.asyncio
+async def test_make_request_fails_fast_when_circuit_open(config):
+    """Test that a failing endpoint family stops receiving requests."""
+    config.circuit_failure_threshold = 2
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    with patch("httpx.AsyncClient.post", return_value=_response(500, {"message": "Boom"})) as mock_post:
+        await auth.make_request("POST", "card/1/query", json={})
+        await auth.make_request("POST", "card/2/query", json={})
+        data, status, error = await auth.make_request("POST", "card/3/query", json={})
+        
+        # The third call never reaches Metabase
+        assert mock_post.call_count == 2
+    
+    assert status == 503
+    assert data["error_type"] == "circuit_open"
+    assert data["endpoint"] == "card/*/query"
+    assert "card/*/query" in error
+    assert auth.get_stats()["circuit_breakers"]["card/*/query"]["state"] == "open"
+    
+    # Other endpoint families are unaffected
+    with patch("httpx.AsyncClient.get", return_value=_response(200, {"id": 1})):
+        data, status, error = await auth.make_request("GET", "card/1")
+    assert status == 200
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_is_released(config):
+    """Test that a cancelled half-open probe does not keep the circuit rejecting requests."""
+    config.circuit_failure_threshold = 1
+    config.circuit_reset_timeout = 0
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    with patch("httpx.AsyncClient.post", return_value=_response(500)):
+        await auth.make_request("POST", "dataset", json={})
+    circuit = auth.circuits.breakers["dataset"]
+    assert circuit.state == "open"
+    
+    started = asyncio.Event()
+    
+    async def hang(*args, **kwargs):
+        started.set()
+        await asyncio.Event().wait()
+    
+    with patch("httpx.AsyncClient.post", side_effect=hang):
+        probe = asyncio.create_task(auth.make_request("POST", "dataset", json={}))
+        await started.wait()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+    
+    assert circuit.probe_in_flight is False
+    with patch("httpx.AsyncClient.post", return_value=_response(202, {"status": "completed"})):
+        data, status, error = await auth.make_request("POST", "dataset", json={})
+    assert status == 202
+    assert circuit.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_circuit_latency_excludes_throttle_wait(config):
+    """Test that time spent queued for a throttle slot is not counted as endpoint latency."""
+    config.max_concurrent_requests = 1
+    config.lane_reservations = {"interactive": 0, "write": 0, "query": 0}
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.2)
+        return _response(200, {"id": 1})
+    
+    with patch("httpx.AsyncClient.get", side_effect=slow_get):
+        await asyncio.gather(auth.make_request("GET", "card/1"), auth.make_request("GET", "card/2"))
+    
+    latencies = list(auth.circuits.breakers["card/*"].latencies)
+    assert len(latencies) == 2
+    # The second request waited 0.2s for the slot before its own 0.2s round trip
+    assert max(latencies) < 0.35
+
+
+@pytest.mark.asyncio
+async def test_api_key_mode_skips_session_login(config):
+    """Test that API-key authentication never opens or validates a session."""
+    config.api_key = "mb_test_api_key"
+    auth = MetabaseAuth(config)
+    
+    assert auth.uses_api_key is True
+    assert auth.client.headers.get("X-API-Key") == "mb_test_api_key"
+    
+    with patch("httpx.AsyncClient.post") as mock_post, \
+         patch("httpx.AsyncClient.get", return_value=_response(200, {"id": 1})) as mock_get:
+        data, status, error = await auth.make_request("GET", "card/1")
+        
+        assert status == 200
+        mock_post.assert_not_called()
+        # Only the request itself, no api/user/current validation
+        mock_get.assert_called_once()
+        assert mock_get.call_args[0][0] == "api/card/1"
+    
+    assert auth.get_stats()["session"]["mode"] == "api_key"
+
+
+@pytest.mark.asyncio
+async def test_api_key_mode_rejected_key(config):
+    """Test that a rejected API key does not trigger a session login."""
+    config.api_key = "mb_revoked_key"
+    auth = MetabaseAuth(config)
+    
+    with patch("httpx.AsyncClient.post") as mock_post, \
+         patch("httpx.AsyncClient.get", return_value=_response(401)):
+        data, status, error = await auth.make_request("GET", "card/1")
+    
+    assert status == 401
+    assert "API key" in error
+    mock_post.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stream_request_passes_chunks_to_sink(config):
+    """Test that streamed responses reach the sink chunk by chunk."""
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    async def body():
+        for chunk in (b"id,name\n", b"1,a\n", b"2,b\n"):
+            yield chunk
+    
+    def handler(request):
+        assert request.url.path == "/api/dataset/csv"
+        return httpx.Response(200, content=body())
+    
+    auth.client = httpx.AsyncClient(base_url=config.url, transport=httpx.MockTransport(handler))
+    chunks = []
+    data, status, error = await auth.stream_request("POST", "dataset/csv", chunks.append, data={"query": "{}"})
+    
+    assert (data, status, error) == ({"bytes": 16}, 200, None)
+    assert chunks == [b"id,name\n", b"1,a\n", b"2,b\n"]
+    assert auth.requests_in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_request_error_does_not_reach_sink(config):
+    """Test that error bodies are decoded for the message instead of streamed."""
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    
+    def handler(request):
+        return httpx.Response(400, json={"message": "Syntax error"})
+    
+    auth.client = httpx.AsyncClient(base_url=config.url, transport=httpx.MockTransport(handler))
+    chunks = []
+    data, status, error = await auth.stream_request("POST", "dataset/csv", chunks.append)
+    
+    assert status == 400
+    assert error == "Syntax error"
+    assert chunks == []
+
+
+@pytest.mark.asyncio
+async def test_successful_writes_notify_listeners(config):
+    """Test that write listeners see successful writes only."""
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    writes = []
+    auth.add_write_listener(lambda method, path: writes.append((method, path)))
+    
+    with patch("httpx.AsyncClient.put", side_effect=[_response(200, {"id": 1}), _response(400, {"message": "bad"})]), \
+         patch("httpx.AsyncClient.get", return_value=_response(200, {"id": 1})), \
+         patch("httpx.AsyncClient.post", return_value=_response(202, {"data": {}})):
+        await auth.make_request("PUT", "/dashboard/1", json={})
+        await auth.make_request("PUT", "dashboard/2", json={})
+        await auth.make_request("GET", "dashboard/1")
+        await auth.make_request("POST", "dataset", json={})
+    
+    assert writes == [("PUT", "dashboard/1")]
@@ -7,7 +7,9 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from talk_to_metabase.tools.card import get_card_definition, extract_essential_card_info, get_sql_translation, update_card
+from talk_to_metabase.auth import MetabaseAuth
+from talk_to_metabase.endpoints import classify_endpoint, endpoint_key
+from talk_to_metabase.tools.card import create_card, get_card_definition, extract_essential_card_info, get_sql_translation, update_card
 
 
 @pytest.mark.asyncio
@@ -559,3 +561,54 @@ async def test_update_card_missing_database_id(mock_context, sample_card):
         assert result_data["success"] is False
         assert "database_id not found" in result_data["error"]["message"]
         assert result_data["error"]["error_type"] == "validation_error"
+
+
+@pytest.mark.asyncio
+async def test_create_native_card_reuses_capped_validation_run(mock_context):
+    """Test that SQL validation is capped and its columns are saved as result metadata."""
+    cols = [{"name": "id", "base_type": "type/Integer"}, {"name": "channel", "base_type": "type/Text"}]
+    
+    async def mock_make_request(method, path, **kwargs):
+        if path == "dataset":
+            return {"data": {"rows": [[1, "Google"]], "cols": cols}, "row_count": 1}, 202, None
+        return {"id": 7, "name": "Spend"}, 200, None
+    
+    client_mock = MagicMock()
+    client_mock.auth.make_request = AsyncMock(side_effect=mock_make_request)
+    
+    with patch("talk_to_metabase.tools.card.get_metabase_client", return_value=client_mock):
+        result = json.loads(await create_card(
+            database_id=1,
+            query_type="native",
+            query="SELECT id, channel FROM spend",
+            name="Spend",
+            ctx=mock_context
+        ))
+    
+    assert result["success"] is True
+    calls = client_mock.auth.make_request.call_args_list
+    assert [call[0][1] for call in calls] == ["dataset", "card"]
+    assert calls[0][1]["json"]["constraints"] == {"max-results": 10, "max-results-bare-rows": 10}
+    assert calls[1][1]["json"]["result_metadata"] == cols
+
+
+@pytest.mark.asyncio
+async def test_get_card_definition_circuit_open(mock_context, config):
+    """Test that an open circuit breaker is reported as a structured circuit_open error."""
+    config.circuit_failure_threshold = 1
+    auth = MetabaseAuth(config)
+    auth.ensure_authenticated = AsyncMock(return_value=True)
+    auth.circuits.get(endpoint_key("card/1"), classify_endpoint("GET", "card/1")).record_failure()
+    
+    client_mock = MagicMock()
+    client_mock.auth = auth
+    
+    with patch("talk_to_metabase.tools.card.get_metabase_client", return_value=client_mock):
+        result = json.loads(await get_card_definition(id=1, ctx=mock_context))
+    
+    assert result["success"] is False
+    assert result["error"]["status_code"] == 503
+    assert result["error"]["error_type"] == "circuit_open"
+    assert result["error"]["circuit"]["endpoint"] == "card/*"
+    assert result["error"]["circuit"]["reason"] == "1 consecutive failures"
+    assert result["error"]["circuit"]["retry_after"] > 0
@@ -0,0 +1,88 @@
+"""
+Tests for endpoint circuit breakers.
+"""
+
+from talk_to_metabase.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerRegistry
+from talk_to_metabase.endpoints import endpoint_key
+
+
+def test_endpoint_key_replaces_ids():
+    """Test normalizing paths into endpoint keys."""
+    assert endpoint_key("dataset") == "dataset"
+    assert endpoint_key("card/123/query") == "card/*/query"
+    assert endpoint_key("/database/4/metadata") == "database/*/metadata"
+    assert endpoint_key("dashboard/1/dashcard/2/card/3/query") == "dashboard/*/dashcard/*/card/*/query"
+    assert endpoint_key("collection/root/items") == "collection/root/items"
+
+
+def test_opens_after_consecutive_failures():
+    """Test that consecutive failures open the circuit."""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+    
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+    assert breaker.rejected == 1
+    assert 0 < breaker.retry_after() <= 30.0
+
+
+def test_half_open_probe_closes_on_success():
+    """Test that a single probe is allowed after the reset timeout."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    
+    # Pretend the reset timeout has elapsed
+    breaker.opened_at -= 31
+    assert breaker.allow() is True
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert breaker.allow() is False
+    
+    breaker.record_success(0.2)
+    assert breaker.state == CLOSED
+    assert breaker.allow() is True
+
+
+def test_half_open_probe_reopens_on_failure():
+    """Test that a failed probe opens the circuit again."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+    breaker.opened_at -= 31
+    assert breaker.allow() is True
+    
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+    assert breaker.allow() is False
+
+
+def test_opens_on_high_latency_percentile():
+    """Test that a slow latency percentile opens the circuit."""
+    breaker = CircuitBreaker(latency_threshold=2.0, latency_min_samples=10)
+    
+    for _ in range(9):
+        breaker.record_success(5.0)
+    assert breaker.state == CLOSED
+    
+    breaker.record_success(5.0)
+    assert breaker.state == OPEN
+    assert "latency" in breaker.open_reason
+
+
+def test_registry_applies_family_latency_thresholds():
+    """Test that the registry creates breakers per key with family thresholds."""
+    registry = CircuitBreakerRegistry(latency_thresholds={"metadata": 5.0, "query": 0.0})
+    
+    metadata_breaker = registry.get("card/*", "metadata")
+    assert metadata_breaker.latency_threshold == 5.0
+    assert registry.get("card/*", "metadata") is metadata_breaker
+    assert registry.get("dataset", "query").latency_threshold is None
+    assert set(registry.snapshot()) == {"card/*", "dataset"}
@@ -0,0 +1,107 @@
+"""
+Tests for MetabaseClient.search pagination.
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from talk_to_metabase.circuit import CircuitOpenError
+from talk_to_metabase.query_cache import QueryCache
+
+ITEMS = [{"id": i, "model": "card", "name": f"Card {i}"} for i in range(1, 46)]
+
+
+@pytest.mark.asyncio
+async def test_search_pages_on_the_server(mock_metabase_client):
+    """Test that limit/offset are sent to Metabase and the total comes from the response."""
+    mock_metabase_client.auth.make_request = AsyncMock(return_value=(
+        {"data": ITEMS[20:40], "total": 45, "limit": 20, "offset": 20}, 200, None
+    ))
+    
+    result = await mock_metabase_client.search(query="card", page=2, page_size=20)
+    
+    params = mock_metabase_client.auth.make_request.call_args[1]["params"]
+    assert params["limit"] == "20"
+    assert params["offset"] == "20"
+    assert params["q"] == "card"
+    assert result["results"] == ITEMS[20:40]
+    assert result["pagination"] == {
+        "page": 2,
+        "page_size": 20,
+        "total_count": 45,
+        "total_pages": 3,
+        "has_more": True,
+        "server_side": True
+    }
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_local_slicing(mock_metabase_client):
+    """Test servers that ignore limit/offset and return every result."""
+    mock_metabase_client.auth.make_request = AsyncMock(return_value=({"data": ITEMS, "total": 45}, 200, None))
+    
+    result = await mock_metabase_client.search(page=3, page_size=20)
+    
+    assert result["results"] == ITEMS[40:]
+    assert result["pagination"]["total_count"] == 45
+    assert result["pagination"]["has_more"] is False
+    assert result["pagination"]["server_side"] is False
+    
+    mock_metabase_client.auth.make_request = AsyncMock(return_value=(ITEMS[:5], 200, None))
+    result = await mock_metabase_client.search(page=1, page_size=20)
+    assert result["results"] == ITEMS[:5]
+    assert result["pagination"]["total_count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_search_page_past_the_end(mock_metabase_client):
+    """Test that a page beyond the total is empty."""
+    mock_metabase_client.auth.make_request = AsyncMock(return_value=({"data": ITEMS[:3], "total": 3}, 200, None))
+    
+    result = await mock_metabase_client.search(page=2, page_size=20)
+    
+    assert result["results"] == []
+    assert result["pagination"]["total_pages"] == 1
+
+
+@pytest.mark.asyncio
+async def test_search_caches_unpaginated_results(mock_metabase_client):
+    """Test that later pages of an unpaginated search are served from the cache."""
+    cache = QueryCache(max_bytes=1024 * 1024, ttl=60)
+    mock_metabase_client.auth.make_request = AsyncMock(return_value=({"data": ITEMS}, 200, None))
+    
+    first = await mock_metabase_client.search(query="card", page=1, page_size=20, result_cache=cache)
+    second = await mock_metabase_client.search(query="card", page=2, page_size=20, result_cache=cache)
+    other = await mock_metabase_client.search(query="other", page=1, page_size=20, result_cache=cache)
+    
+    assert mock_metabase_client.auth.make_request.call_count == 2
+    assert first["results"] == ITEMS[:20]
+    assert second["results"] == ITEMS[20:40]
+    assert second["pagination"]["cached"] is True
+    assert "cached" not in other["pagination"]
+
+
+@pytest.mark.asyncio
+async def test_search_does_not_cache_server_pages(mock_metabase_client):
+    """Test that server-side pages are not cached."""
+    cache = QueryCache(max_bytes=1024 * 1024, ttl=60)
+    mock_metabase_client.auth.make_request = AsyncMock(return_value=(
+        {"data": ITEMS[:20], "total": 45, "limit": 20, "offset": 0}, 200, None
+    ))
+    
+    await mock_metabase_client.search(query="card", page=1, page_size=20, result_cache=cache)
+    
+    assert cache.entries == {}
+
+
+@pytest.mark.asyncio
+async def test_search_raises_typed_circuit_error(mock_metabase_client):
+    """Test that a search rejected by an open circuit raises CircuitOpenError."""
+    rejection = {"error_type": "circuit_open", "endpoint": "search", "reason": "probe request failed", "retry_after": 3.0}
+    mock_metabase_client.auth.make_request = AsyncMock(return_value=(rejection, 503, "search is failing"))
+    
+    with pytest.raises(CircuitOpenError) as excinfo:
+        await mock_metabase_client.search(query="card")
+    
+    assert excinfo.value.details["endpoint"] == "search"
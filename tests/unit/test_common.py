@@ -0,0 +1,119 @@
+"""
+Tests for shared tool helpers.
+"""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from talk_to_metabase.tools.common import (
+    check_response_size,
+    fit_response_to_limit,
+    format_error_response,
+    serialize_response,
+)
+
+
+def test_serialize_response_pretty_by_default(config):
+    """Test that responses are indented unless compact output is configured."""
+    data = {"success": True, "rows": [[1, "a"]]}
+    
+    assert serialize_response(data, config) == json.dumps(data, indent=2)
+
+
+def test_serialize_response_compact(config):
+    """Test that the compact format removes all optional whitespace."""
+    config.response_format = "compact"
+    data = {"success": True, "rows": [[1, "a"]]}
+    
+    response = serialize_response(data, config)
+    assert response == '{"success":true,"rows":[[1,"a"]]}'
+    assert json.loads(response) == data
+
+
+def test_serialize_response_without_config_uses_env():
+    """Test that helpers without access to the config honor RESPONSE_FORMAT."""
+    with patch.dict(os.environ, {"RESPONSE_FORMAT": "compact"}):
+        error = format_error_response(status_code=404, error_type="not_found", message="Card not found")
+    
+    assert "\n" not in error
+    assert json.loads(error)["error"]["status_code"] == 404
+
+
+def test_compact_format_fits_more_under_size_limit(config):
+    """Test that a payload rejected in pretty format can fit in compact format."""
+    data = {"rows": [[i, f"value-{i}"] for i in range(200)]}
+    config.response_size_limit = len(json.dumps(data, separators=(",", ":"))) + 10
+    
+    pretty = check_response_size(serialize_response(data, config), config)
+    assert json.loads(pretty)["error"]["error_type"] == "response_size_exceeded"
+    
+    config.response_format = "compact"
+    compact = check_response_size(serialize_response(data, config), config)
+    assert json.loads(compact) == data
+
+
+def _dataset(rows):
+    return {
+        "data": {"rows": [[i, f"customer-{i}", i * 1.5] for i in range(rows)], "cols": [{"name": "id"}]},
+        "status": "completed",
+        "row_count": rows,
+    }
+
+
+def test_fit_response_returns_small_results_unchanged(config):
+    """Test that results within the limit are not trimmed."""
+    data = _dataset(5)
+    
+    response = fit_response_to_limit(data, ("data", "rows"), config, how_to_fetch_rest="Use LIMIT")
+    assert json.loads(response) == data
+
+
+@pytest.mark.parametrize("response_format", ["pretty", "compact"])
+def test_fit_response_trims_rows_to_limit(config, response_format):
+    """Test that rows are trimmed to fit and the omission is reported."""
+    config.response_format = response_format
+    config.response_size_limit = 5000
+    data = _dataset(1000)
+    
+    response = fit_response_to_limit(data, ("data", "rows"), config, how_to_fetch_rest="Use LIMIT/OFFSET")
+    result = json.loads(response)
+    
+    assert len(response) <= 5000
+    kept = len(result["data"]["rows"])
+    assert 0 < kept < 1000
+    assert result["data"]["rows"] == data["data"]["rows"][:kept]
+    assert result["truncation"] == {
+        "truncated": True,
+        "field": "data.rows",
+        "returned": kept,
+        "omitted": 1000 - kept,
+        "total": 1000,
+        "size_limit": 5000,
+        "how_to_fetch_rest": "Use LIMIT/OFFSET",
+    }
+    # The estimate uses nearly all of the budget
+    one_more = dict(result, data=dict(result["data"], rows=data["data"]["rows"][:kept + 2]))
+    assert len(serialize_response(one_more, config)) > 5000
+
+
+def test_fit_response_does_not_serialize_every_row(config):
+    """Test that only the rows that fit are measured."""
+    config.response_size_limit = 2000
+    data = _dataset(100000)
+    
+    with patch("talk_to_metabase.tools.common.serialize_response", wraps=serialize_response) as serialize:
+        fit_response_to_limit(data, ("data", "rows"), config, how_to_fetch_rest="Use LIMIT")
+    
+    assert serialize.call_count < 100
+
+
+def test_fit_response_reports_error_when_envelope_too_large(config):
+    """Test that the size error is returned when nothing fits."""
+    config.response_size_limit = 50
+    data = _dataset(10)
+    
+    response = fit_response_to_limit(data, ("data", "rows"), config, how_to_fetch_rest="Use LIMIT")
+    assert json.loads(response)["error"]["error_type"] == "response_size_exceeded"
@@ -8,6 +8,7 @@ from unittest.mock import patch
 import pytest
 
 from talk_to_metabase.config import MetabaseConfig
+from talk_to_metabase.export import DEFAULT_EXPORT_DIR
 
 
 def test_validate_url():
@@ -44,3 +45,208 @@ def test_from_env():
         assert config.username == "env-user@example.com"
         assert config.password == "env-password"
         assert config.session_token is None
+
+
+def test_from_env_session_max_age():
+    """Test reading the session max age from environment variables."""
+    env_vars = {
+        "METABASE_URL": "https://env-metabase.example.com",
+        "METABASE_USERNAME": "env-user@example.com",
+        "METABASE_PASSWORD": "env-password",
+        "METABASE_SESSION_MAX_AGE": "600"
+    }
+    
+    with patch.dict(os.environ, env_vars):
+        config = MetabaseConfig.from_env()
+        assert config.session_max_age == 600
+    
+    with patch.dict(os.environ, {**env_vars, "METABASE_SESSION_MAX_AGE": "invalid"}):
+        config = MetabaseConfig.from_env()
+        assert config.session_max_age == 3600
+
+
+def test_from_env_connection_pool():
+    """Test reading connection pool settings from environment variables."""
+    env_vars = {
+        "METABASE_URL": "https://env-metabase.example.com",
+        "METABASE_USERNAME": "env-user@example.com",
+        "METABASE_PASSWORD": "env-password",
+        "METABASE_HTTP_MAX_CONNECTIONS": "50",
+        "METABASE_HTTP_MAX_KEEPALIVE_CONNECTIONS": "10",
+        "METABASE_HTTP_KEEPALIVE_EXPIRY": "12.5",
+        "METABASE_HTTP2": "true"
+    }
+    
+    with patch.dict(os.environ, env_vars):
+        config = MetabaseConfig.from_env()
+        
+        assert config.http_max_connections == 50
+        assert config.http_max_keepalive_connections == 10
+        assert config.http_keepalive_expiry == 12.5
+        assert config.http2 is True
+
+
+def test_from_env_timeout_profiles():
+    """Test overriding endpoint timeout profiles from environment variables."""
+    env_vars = {
+        "METABASE_URL": "https://env-metabase.example.com",
+        "METABASE_USERNAME": "env-user@example.com",
+        "METABASE_PASSWORD": "env-password",
+        "METABASE_TIMEOUT_QUERY_READ": "900",
+        "METABASE_TIMEOUT_METADATA_CONNECT": "2"
+    }
+    
+    with patch.dict(os.environ, env_vars):
+        config = MetabaseConfig.from_env()
+        
+        assert config.timeouts["query"].read == 900.0
+        assert config.timeouts["metadata"].connect == 2.0
+        # Untouched values keep their defaults
+        assert config.timeouts["metadata"].read == 15.0
+        assert set(config.timeouts) == {"metadata", "search", "query", "write"}
+
+
+def test_from_env_api_key():
+    """Test reading the API key from environment variables."""
+    env_vars = {
+        "METABASE_URL": "https://env-metabase.example.com",
+        "METABASE_API_KEY": "mb_env_key"
+    }
+    
+    with patch.dict(os.environ, env_vars, clear=True):
+        config = MetabaseConfig.from_env()
+        
+        assert config.api_key == "mb_env_key"
+        assert config.username == ""
+    
+    with patch.dict(os.environ, {"METABASE_URL": "https://env-metabase.example.com"}, clear=True):
+        assert MetabaseConfig.from_env().api_key is None
+
+
+def test_from_env_throttle_limits():
+    """Test reading global and per-family throttle limits."""
+    env_vars = {
+        "METABASE_URL": "https://env-metabase.example.com",
+        "METABASE_USERNAME": "env-user@example.com",
+        "METABASE_PASSWORD": "env-password",
+        "METABASE_MAX_CONCURRENT_REQUESTS": "16",
+        "METABASE_RATE_LIMIT": "20",
+        "METABASE_MAX_CONCURRENT_QUERY": "4",
+        "METABASE_RATE_LIMIT_SEARCH": "2.5"
+    }
+    
+    with patch.dict(os.environ, env_vars):
+        config = MetabaseConfig.from_env()
+        
+        assert config.max_concurrent_requests == 16
+        assert config.rate_limit == 20.0
+        assert config.family_concurrency_limits == {"query": 4}
+        assert config.family_rate_limits == {"search": 2.5}
+
+
+def test_from_env_lane_reservations():
+    """Test default and overridden priority lane reservations."""
+    env_vars = {
+        "METABASE_URL": "https://env-metabase.example.com",
+        "METABASE_USERNAME": "env-user@example.com",
+        "METABASE_PASSWORD": "env-password",
+        "METABASE_LANE_RESERVED_QUERY": "0"
+    }
+    
+    with patch.dict(os.environ, env_vars):
+        config = MetabaseConfig.from_env()
+        
+        assert config.lane_reservations == {"interactive": 10, "write": 5, "query": 0}
+
+
+def test_response_format():
+    """Test reading and validating the response format."""
+    env_vars = {
+        "METABASE_URL": "https://env-metabase.example.com",
+        "METABASE_USERNAME": "env-user@example.com",
+        "METABASE_PASSWORD": "env-password",
+        "RESPONSE_FORMAT": "Compact"
+    }
+    
+    with patch.dict(os.environ, env_vars):
+        assert MetabaseConfig.from_env().response_format == "compact"
+    
+    # An invalid environment value falls back to the default instead of failing startup
+    with patch.dict(os.environ, {**env_vars, "RESPONSE_FORMAT": "yaml"}):
+        assert MetabaseConfig.from_env().response_format == "pretty"
+    
+    with pytest.raises(ValueError):
+        MetabaseConfig(url="https://metabase.example.com", username="u", password="p", response_format="yaml")
+
+
+def test_from_env_result_store():
+    """Test reading the result store settings."""
+    env_vars = {
+        "METABASE_URL": "https://env-metabase.example.com",
+        "METABASE_USERNAME": "env-user@example.com",
+        "METABASE_PASSWORD": "env-password",
+        "METABASE_RESULT_STORE_MAX_MB": "64",
+        "METABASE_RESULT_TTL": "120",
+        "METABASE_RESULT_SPILL_THRESHOLD_MB": "0",
+        "METABASE_RESULT_SPILL_DIR": "/var/tmp"
+    }
+    
+    with patch.dict(os.environ, env_vars):
+        config = MetabaseConfig.from_env()
+        
+        assert config.result_store_max_mb == 64
+        assert config.result_ttl == 120.0
+        assert config.result_spill_threshold_mb == 0
+        assert config.result_spill_dir == "/var/tmp"
+
+
+def test_from_env_export_dir():
+    """Test reading the export directory."""
+    env_vars = {
+        "METABASE_URL": "https://env-metabase.example.com",
+        "METABASE_USERNAME": "env-user@example.com",
+        "METABASE_PASSWORD": "env-password",
+    }
+    
+    with patch.dict(os.environ, env_vars):
+        assert MetabaseConfig.from_env().export_dir == DEFAULT_EXPORT_DIR
+    
+    with patch.dict(os.environ, {**env_vars, "METABASE_EXPORT_DIR": "/srv/exports"}):
+        assert MetabaseConfig.from_env().export_dir == "/srv/exports"
+
+
+def test_from_env_query_execution_settings():
+    """Test reading the query execution and content cache settings."""
+    env_vars = {
+        "METABASE_URL": "https://env-metabase.example.com",
+        "METABASE_USERNAME": "env-user@example.com",
+        "METABASE_PASSWORD": "env-password",
+        "METABASE_QUERY_CACHE_MAX_MB": "16",
+        "METABASE_QUERY_CACHE_TTL": "0",
+        "METABASE_VALIDATION_MAX_ROWS": "1",
+        "METABASE_DATASET_MAX_ROWS": "0",
+        "METABASE_MAX_CONCURRENT_JOBS": "2",
+        "METABASE_JOB_TTL": "60",
+        "METABASE_DASHBOARD_QUERY_CONCURRENCY": "3",
+        "METABASE_DASHBOARD_CACHE_TTL": "30",
+        "METABASE_SEARCH_CACHE_TTL": "10",
+        "METABASE_SEARCH_CACHE_MAX_MB": "4",
+        "METABASE_SEARCH_INDEX_ENABLED": "true",
+        "METABASE_SEARCH_INDEX_REFRESH_INTERVAL": "120"
+    }
+    
+    with patch.dict(os.environ, env_vars):
+        config = MetabaseConfig.from_env()
+        
+        assert config.query_cache_max_mb == 16
+        assert config.query_cache_ttl == 0.0
+        assert config.validation_max_rows == 1
+        assert config.dataset_max_rows == 0
+        assert config.max_concurrent_jobs == 2
+        assert config.job_ttl == 60.0
+        assert config.dashboard_query_concurrency == 3
+        assert config.dashboard_cache_ttl == 30.0
+        assert config.search_cache_ttl == 10.0
+        assert config.search_cache_max_mb == 4
+        assert config.search_index_enabled is True
+        assert config.search_index_refresh_interval == 120.0
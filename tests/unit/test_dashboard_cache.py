@@ -0,0 +1,60 @@
+"""
+Tests for the dashboard cache.
+"""
+
+from unittest.mock import MagicMock, patch
+
+from talk_to_metabase.dashboard_cache import DashboardCache
+
+
+def _dashboard(updated_at):
+    return {"id": 1, "updated_at": updated_at, "dashcards": []}
+
+
+def test_index_rebuilt_from_each_fetch():
+    """Test that a refetch rebuilds the tab index even when updated_at is unchanged."""
+    cache = DashboardCache(ttl=60)
+    build_index = MagicMock(side_effect=lambda data: {None: [data["dashcards"][0]["card"]["name"]]})
+    
+    def dashboard(card_name):
+        # Renaming a card does not change the dashboard's updated_at
+        return {"id": 1, "updated_at": "2025-01-01", "dashcards": [{"card": {"name": card_name}}]}
+    
+    cache.put(1, dashboard("Old name"), build_index)
+    second = cache.put(1, dashboard("New name"), build_index)
+    
+    assert second.tab_index == {None: ["New name"]}
+    assert build_index.call_count == 2
+    assert cache.snapshot()["index_builds"] == 2
+    assert cache.get(1) is second
+
+
+def test_entries_expire_and_respect_size():
+    """Test the TTL and the bound on the number of dashboards."""
+    cache = DashboardCache(ttl=60, max_entries=2)
+    with patch("talk_to_metabase.dashboard_cache.time.monotonic", return_value=1000.0):
+        for dashboard_id in (1, 2, 3):
+            cache.put(dashboard_id, _dashboard("t"), lambda data: {})
+    
+    assert list(cache.entries) == [2, 3]
+    with patch("talk_to_metabase.dashboard_cache.time.monotonic", return_value=1061.0):
+        assert cache.get(3) is None
+    
+    disabled = DashboardCache(ttl=0)
+    disabled.put(1, _dashboard("t"), lambda data: {})
+    assert disabled.get(1) is None
+
+
+def test_writes_invalidate_entries():
+    """Test invalidation by write requests to dashboards and cards."""
+    cache = DashboardCache(ttl=60)
+    for dashboard_id in (1, 2, 3):
+        cache.put(dashboard_id, _dashboard("t"), lambda data: {})
+    
+    cache.on_write("PUT", "dashboard/1")
+    assert list(cache.entries) == [2, 3]
+    cache.on_write("POST", "collection")
+    assert list(cache.entries) == [2, 3]
+    cache.on_write("PUT", "card/9")
+    assert not cache.entries
+    assert cache.snapshot()["invalidations"] == 3
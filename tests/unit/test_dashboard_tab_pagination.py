@@ -7,7 +7,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from talk_to_metabase.tools.dashboard import get_dashboard_tab
+from talk_to_metabase.tools.dashboard import get_dashboard_tab, update_dashboard
 
 
 @pytest.mark.asyncio
@@ -258,3 +258,34 @@ async def test_get_dashboard_tab_invalid_page_size(mock_context, sample_dashboar
         assert result_data["success"] is False
         assert "error" in result_data
         assert result_data["error"]["error_type"] == "invalid_pagination"
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_tab_serves_later_pages_from_cache(mock_context, sample_dashboard, sample_card):
+    """Test that pages after the first reuse the dashboard fetched for page 1."""
+    dashboard = sample_dashboard.copy()
+    dashboard["updated_at"] = "2025-05-01T00:00:00Z"
+    dashboard["dashcards"] = [
+        {"id": i + 1, "card_id": i + 1, "row": i, "col": 0, "card": sample_card.copy(), "series": []}
+        for i in range(30)
+    ]
+    
+    client_mock = MagicMock()
+    client_mock.get_resource = AsyncMock(return_value=dashboard)
+    client_mock.auth.make_request = AsyncMock(return_value=({"id": 1, "name": "Renamed"}, 200, None))
+    
+    with patch("talk_to_metabase.tools.dashboard.get_metabase_client", return_value=client_mock):
+        first = json.loads(await get_dashboard_tab(dashboard_id=1, ctx=mock_context, page_size=10))
+        second = json.loads(await get_dashboard_tab(dashboard_id=1, ctx=mock_context, page=2, page_size=10))
+        third = json.loads(await get_dashboard_tab(dashboard_id=1, ctx=mock_context, page=3, page_size=10))
+        assert client_mock.get_resource.call_count == 1
+        
+        # Updating the dashboard drops the cached payload
+        await update_dashboard(id=1, ctx=mock_context, name="Renamed")
+        await get_dashboard_tab(dashboard_id=1, ctx=mock_context, page=2, page_size=10)
+        assert client_mock.get_resource.call_count == 2
+    
+    ids = [card["id"] for page in (first, second, third) for card in page["dashcards"]]
+    assert ids == list(range(1, 31))
+    assert second["dashcards"][0]["card"] is None
+    assert "card_summary" in second["dashcards"][0]
@@ -7,6 +7,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from talk_to_metabase.circuit import CircuitOpenError
 from talk_to_metabase.tools.dashboard import get_dashboard, create_dashboard, get_dashboard_tab
 
 
@@ -385,3 +386,18 @@ async def test_get_dashboard_tab_error_invalid_tab_for_single_tab(mock_context,
         
         # Verify the mock was called correctly
         client_mock.get_resource.assert_called_once_with("dashboard", 1)
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_circuit_open(mock_context):
+    """Test that a client call rejected by an open circuit keeps its circuit details."""
+    details = {"error_type": "circuit_open", "endpoint": "dashboard/*", "reason": "probe request failed", "retry_after": 12.5}
+    client_mock = MagicMock()
+    client_mock.get_resource = AsyncMock(side_effect=CircuitOpenError("Failed to get dashboard/1", details))
+    
+    with patch("talk_to_metabase.tools.dashboard.get_metabase_client", return_value=client_mock):
+        result = json.loads(await get_dashboard(id=1, ctx=mock_context))
+    
+    assert result["error"]["status_code"] == 503
+    assert result["error"]["error_type"] == "circuit_open"
+    assert result["error"]["circuit"] == {"endpoint": "dashboard/*", "reason": "probe request failed", "retry_after": 12.5}
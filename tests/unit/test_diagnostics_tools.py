@@ -0,0 +1,28 @@
+"""
+Tests for diagnostics tools.
+"""
+
+import json
+
+import pytest
+
+from talk_to_metabase.tools.diagnostics import get_client_stats
+
+
+@pytest.mark.asyncio
+async def test_get_client_stats(mock_context):
+    """Test reporting client statistics."""
+    auth = mock_context.request_context.lifespan_context.auth
+    auth.validations_skipped = 4
+    
+    result = await get_client_stats(ctx=mock_context)
+    
+    result_data = json.loads(result)
+    assert result_data["session"]["validations_skipped"] == 4
+    assert result_data["pool"]["max_connections"] == auth.config.http_max_connections
+    assert "utilization" in result_data["pool"]
+    assert result_data["result_store"]["results"] == 0
+    assert result_data["query_cache"]["entries"] == 0
+    assert result_data["jobs"]["jobs"] == {}
+    assert result_data["dashboard_cache"]["entries"] == 0
+    assert result_data["search_cache"]["entries"] == 0
@@ -0,0 +1,28 @@
+"""
+Tests for endpoint family classification.
+"""
+
+import pytest
+
+from talk_to_metabase.endpoints import classify_endpoint
+
+
+@pytest.mark.parametrize("method,path,family", [
+    ("GET", "card/1", "metadata"),
+    ("GET", "database/1/metadata", "metadata"),
+    ("GET", "table/5/query_metadata", "metadata"),
+    ("GET", "collection/root/items", "metadata"),
+    ("GET", "search", "search"),
+    ("POST", "dataset", "query"),
+    ("POST", "/dataset/csv", "query"),
+    ("POST", "card/12/query", "query"),
+    ("POST", "card/12/query/json", "query"),
+    ("POST", "dashboard/1/dashcard/2/card/3/query", "query"),
+    ("POST", "dataset/native", "metadata"),
+    ("POST", "card", "write"),
+    ("PUT", "dashboard/7", "write"),
+    ("DELETE", "card/3", "write"),
+])
+def test_classify_endpoint(method, path, family):
+    """Test classifying requests into endpoint families."""
+    assert classify_endpoint(method, path) == family
@@ -0,0 +1,108 @@
+"""
+Tests for the execute_dashboard_tab tool.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from talk_to_metabase.tools.dashboard import execute_dashboard_tab
+
+
+def _dashboard():
+    dashcards = [
+        {
+            "id": 100 + i,
+            "card_id": i,
+            "dashboard_tab_id": 1 if i < 4 else 2,
+            "row": 4 - i,
+            "col": 0,
+            "card": {"id": i, "name": f"Card {i}", "display": "table"},
+            "parameter_mappings": [{"parameter_id": "channel", "card_id": i, "target": ["dimension", ["field", 1, None]]}]
+            if i % 2 else [],
+        }
+        for i in range(6)
+    ]
+    # Text cards have no query
+    dashcards.append({"id": 200, "card_id": None, "dashboard_tab_id": 1, "row": 9, "col": 0, "card": None})
+    return {
+        "id": 7,
+        "name": "Marketing",
+        "tabs": [{"id": 1, "name": "Overview"}, {"id": 2, "name": "Details"}],
+        "dashcards": dashcards,
+    }
+
+
+@pytest.mark.asyncio
+async def test_execute_dashboard_tab_runs_cards_concurrently(mock_context):
+    """Test that the cards of a tab run concurrently and are reported per card."""
+    mock_context.request_context.lifespan_context.auth.config.dashboard_query_concurrency = 2
+    in_flight = 0
+    peak = 0
+    
+    async def mock_make_request(method, path, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        card_id = int(path.split("/")[-2])
+        if card_id == 2:
+            return {"message": "Table not found"}, 400, "Table not found"
+        if card_id == 3:
+            return {"status": "failed", "error": "Syntax error", "error_type": "invalid-query", "data": {}}, 202, None
+        rows = [[n] for n in range(15)]
+        return {"status": "completed", "data": {"rows": rows, "cols": [{"name": "n"}]}, "row_count": 15, "running_time": 12}, 202, None
+    
+    client_mock = MagicMock()
+    client_mock.get_resource = AsyncMock(return_value=_dashboard())
+    client_mock.auth.make_request = AsyncMock(side_effect=mock_make_request)
+    
+    with patch("talk_to_metabase.tools.dashboard.get_metabase_client", return_value=client_mock):
+        result = json.loads(await execute_dashboard_tab(
+            dashboard_id=7,
+            ctx=mock_context,
+            tab_id=1,
+            parameters=[{"id": "channel", "value": ["Google"]}]
+        ))
+    
+    assert peak == 2
+    assert result["card_count"] == 4
+    assert result["failed_count"] == 2
+    # Ordered by position on the dashboard
+    assert [card["card_id"] for card in result["cards"]] == [3, 2, 1, 0]
+    
+    by_card = {card["card_id"]: card for card in result["cards"]}
+    assert by_card[0]["success"] is True
+    assert by_card[0]["columns"] == ["n"]
+    assert by_card[0]["rows"] == [[n] for n in range(10)]
+    assert by_card[0]["row_count"] == 15
+    assert by_card[0]["rows_truncated"] is True
+    assert by_card[0]["elapsed_seconds"] >= 0
+    assert by_card[2]["error"] == {"status_code": 400, "message": "Table not found"}
+    assert by_card[3]["error"]["message"] == "Syntax error"
+    
+    # Parameter values only go to the cards they are mapped to
+    payloads = {
+        call[0][1]: call[1]["json"] for call in client_mock.auth.make_request.call_args_list
+    }
+    assert payloads["dashboard/7/dashcard/101/card/1/query"]["parameters"] == [{"id": "channel", "value": ["Google"]}]
+    assert payloads["dashboard/7/dashcard/100/card/0/query"]["parameters"] == []
+
+
+@pytest.mark.asyncio
+async def test_execute_dashboard_tab_requires_valid_tab(mock_context):
+    """Test that dashboards with tabs require a valid tab_id."""
+    client_mock = MagicMock()
+    client_mock.get_resource = AsyncMock(return_value=_dashboard())
+    client_mock.auth.make_request = AsyncMock()
+    
+    with patch("talk_to_metabase.tools.dashboard.get_metabase_client", return_value=client_mock):
+        missing = json.loads(await execute_dashboard_tab(dashboard_id=7, ctx=mock_context))
+        unknown = json.loads(await execute_dashboard_tab(dashboard_id=7, ctx=mock_context, tab_id=9))
+    
+    assert missing["error"]["error_type"] == "missing_tab_id"
+    assert unknown["error"]["error_type"] == "tab_not_found"
+    client_mock.auth.make_request.assert_not_called()
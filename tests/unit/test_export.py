@@ -0,0 +1,146 @@
+"""
+Tests for streamed result exports.
+"""
+
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from talk_to_metabase.export import (
+    CsvRowCounter,
+    ExportFile,
+    JsonRowCounter,
+    resolve_export_path,
+)
+from talk_to_metabase.tools.export import export_card_results, export_dataset_results
+
+CSV = b'id,comment\n1,plain\n2,"multi\nline, ""quoted"""\n3,last\n'
+JSON = json.dumps([
+    {"id": 1, "comment": "{not [an object"},
+    {"id": 2, "comment": "escaped \\\" quote", "nested": {"a": [1, {"b": 2}]}},
+    {"id": 3, "comment": None},
+]).encode()
+
+
+def _feed(counter, data, size):
+    for start in range(0, len(data), size):
+        counter.feed(data[start:start + size])
+    return counter.rows
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_csv_row_counter(size):
+    """Test counting CSV rows whatever the chunk boundaries."""
+    assert _feed(CsvRowCounter(), CSV, size) == 3
+    # Missing trailing newline
+    assert _feed(CsvRowCounter(), CSV.rstrip(b"\n"), size) == 3
+    assert _feed(CsvRowCounter(), b"id,comment\n", size) == 0
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_json_row_counter(size):
+    """Test counting JSON rows whatever the chunk boundaries."""
+    assert _feed(JsonRowCounter(), JSON, size) == 3
+    assert _feed(JsonRowCounter(), b"[]", size) == 0
+
+
+def test_export_file_commit_and_abort(tmp_path):
+    """Test that exports only appear at their path once committed."""
+    path = str(tmp_path / "out" / "result.csv")
+    export = ExportFile(path, "csv")
+    export.write(CSV[:10])
+    export.write(CSV[10:])
+    assert not os.path.exists(path)
+    export.commit()
+    
+    with open(path, "rb") as f:
+        assert f.read() == CSV
+    assert export.rows == 3
+    assert export.bytes_written == len(CSV)
+    
+    failed = ExportFile(str(tmp_path / "failed.csv"), "csv")
+    failed.write(b"id\n1\n")
+    failed.abort()
+    assert sorted(os.listdir(tmp_path)) == ["out"]
+
+
+def test_resolve_export_path(tmp_path):
+    """Test building export paths inside the export directory."""
+    export_dir = str(tmp_path)
+    assert resolve_export_path(export_dir, "spend", "csv", "card-1") == os.path.join(export_dir, "spend.csv")
+    assert resolve_export_path(export_dir, "spend.json", "json", "card-1") == os.path.join(export_dir, "spend.json")
+    assert os.path.basename(resolve_export_path(export_dir, None, "csv", "card-1")).startswith("card-1-")
+    
+    for filename in ("../escape.csv", "/etc/passwd", "sub/dir.csv", ".."):
+        with pytest.raises(ValueError):
+            resolve_export_path(export_dir, filename, "csv", "card-1")
+
+
+@pytest.mark.asyncio
+async def test_export_card_results(mock_context, tmp_path):
+    """Test exporting a card to a file in the export directory."""
+    mock_context.request_context.lifespan_context.auth.config.export_dir = str(tmp_path)
+    
+    async def export_card(card_id, export_format, sink, parameters=None):
+        sink(CSV[:15])
+        sink(CSV[15:])
+        return {"bytes": len(CSV)}
+    
+    client_mock = MagicMock()
+    client_mock.export_card = AsyncMock(side_effect=export_card)
+    
+    with patch("talk_to_metabase.tools.export.get_metabase_client", return_value=client_mock):
+        result = json.loads(await export_card_results(card_id=42, ctx=mock_context, filename="spend"))
+    
+    assert result["success"] is True
+    assert result["path"] == str(tmp_path / "spend.csv")
+    assert result["rows"] == 3
+    assert result["bytes"] == len(CSV)
+    assert result["source"] == {"card_id": 42, "parameters": []}
+    with open(result["path"], "rb") as f:
+        assert f.read() == CSV
+
+
+@pytest.mark.asyncio
+async def test_export_dataset_results_failure_leaves_no_file(mock_context, tmp_path):
+    """Test that a failed export returns an error and removes the partial file."""
+    mock_context.request_context.lifespan_context.auth.config.export_dir = str(tmp_path)
+    
+    async def export_dataset(query_data, export_format, sink):
+        sink(b'[{"id": 1}')
+        raise ValueError("Query export failed: connection reset")
+    
+    client_mock = MagicMock()
+    client_mock.export_dataset = AsyncMock(side_effect=export_dataset)
+    
+    with patch("talk_to_metabase.tools.export.get_metabase_client", return_value=client_mock):
+        result = json.loads(await export_dataset_results(
+            database=1,
+            ctx=mock_context,
+            native={"query": "select * from events"},
+            format="json"
+        ))
+    
+    assert result["success"] is False
+    assert result["error"]["error_type"] == "export_error"
+    assert list(tmp_path.iterdir()) == []
+    query_data = client_mock.export_dataset.call_args[0][0]
+    assert query_data == {"database": 1, "type": "native", "native": {"query": "select * from events"}}
+
+
+@pytest.mark.asyncio
+async def test_export_rejects_invalid_arguments(mock_context, tmp_path):
+    """Test validation of the export format and file name."""
+    mock_context.request_context.lifespan_context.auth.config.export_dir = str(tmp_path)
+    
+    result = json.loads(await export_card_results(card_id=1, ctx=mock_context, format="xlsx"))
+    assert result["error"]["error_type"] == "invalid_parameter"
+    
+    with patch("talk_to_metabase.tools.export.get_metabase_client", return_value=MagicMock()):
+        result = json.loads(await export_card_results(card_id=1, ctx=mock_context, filename="../x"))
+    assert result["error"]["error_type"] == "invalid_parameter"
+    
+    result = json.loads(await export_dataset_results(database=1, ctx=mock_context, type="query"))
+    assert result["error"]["error_type"] == "missing_parameter"
@@ -0,0 +1,182 @@
+"""
+Tests for background query jobs.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from talk_to_metabase.jobs import JobManager
+from talk_to_metabase.tools.jobs import cancel_query, get_query_status, submit_query
+
+
+@pytest.mark.asyncio
+async def test_job_lifecycle():
+    """Test that a job runs in the background and keeps its result."""
+    manager = JobManager(max_concurrency=2, ttl=60)
+    release = asyncio.Event()
+    
+    async def run():
+        await release.wait()
+        return {"rows": [[1]]}
+    
+    job = manager.submit(run, {"database": 1})
+    await asyncio.sleep(0)
+    assert manager.get(job.id).status == "running"
+    
+    release.set()
+    await job.task
+    info = manager.get(job.id).to_dict()
+    assert info["status"] == "completed"
+    assert info["result"] == {"rows": [[1]]}
+    assert info["elapsed_seconds"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_job_concurrency_is_bounded():
+    """Test that jobs beyond the limit wait queued."""
+    manager = JobManager(max_concurrency=1, ttl=60)
+    release = asyncio.Event()
+    
+    async def run():
+        await release.wait()
+    
+    first = manager.submit(run, {})
+    second = manager.submit(run, {})
+    await asyncio.sleep(0)
+    assert (first.status, second.status) == ("running", "queued")
+    
+    release.set()
+    await asyncio.gather(first.task, second.task)
+    assert manager.snapshot()["jobs"] == {"completed": 2}
+
+
+@pytest.mark.asyncio
+async def test_job_failure_and_cancellation():
+    """Test failed and cancelled jobs."""
+    manager = JobManager(max_concurrency=2, ttl=60)
+    cancelled = asyncio.Event()
+    
+    async def fail():
+        raise ValueError("warehouse unavailable")
+    
+    async def slow():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    failing = manager.submit(fail, {})
+    running = manager.submit(slow, {})
+    await asyncio.sleep(0)
+    
+    job = await manager.cancel(running.id)
+    assert job.status == "cancelled"
+    assert cancelled.is_set()
+    
+    await failing.task
+    assert failing.status == "failed"
+    assert failing.error == "warehouse unavailable"
+    assert await manager.cancel("job_unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_expire_and_close_cancels():
+    """Test the TTL of finished jobs and cancelling everything on close."""
+    manager = JobManager(max_concurrency=2, ttl=60)
+    
+    async def quick():
+        return 1
+    
+    async def slow():
+        await asyncio.sleep(60)
+    
+    done = manager.submit(quick, {})
+    await done.task
+    with patch("talk_to_metabase.jobs.time.time", return_value=done.finished_at + 61):
+        assert manager.get(done.id) is None
+    
+    pending = manager.submit(slow, {})
+    await asyncio.sleep(0)
+    await manager.close()
+    assert pending.status == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_zero_concurrency_is_unlimited():
+    """Test that a concurrency limit of 0 runs jobs without a bound."""
+    manager = JobManager(max_concurrency=0, ttl=60)
+    
+    async def run():
+        return 1
+    
+    jobs = [manager.submit(run, {}) for _ in range(3)]
+    await asyncio.gather(*(job.task for job in jobs))
+    
+    assert [job.status for job in jobs] == ["completed"] * 3
+
+
+@pytest.mark.asyncio
+async def test_query_job_tools(mock_context):
+    """Test submitting, polling and cancelling query jobs through the tools."""
+    query_result = {"data": {"rows": [[1]], "cols": [{"name": "one"}]}, "status": "completed"}
+    client_mock = MagicMock()
+    client_mock.auth.make_request = AsyncMock(return_value=(query_result, 202, None))
+    
+    with patch("talk_to_metabase.tools.dataset.get_metabase_client", return_value=client_mock):
+        submitted = json.loads(await submit_query(ctx=mock_context, database=1, native={"query": "select 1"}))
+        assert submitted["status"] == "queued"
+        
+        jobs = mock_context.request_context.lifespan_context.jobs
+        await jobs.get(submitted["job_id"]).task
+    
+    status = json.loads(await get_query_status(job_id=submitted["job_id"], ctx=mock_context))
+    assert status["status"] == "completed"
+    assert status["result"]["data"]["rows"] == [[1]]
+    
+    cancelled = json.loads(await cancel_query(job_id=submitted["job_id"], ctx=mock_context))
+    assert cancelled["status"] == "completed"
+    assert "result" not in cancelled
+    
+    missing = json.loads(await get_query_status(job_id="job_missing", ctx=mock_context))
+    assert missing["error"]["error_type"] == "job_not_found"
+    
+    invalid = json.loads(await submit_query(ctx=mock_context, database=1, card_id=2))
+    assert invalid["error"]["error_type"] == "invalid_parameter"
+
+
+@pytest.mark.asyncio
+async def test_query_job_tools_failed_query(mock_context):
+    """Test that a query returning an error ends its job in the failed state."""
+    client_mock = MagicMock()
+    client_mock.auth.make_request = AsyncMock(return_value=(None, 400, "syntax error"))
+    
+    with patch("talk_to_metabase.tools.dataset.get_metabase_client", return_value=client_mock):
+        submitted = json.loads(await submit_query(ctx=mock_context, database=1, native={"query": "selec 1"}))
+        jobs = mock_context.request_context.lifespan_context.jobs
+        await jobs.get(submitted["job_id"]).task
+    
+    status = json.loads(await get_query_status(job_id=submitted["job_id"], ctx=mock_context))
+    assert status["status"] == "failed"
+    assert "syntax error" in status["error"]
+    assert status["error_details"]["status_code"] == 400
+    assert "result" not in status
+
+
+@pytest.mark.asyncio
+async def test_get_query_status_checks_response_size(mock_context):
+    """Test that the job envelope cannot push a status response over the size limit."""
+    query_result = {"data": {"rows": [[1]], "cols": [{"name": "one"}]}, "status": "completed"}
+    client_mock = MagicMock()
+    client_mock.auth.make_request = AsyncMock(return_value=(query_result, 202, None))
+    
+    with patch("talk_to_metabase.tools.dataset.get_metabase_client", return_value=client_mock):
+        submitted = json.loads(await submit_query(ctx=mock_context, database=1, native={"query": "select 1"}))
+        await mock_context.request_context.lifespan_context.jobs.get(submitted["job_id"]).task
+    
+    mock_context.request_context.lifespan_context.auth.config.response_size_limit = 50
+    status = json.loads(await get_query_status(job_id=submitted["job_id"], ctx=mock_context))
+    assert status["error"]["error_type"] == "response_size_exceeded"
@@ -0,0 +1,67 @@
+"""
+Tests for the pluggable JSON backend.
+"""
+
+import json
+
+import pytest
+
+from talk_to_metabase import json_backend
+
+
+@pytest.fixture(params=["json", "orjson"])
+def backend(request):
+    """Run a test with each available backend, restoring the default afterwards."""
+    if request.param == "orjson" and json_backend.orjson is None:
+        pytest.skip("orjson is not installed")
+    previous = json_backend.get_backend()
+    json_backend.set_backend(request.param)
+    yield request.param
+    json_backend.set_backend(previous)
+
+
+def test_round_trip(backend):
+    """Test that both backends decode bytes and encode the same data."""
+    payload = {"data": {"rows": [[1, "a", None, 2.5]], "cols": [{"name": "x"}]}, "status": "completed"}
+    
+    decoded = json_backend.loads(json.dumps(payload).encode())
+    assert decoded == payload
+    assert json.loads(json_backend.dumps(payload, indent=2)) == payload
+    assert json.loads(json_backend.dumps(payload)) == payload
+
+
+def test_pretty_output_matches_stdlib(backend):
+    """Test that pretty output is identical to json.dumps(indent=2) for ASCII data."""
+    payload = {"id": 1, "name": "Orders", "tags": [], "nested": {"values": [1, 2]}}
+    
+    assert json_backend.dumps(payload, indent=2) == json.dumps(payload, indent=2)
+
+
+def test_compact_output(backend):
+    """Test that compact output has no whitespace."""
+    assert json_backend.dumps({"a": [1, 2]}) == '{"a":[1,2]}'
+
+
+def test_large_integers_fall_back_to_stdlib(backend):
+    """Test that values orjson cannot encode still serialize."""
+    assert json.loads(json_backend.dumps({"big": 2 ** 70}, indent=2)) == {"big": 2 ** 70}
+
+
+def test_large_integers_decode_exactly(backend):
+    """Test that integers beyond 64 bits are not decoded as floats."""
+    big = 123456789012345678901234567890
+    assert json_backend.loads(b'[123456789012345678901234567890]') == [big]
+    assert json_backend.loads('{"v": -9999999999999999999}') == {"v": -9999999999999999999}
+    assert json_backend.loads(b'[9007199254740993]') == [9007199254740993]
+
+
+def test_invalid_json_raises_decode_error(backend):
+    """Test that both backends raise json.JSONDecodeError on invalid input."""
+    with pytest.raises(json.JSONDecodeError):
+        json_backend.loads(b"<html>")
+
+
+def test_set_backend_rejects_unknown():
+    """Test that unknown backends are rejected."""
+    with pytest.raises(ValueError):
+        json_backend.set_backend("simplejson")
@@ -0,0 +1,77 @@
+"""
+Tests for the query result cache.
+"""
+
+from unittest.mock import patch
+
+from talk_to_metabase.query_cache import QueryCache, normalize_sql, query_cache_key
+
+
+def test_normalize_sql_keeps_quoted_whitespace():
+    """Test that whitespace is collapsed only outside literals and identifiers."""
+    sql = "SELECT  a,\n\tb FROM \"My  Table\"\nWHERE c = 'x  y' AND d = 'it''s  ok' ;\n"
+    assert normalize_sql(sql) == "SELECT a, b FROM \"My  Table\" WHERE c = 'x  y' AND d = 'it''s  ok'"
+
+
+def test_normalize_sql_keeps_comment_boundaries():
+    """Test that a line comment cannot swallow the SQL that followed its newline."""
+    commented = "SELECT * FROM orders -- recent only\nWHERE created_at > now() - interval '1 day'"
+    unfiltered = "SELECT * FROM orders -- recent only WHERE created_at > now() - interval '1 day'"
+    assert normalize_sql(commented) != normalize_sql(unfiltered)
+    assert query_cache_key({"database": 1, "type": "native", "native": {"query": commented}}, 200) != \
+        query_cache_key({"database": 1, "type": "native", "native": {"query": unfiltered}}, 200)
+    assert normalize_sql("SELECT  1 /* a\n  b */  FROM t") == "SELECT 1 /* a\n  b */ FROM t"
+
+
+def test_query_cache_key_is_canonical():
+    """Test that equivalent queries share a key and different ones do not."""
+    native = {"database": 1, "type": "native", "native": {"query": "select 1\n from t", "template-tags": {}}}
+    reformatted = {"type": "native", "native": {"template-tags": {}, "query": "select 1 from t;"}, "database": 1}
+    mbql = {"database": 1, "type": "query", "query": {"source-table": 2, "limit": 5}}
+    reordered = {"database": 1, "type": "query", "query": {"limit": 5, "source-table": 2}}
+
+    assert query_cache_key(native) == query_cache_key(reformatted)
+    assert query_cache_key(mbql) == query_cache_key(reordered)
+    assert query_cache_key(native) != query_cache_key({**native, "database": 2})
+    assert query_cache_key(mbql) != query_cache_key(mbql, 100)
+
+
+def test_cache_hits_and_ttl():
+    """Test serving results until the TTL passes."""
+    cache = QueryCache(max_bytes=1024 * 1024, ttl=60)
+    with patch("talk_to_metabase.query_cache.time.monotonic", return_value=1000.0):
+        assert cache.get("k") is None
+        assert cache.put("k", {"rows": [[1]]})
+
+    with patch("talk_to_metabase.query_cache.time.monotonic", return_value=1030.0):
+        assert cache.get("k") == ({"rows": [[1]]}, 30.0)
+
+    with patch("talk_to_metabase.query_cache.time.monotonic", return_value=1061.0):
+        assert cache.get("k") is None
+        assert cache.total_bytes == 0
+
+    assert cache.snapshot()["hits"] == 1
+    assert cache.snapshot()["misses"] == 2
+
+
+def test_cache_size_bound():
+    """Test LRU eviction and skipping results larger than the bound."""
+    value = {"rows": [[i] for i in range(10)]}
+    cache = QueryCache(max_bytes=len('{"rows":[[0],[1],[2],[3],[4],[5],[6],[7],[8],[9]]}') * 2, ttl=60)
+
+    assert cache.put("a", value)
+    assert cache.put("b", value)
+    cache.get("a")
+    assert cache.put("c", value)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.snapshot()["evictions"] == 1
+    assert not cache.put("huge", {"rows": [[i] for i in range(1000)]})
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_disabled_cache():
+    """Test that a zero TTL or size disables caching."""
+    assert not QueryCache(max_bytes=0, ttl=60).put("k", 1)
+    assert not QueryCache(max_bytes=1024, ttl=0).put("k", 1)
@@ -0,0 +1,121 @@
+"""
+Tests for the server-side result store.
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from talk_to_metabase.results import ResultStore, StoredResult
+
+COLS = [{"name": "id"}, {"name": "channel"}, {"name": "spend"}]
+
+
+def _rows(count):
+    return [[i, f"channel-{i}", i * 1.5] for i in range(count)]
+
+
+def test_put_and_page():
+    """Test storing a result and reading slices of it."""
+    store = ResultStore(max_bytes=1024 * 1024, ttl=60)
+    handle = store.put(COLS, _rows(50), {"endpoint": "/api/dataset"})
+
+    result = store.get(handle)
+    assert result.row_count == 50
+    assert result.page(10, 5) == {"cols": COLS, "rows": _rows(15)[10:]}
+    assert result.page(48, 5)["rows"] == _rows(50)[48:]
+    assert result.page(60, 5)["rows"] == []
+    assert result.page(0, 2, ["spend", "id"]) == {
+        "cols": [{"name": "spend"}, {"name": "id"}],
+        "rows": [[0.0, 0], [1.5, 1]],
+    }
+
+    with pytest.raises(KeyError):
+        result.page(0, 2, ["missing"])
+
+
+def test_columnar_encoding_round_trips_values():
+    """Test that every kind of value reads back unchanged."""
+    cols = [{"name": name} for name in ("int", "float", "bool", "text", "mixed", "big")]
+    rows = [
+        [1, 1.5, True, "café", {"a": [1, 2]}, 2 ** 70],
+        [None, None, None, None, None, None],
+        [-3, -0.25, False, "", 7, 1],
+        [2 ** 62, 1e300, True, "multi\nline", "x", -(2 ** 70)],
+    ]
+    result = StoredResult("res_test", cols, rows, {})
+
+    assert [spec["kind"] for spec in result.columns] == ["int", "float", "bool", "text", "json", "json"]
+    assert result.page(0, 10)["rows"] == rows
+    assert result.page(1, 2)["rows"] == rows[1:3]
+
+
+def test_columnar_storage_is_compact():
+    """Test that the binary layout is much smaller than rows held as Python lists."""
+    rows = _rows(10000)
+    result = StoredResult("res_test", COLS, rows, {})
+
+    python_bytes = sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in rows)
+    assert result.size_bytes < python_bytes / 3
+
+
+def test_large_results_spill_to_disk(tmp_path):
+    """Test that results over the threshold are memory-mapped from a temp file."""
+    store = ResultStore(max_bytes=10 * 1024 * 1024, ttl=60, spill_threshold=1024, spill_dir=str(tmp_path))
+    small = store.put(COLS, _rows(5), {})
+    large = store.put(COLS, _rows(5000), {})
+
+    assert not store.get(small).spilled
+    result = store.get(large)
+    assert result.spilled
+    assert os.path.getsize(result.path) == result.size_bytes
+    assert result.page(4990, 20)["rows"] == _rows(5000)[4990:]
+
+    snapshot = store.snapshot()
+    assert snapshot["spilled_results"] == 1
+    assert snapshot["disk_bytes"] == result.size_bytes
+    assert snapshot["memory_bytes"] == store.get(small).size_bytes
+
+    path = result.path
+    store.discard(large)
+    assert not os.path.exists(path)
+
+    store.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_lru_eviction_by_size():
+    """Test that least recently used results are evicted to stay within the bound."""
+    size = StoredResult("res_test", COLS, _rows(100), {}).size_bytes
+    store = ResultStore(max_bytes=size * 2 + 10, ttl=60)
+
+    first = store.put(COLS, _rows(100), {})
+    second = store.put(COLS, _rows(100), {})
+    store.get(first)
+    third = store.put(COLS, _rows(100), {})
+
+    assert store.get(first) is not None
+    assert store.get(second) is None
+    assert store.get(third) is not None
+    assert store.snapshot()["evictions"] == 1
+    assert store.total_bytes <= store.max_bytes
+
+
+def test_oversized_and_disabled_results_are_not_stored():
+    """Test that results larger than the bound, or a disabled store, return no handle."""
+    assert ResultStore(max_bytes=10, ttl=60).put(COLS, _rows(100), {}) is None
+    assert ResultStore(max_bytes=0, ttl=60).put(COLS, _rows(1), {}) is None
+
+
+def test_results_expire():
+    """Test that results are dropped after the TTL."""
+    store = ResultStore(max_bytes=1024 * 1024, ttl=60)
+    with patch("talk_to_metabase.results.time.monotonic", return_value=1000.0):
+        handle = store.put(COLS, _rows(10), {})
+
+    with patch("talk_to_metabase.results.time.monotonic", return_value=1061.0):
+        assert store.get(handle) is None
+        assert store.snapshot()["expirations"] == 1
+        assert store.total_bytes == 0
@@ -0,0 +1,72 @@
+"""
+Tests for the retry policy.
+"""
+
+import time
+from email.utils import formatdate
+
+import httpx
+
+from talk_to_metabase.retry import RetryPolicy, parse_retry_after
+
+
+def test_parse_retry_after_seconds():
+    """Test parsing delay-seconds Retry-After values."""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("0.5") == 0.5
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_parse_retry_after_http_date():
+    """Test parsing HTTP-date Retry-After values."""
+    delay = parse_retry_after(formatdate(time.time() + 10, usegmt=True))
+    assert 8 <= delay <= 10
+    
+    # Dates in the past mean "retry now"
+    assert parse_retry_after(formatdate(time.time() - 10, usegmt=True)) == 0.0
+
+
+def test_should_retry_status():
+    """Test which statuses are retried for which methods."""
+    policy = RetryPolicy()
+    
+    assert policy.should_retry_status("GET", 503) is True
+    assert policy.should_retry_status("PUT", 502) is True
+    assert policy.should_retry_status("POST", 503) is False
+    # Throttled requests were not processed, so any method may retry
+    assert policy.should_retry_status("POST", 429) is True
+    assert policy.should_retry_status("GET", 500) is False
+    assert policy.should_retry_status("GET", 404) is False
+
+
+def test_should_retry_exception():
+    """Test which transport errors are retried for which methods."""
+    policy = RetryPolicy()
+    
+    assert policy.should_retry_exception("POST", httpx.ConnectError("refused")) is True
+    assert policy.should_retry_exception("GET", httpx.ReadError("reset")) is True
+    assert policy.should_retry_exception("POST", httpx.ReadError("reset")) is False
+    assert policy.should_retry_exception("GET", httpx.ReadTimeout("slow")) is False
+
+
+def test_backoff_is_capped_and_jittered():
+    """Test that backoff stays within the exponential ceiling."""
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=4.0)
+    
+    for attempt, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (10, 4.0)]:
+        for _ in range(20):
+            assert 0 <= policy.backoff(attempt) <= ceiling
+    
+    # A server-provided delay wins over the computed backoff
+    assert policy.backoff(1, retry_after=7.0) == 7.0
+
+
+def test_allows_respects_attempts_and_budget():
+    """Test that retries stop at the attempt limit or time budget."""
+    policy = RetryPolicy(max_attempts=3, budget=5.0)
+    now = time.monotonic()
+    
+    assert policy.allows(1, now, 1.0) is True
+    assert policy.allows(3, now, 0.0) is False
+    assert policy.allows(1, now, 10.0) is False
@@ -7,7 +7,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from talk_to_metabase.tools.dataset import run_dataset_query
+from talk_to_metabase.tools.dataset import fetch_result_page, run_dataset_query
 
 
 @pytest.mark.asyncio
@@ -232,3 +232,173 @@ async def test_run_mbql_dataset_query(mock_context):
         assert call_kwargs["json"]["database"] == 195
         assert call_kwargs["json"]["type"] == "query"
         assert "source-table" in call_kwargs["json"]["query"]
+
+
+@pytest.mark.asyncio
+async def test_run_dataset_query_trims_rows_to_size_limit(mock_context):
+    """Test that oversized results are trimmed instead of rejected."""
+    rows = [[i, f"channel-{i}"] for i in range(5000)]
+    query_result = {
+        "data": {"rows": rows, "cols": [{"name": "id"}, {"name": "channel"}], "native_form": {}},
+        "status": "completed",
+        "row_count": 5000,
+    }
+    mock_context.request_context.lifespan_context.auth.config.response_size_limit = 10000
+    
+    client_mock = MagicMock()
+    client_mock.auth.make_request = AsyncMock(return_value=(query_result, 202, None))
+    
+    with patch("talk_to_metabase.tools.dataset.get_metabase_client", return_value=client_mock):
+        result = await run_dataset_query(database=1, native={"query": "select 1"}, ctx=mock_context, max_rows=0)
+    
+    assert len(result) <= 10000
+    result_data = json.loads(result)
+    returned = len(result_data["data"]["rows"])
+    assert result_data["data"]["rows"] == rows[:returned]
+    assert result_data["row_count"] == 5000
+    assert result_data["truncation"]["omitted"] == 5000 - returned
+    
+    # The full result is kept for paging
+    handle = result_data["truncation"]["result_handle"]
+    assert handle in result_data["truncation"]["how_to_fetch_rest"]
+    stored = mock_context.request_context.lifespan_context.results.get(handle)
+    assert stored.row_count == 5000
+
+
+@pytest.mark.asyncio
+async def test_fetch_result_page(mock_context):
+    """Test reading pages and selected columns from a stored result."""
+    results = mock_context.request_context.lifespan_context.results
+    cols = [{"name": "id"}, {"name": "channel"}]
+    rows = [[i, f"channel-{i}"] for i in range(250)]
+    handle = results.put(cols, rows, {"endpoint": "/api/dataset"})
+    
+    result = json.loads(await fetch_result_page(handle=handle, ctx=mock_context, offset=200, limit=100))
+    assert result["data"]["rows"] == rows[200:]
+    assert result["total_rows"] == 250
+    assert "truncation" not in result
+    
+    result = json.loads(await fetch_result_page(handle=handle, ctx=mock_context, limit=2, columns=["channel"]))
+    assert result["data"] == {"cols": [{"name": "channel"}], "rows": [["channel-0"], ["channel-1"]]}
+
+
+@pytest.mark.asyncio
+async def test_fetch_result_page_errors(mock_context):
+    """Test unknown handles, unknown columns and invalid ranges."""
+    results = mock_context.request_context.lifespan_context.results
+    handle = results.put([{"name": "id"}], [[1]], {})
+    
+    result = json.loads(await fetch_result_page(handle="res_missing", ctx=mock_context))
+    assert result["error"]["error_type"] == "result_not_found"
+    
+    result = json.loads(await fetch_result_page(handle=handle, ctx=mock_context, columns=["nope"]))
+    assert result["error"]["error_type"] == "invalid_parameter"
+    assert "nope" in result["error"]["message"]
+    
+    result = json.loads(await fetch_result_page(handle=handle, ctx=mock_context, limit=0))
+    assert result["error"]["status_code"] == 400
+
+
+@pytest.mark.asyncio
+async def test_run_dataset_query_uses_cache(mock_context):
+    """Test that repeated queries are served from the cache unless opted out."""
+    query_result = {
+        "data": {"rows": [[1]], "cols": [{"name": "one"}], "native_form": {}},
+        "status": "completed",
+        "row_count": 1
+    }
+    auth_mock = MagicMock()
+    auth_mock.make_request = AsyncMock(return_value=(query_result, 200, None))
+    client_mock = MagicMock()
+    client_mock.auth = auth_mock
+    
+    with patch("talk_to_metabase.tools.dataset.get_metabase_client", return_value=client_mock):
+        first = json.loads(await run_dataset_query(database=1, native={"query": "select 1"}, ctx=mock_context))
+        second = json.loads(await run_dataset_query(database=1, native={"query": " select\n1 ;"}, ctx=mock_context))
+        fresh = json.loads(await run_dataset_query(
+            database=1, native={"query": "select 1"}, ctx=mock_context, use_cache=False
+        ))
+    
+    assert first["cache"] == {"hit": False, "cached": True}
+    assert second["cache"]["hit"] is True
+    assert second["cache"]["age_seconds"] >= 0
+    assert second["data"]["rows"] == [[1]]
+    assert fresh["cache"]["hit"] is False
+    assert auth_mock.make_request.call_count == 2
+    # The cached result itself is not annotated
+    query_cache = mock_context.request_context.lifespan_context.query_cache
+    assert all("cache" not in value for value, _, _ in query_cache.entries.values())
+
+
+@pytest.mark.asyncio
+async def test_run_dataset_query_does_not_cache_failures(mock_context):
+    """Test that failed queries are not cached."""
+    query_result = {"data": {"rows": [], "cols": []}, "status": "failed", "error": "boom"}
+    auth_mock = MagicMock()
+    auth_mock.make_request = AsyncMock(return_value=(query_result, 202, None))
+    client_mock = MagicMock()
+    client_mock.auth = auth_mock
+    
+    with patch("talk_to_metabase.tools.dataset.get_metabase_client", return_value=client_mock):
+        for _ in range(2):
+            result = json.loads(await run_dataset_query(database=1, native={"query": "select x"}, ctx=mock_context))
+            assert result["cache"] == {"hit": False, "cached": False}
+    
+    assert auth_mock.make_request.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_run_dataset_query_limits_rows(mock_context):
+    """Test that max_rows is sent as query constraints and truncation is reported."""
+    rows = [[i] for i in range(6)]
+    query_result = {
+        "data": {"rows": rows, "cols": [{"name": "id"}], "native_form": {}},
+        "status": "completed",
+        "row_count": 6
+    }
+    client_mock = MagicMock()
+    client_mock.auth.make_request = AsyncMock(return_value=(query_result, 202, None))
+    
+    with patch("talk_to_metabase.tools.dataset.get_metabase_client", return_value=client_mock):
+        limited = json.loads(await run_dataset_query(
+            database=1, query={"source-table": 2}, type="query", ctx=mock_context, max_rows=5
+        ))
+        complete = json.loads(await run_dataset_query(
+            database=1, query={"source-table": 2}, type="query", ctx=mock_context, max_rows=10
+        ))
+    
+    payload = client_mock.auth.make_request.call_args_list[0][1]["json"]
+    assert payload["constraints"] == {"max-results": 6, "max-results-bare-rows": 6}
+    assert limited["truncated"] is True
+    assert limited["data"]["rows"] == rows[:5]
+    assert limited["row_count"] == 5
+    assert limited["max_rows"] == 5
+    
+    # A different limit is a different cache entry
+    assert client_mock.auth.make_request.call_count == 2
+    assert complete["truncated"] is False
+    assert complete["data"]["rows"] == rows
+
+
+@pytest.mark.asyncio
+async def test_run_dataset_query_default_row_limit(mock_context):
+    """Test the configured default row limit and opting out of it."""
+    mock_context.request_context.lifespan_context.auth.config.dataset_max_rows = 50
+    query_result = {"data": {"rows": [], "cols": []}, "status": "completed"}
+    client_mock = MagicMock()
+    client_mock.auth.make_request = AsyncMock(return_value=(query_result, 202, None))
+    
+    with patch("talk_to_metabase.tools.dataset.get_metabase_client", return_value=client_mock):
+        await run_dataset_query(database=1, native={"query": "select 1"}, ctx=mock_context)
+        unlimited = json.loads(await run_dataset_query(
+            database=1, native={"query": "select 2"}, ctx=mock_context, max_rows=0
+        ))
+        invalid = json.loads(await run_dataset_query(
+            database=1, native={"query": "select 3"}, ctx=mock_context, max_rows=-1
+        ))
+    
+    first, second = client_mock.auth.make_request.call_args_list
+    assert first[1]["json"]["constraints"]["max-results"] == 51
+    assert "constraints" not in second[1]["json"]
+    assert unlimited["max_rows"] is None
+    assert invalid["error"]["error_type"] == "invalid_parameter"
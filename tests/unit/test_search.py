@@ -286,4 +286,27 @@ async def test_search_resources_pagination(mock_context, sample_search_results_p
         # Check last page
         assert result_data5["pagination"]["page"] == 5
         assert result_data5["pagination"]["has_more"] == False
-        assert len(result_data5["results"]) == 20
\ No newline at end of file
+        assert len(result_data5["results"]) == 20
+
+@pytest.mark.asyncio
+async def test_search_resources_cursor(mock_context, sample_search_results_paginated):
+    """Test that next_cursor fetches the next page of the same search."""
+    mock_context.request_context.lifespan_context.auth.make_request = AsyncMock(
+        return_value=({"data": sample_search_results_paginated}, 200, None)
+    )
+    
+    first = json.loads(await search_resources(ctx=mock_context, q="test", models=["card"], page_size=40))
+    cursor = first["pagination"]["next_cursor"]
+    second = json.loads(await search_resources(ctx=mock_context, cursor=cursor))
+    third = json.loads(await search_resources(ctx=mock_context, cursor=second["pagination"]["next_cursor"]))
+    
+    assert [item["id"] for item in first["results"] + second["results"] + third["results"]] == list(range(1, 101))
+    assert third["pagination"]["has_more"] is False
+    assert "next_cursor" not in third["pagination"]
+    # Pages after the first come from the cached result list
+    assert mock_context.request_context.lifespan_context.auth.make_request.call_count == 1
+    params = mock_context.request_context.lifespan_context.auth.make_request.call_args[1]["params"]
+    assert params["q"] == "test"
+    
+    invalid = json.loads(await search_resources(ctx=mock_context, cursor="not-a-cursor"))
+    assert invalid["error"]["error_type"] == "invalid_parameter"
@@ -0,0 +1,147 @@
+"""
+Tests for the local full-text search index.
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from talk_to_metabase.search_index import MetabaseSearchIndex, SearchIndex, tokenize
+from talk_to_metabase.server import MetabaseContext
+from talk_to_metabase.tools.search import search_local
+
+
+def test_tokenize_splits_names():
+    """Test that camelCase and snake_case names are split into lowercase terms."""
+    assert tokenize("totalRevenue by_customer_ID") == ["total", "revenue", "by", "customer", "id"]
+    assert tokenize(None) == []
+
+
+def test_search_ranks_name_matches_first():
+    """Test BM25 ranking and the higher weight of names."""
+    index = SearchIndex()
+    index.add(("card", 1), {"id": 1, "model": "card"}, "Monthly revenue", ["Revenue per month"])
+    index.add(("card", 2), {"id": 2, "model": "card"}, "Orders", ["Includes revenue of returns"])
+    index.add(("dashboard", 3), {"id": 3, "model": "dashboard"}, "Customers", ["Churn overview"])
+
+    ranked = index.search("revenue")
+    assert [result["id"] for _, result in ranked] == [1, 2]
+    assert ranked[0][0] > ranked[1][0]
+
+    assert index.search("revenue", models=["dashboard"]) == []
+    assert index.search("nothing matches") == []
+
+
+def test_remove_drops_postings():
+    """Test that removed documents no longer match."""
+    index = SearchIndex()
+    index.add(("card", 1), {"id": 1, "model": "card"}, "Revenue", [])
+    index.remove(("card", 1))
+
+    assert index.search("revenue") == []
+    assert index.postings == {}
+    assert index.total_length == 0
+
+
+def _metabase_responses(cards):
+    """Return a make_request side effect serving the bulk endpoints."""
+    responses = {
+        "card": cards,
+        "dashboard": [{"id": 10, "name": "Sales Overview", "updated_at": "2024-01-01"}],
+        "collection": [{"id": "root", "name": "Our analytics"}, {"id": 5, "name": "Finance"}],
+        "database": {"data": [{"id": 1, "name": "Warehouse", "updated_at": "2024-01-01"}]},
+        "database/1/metadata": {
+            "tables": [{
+                "id": 100,
+                "name": "orders",
+                "schema": "public",
+                "fields": [{"id": 1000, "name": "discount_amount", "display_name": "Discount Amount"}]
+            }]
+        },
+    }
+
+    async def make_request(method, path, **kwargs):
+        return responses[path], 200, None
+
+    return make_request
+
+
+@pytest.mark.asyncio
+async def test_refresh_indexes_content_incrementally():
+    """Test that a refresh only re-indexes edited items and drops deleted ones."""
+    cards = [
+        {"id": 1, "name": "Revenue", "type": "question", "last_edited_at": "2024-01-01",
+         "dataset_query": {"database": 1, "native": {"query": "SELECT SUM(amount) FROM payments"}}},
+        {"id": 2, "name": "Customers", "type": "model", "last_edited_at": "2024-01-01"},
+    ]
+    auth = MagicMock()
+    auth.make_request = AsyncMock(side_effect=_metabase_responses(cards))
+    index = MetabaseSearchIndex(refresh_interval=300)
+
+    await index.ensure_fresh(auth)
+
+    assert index.snapshot()["by_model"] == {"card": 2, "dashboard": 1, "collection": 1, "table": 1, "field": 1}
+    assert index.search("payments")[0][1]["id"] == 1
+    assert index.search("customers")[0][1]["model"] == "dataset"
+    assert index.search("discount")[0][1]["model"] == "field"
+    assert index.documents_updated == 6
+
+    # Fresh indexes are not refreshed again
+    await index.ensure_fresh(auth)
+    assert index.refreshes == 1
+
+    # One card edited and one deleted: only the edited card is re-indexed
+    cards[0] = {**cards[0], "name": "Gross revenue", "last_edited_at": "2024-02-01"}
+    del cards[1]
+    index.mark_stale("PUT", "card/1")
+    metadata_calls = sum(1 for call in auth.make_request.await_args_list if call.args[1] == "database/1/metadata")
+    await index.ensure_fresh(auth)
+
+    assert index.refreshes == 2
+    # The edited card, plus the collection, which has no edit time to compare
+    assert index.documents_updated == 8
+    assert index.search("customers") == []
+    assert index.search("gross")[0][1]["name"] == "Gross revenue"
+    # Database metadata is only pulled again when the database changed
+    assert sum(1 for call in auth.make_request.await_args_list if call.args[1] == "database/1/metadata") == metadata_calls
+
+
+@pytest.mark.asyncio
+async def test_refresh_failure_keeps_index_stale():
+    """Test that a failed bulk pull raises and leaves the index stale."""
+    auth = MagicMock()
+    auth.make_request = AsyncMock(return_value=(None, 500, "Server error"))
+    index = MetabaseSearchIndex(refresh_interval=300)
+
+    with pytest.raises(ValueError):
+        await index.refresh(auth)
+    assert index.stale
+
+
+@pytest.mark.asyncio
+async def test_search_local_disabled(mock_context):
+    """Test that search_local reports a disabled index."""
+    result = json.loads(await search_local(q="revenue", ctx=mock_context))
+
+    assert result["error"]["error_type"] == "search_index_disabled"
+
+
+@pytest.mark.asyncio
+async def test_search_local_returns_ranked_results(mock_auth):
+    """Test that search_local pages results in the search_resources shape."""
+    mock_auth.config.search_index_enabled = True
+    mock_auth.make_request = AsyncMock(side_effect=_metabase_responses(
+        [{"id": 1, "name": "Sales by region", "last_edited_at": "2024-01-01"}]
+    ))
+    ctx = MagicMock()
+    ctx.request_context.lifespan_context = MetabaseContext(auth=mock_auth)
+
+    result = json.loads(await search_local(q="sales", ctx=ctx, page_size=1))
+
+    assert {item["model"] for item in result["results"]} <= {"card", "dashboard"}
+    assert result["results"][0]["score"] > 0
+    assert result["pagination"] == {
+        "page": 1, "page_size": 1, "total_count": 2, "total_pages": 2, "has_more": True
+    }
+    assert result["index"]["documents"] == 5
@@ -0,0 +1,53 @@
+"""
+Tests for the server lifespan.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from talk_to_metabase.auth import MetabaseAuth
+from talk_to_metabase.config import MetabaseConfig
+from talk_to_metabase.server import MetabaseContext, metabase_lifespan
+
+
+@pytest.mark.asyncio
+async def test_lifespan_skips_login_with_api_key():
+    """Test that no startup login happens in API-key mode."""
+    config = MetabaseConfig(
+        url="https://test-metabase.example.com/",
+        username="",
+        password="",
+        api_key="mb_test_api_key"
+    )
+    
+    with patch("talk_to_metabase.server.MetabaseConfig.from_env", return_value=config), \
+         patch.object(MetabaseAuth, "authenticate", new=AsyncMock(return_value=True)) as mock_authenticate:
+        async with metabase_lifespan(None) as metabase_ctx:
+            assert metabase_ctx.auth.uses_api_key is True
+        
+        mock_authenticate.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_logs_in_with_credentials(config):
+    """Test that a session is opened on startup with username/password."""
+    with patch("talk_to_metabase.server.MetabaseConfig.from_env", return_value=config), \
+         patch.object(MetabaseAuth, "authenticate", new=AsyncMock(return_value=True)) as mock_authenticate:
+        async with metabase_lifespan(None):
+            pass
+        
+        mock_authenticate.assert_awaited_once()
+
+
+def test_writes_invalidate_content_caches(config):
+    """Test that successful writes clear the search cache and the written dashboard."""
+    metabase_ctx = MetabaseContext(auth=MetabaseAuth(config))
+    metabase_ctx.search_cache.put("search", [{"id": 1}])
+    metabase_ctx.dashboards.put(1, {"id": 1, "updated_at": "t"}, lambda data: {})
+    metabase_ctx.dashboards.put(2, {"id": 2, "updated_at": "t"}, lambda data: {})
+    
+    metabase_ctx.auth._notify_write("PUT", "dashboard/1")
+    
+    assert metabase_ctx.search_cache.entries == {}
+    assert list(metabase_ctx.dashboards.entries) == [2]
@@ -0,0 +1,97 @@
+"""
+Tests for the on-disk session cache.
+"""
+
+import os
+import stat
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from talk_to_metabase.auth import MetabaseAuth
+from talk_to_metabase.session_cache import SessionCache
+
+
+def test_save_and_load(tmp_path):
+    """Test round-tripping a session token."""
+    cache = SessionCache(str(tmp_path / "sessions.json"))
+    
+    assert cache.load("https://mb.example.com/", "user@example.com") is None
+    
+    cache.save("https://mb.example.com/", "user@example.com", "token-1")
+    token, created_at = cache.load("https://mb.example.com", "user@example.com")
+    
+    assert token == "token-1"
+    assert abs(created_at - time.time()) < 5
+    # Entries are scoped to URL and username
+    assert cache.load("https://mb.example.com/", "other@example.com") is None
+    assert cache.load("https://other.example.com/", "user@example.com") is None
+
+
+def test_cache_file_permissions(tmp_path):
+    """Test that the cache file and directory are private to the user."""
+    path = tmp_path / "nested" / "sessions.json"
+    SessionCache(str(path)).save("https://mb.example.com/", "user@example.com", "token-1")
+    
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(path.parent).st_mode) == 0o700
+    # Neither the URL nor the username is written in clear text
+    content = path.read_text()
+    assert "user@example.com" not in content
+    assert "mb.example.com" not in content
+
+
+def test_discard_and_corrupt_file(tmp_path):
+    """Test discarding entries and ignoring unreadable cache files."""
+    path = tmp_path / "sessions.json"
+    cache = SessionCache(str(path))
+    cache.save("https://mb.example.com/", "user@example.com", "token-1")
+    cache.discard("https://mb.example.com/", "user@example.com")
+    assert cache.load("https://mb.example.com/", "user@example.com") is None
+    
+    path.write_text("not json")
+    assert cache.load("https://mb.example.com/", "user@example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_auth_reuses_cached_session(config, tmp_path):
+    """Test that a new process reuses the token saved by a previous login."""
+    config.session_cache_enabled = True
+    config.session_cache_path = str(tmp_path / "sessions.json")
+    
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"id": "persisted-token"}
+    
+    with patch("httpx.AsyncClient.post", return_value=mock_response):
+        first = MetabaseAuth(config)
+        assert await first.authenticate() is True
+    
+    config.session_token = None
+    with patch("httpx.AsyncClient.post") as mock_post, \
+         patch("httpx.AsyncClient.get") as mock_get:
+        second = MetabaseAuth(config)
+        
+        assert second.session_token == "persisted-token"
+        assert second.client.headers.get("X-Metabase-Session") == "persisted-token"
+        # Recently created, so trusted without a validation round-trip
+        assert await second.ensure_authenticated() is True
+        mock_post.assert_not_called()
+        mock_get.assert_not_called()
+
+
+def test_auth_validates_old_cached_session(config, tmp_path):
+    """Test that a cached token older than the max age is validated on first use."""
+    config.session_cache_enabled = True
+    config.session_cache_path = str(tmp_path / "sessions.json")
+    config.session_max_age = 60
+    
+    cache = SessionCache(config.session_cache_path)
+    cache.save(config.url, config.username, "old-token")
+    
+    with patch("time.time", return_value=time.time() + 3600):
+        auth = MetabaseAuth(config)
+    
+    assert auth.session_token == "old-token"
+    assert auth.is_session_fresh() is False
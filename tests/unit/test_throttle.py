@@ -0,0 +1,157 @@
+"""
+Tests for client-side rate limiting and concurrency caps.
+"""
+
+import asyncio
+
+import pytest
+
+from talk_to_metabase.throttle import PriorityLanes, Throttle, TokenBucket
+
+
+def test_token_bucket_burst_then_rate():
+    """Test that the bucket allows a burst and then spaces requests out."""
+    bucket = TokenBucket(rate=10.0, burst=2)
+    
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # The third request has to wait for a refill (1 token per 0.1s)
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_unlimited_throttle_does_not_track():
+    """Test that a throttle without limits is a no-op."""
+    throttle = Throttle()
+    
+    async with throttle.slot("query"):
+        pass
+    
+    assert throttle.snapshot()["families"] == {}
+
+
+@pytest.mark.asyncio
+async def test_global_concurrency_cap():
+    """Test that no more than the global cap run at once and queueing is visible."""
+    throttle = Throttle(max_concurrency=2)
+    running = 0
+    peak = 0
+    
+    async def request(family):
+        nonlocal running, peak
+        async with throttle.slot(family):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+    
+    await asyncio.gather(*(request("metadata") for _ in range(4)), request("query"))
+    
+    assert peak == 2
+    stats = throttle.snapshot()["families"]
+    assert stats["metadata"]["max_queued"] >= 2
+    assert stats["metadata"]["delayed_requests"] >= 2
+    assert stats["metadata"]["queued"] == 0
+    assert stats["metadata"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_family_concurrency_cap():
+    """Test that a family cap only limits that family."""
+    throttle = Throttle(family_concurrency={"query": 1})
+    running = {"query": 0, "metadata": 0}
+    peak = {"query": 0, "metadata": 0}
+    
+    async def request(family):
+        async with throttle.slot(family):
+            running[family] += 1
+            peak[family] = max(peak[family], running[family])
+            await asyncio.sleep(0.01)
+            running[family] -= 1
+    
+    await asyncio.gather(*(request("query") for _ in range(3)), *(request("metadata") for _ in range(3)))
+    
+    assert peak["query"] == 1
+    assert peak["metadata"] == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_wait_releases_slots():
+    """Test that a request cancelled while queued does not leak a slot."""
+    throttle = Throttle(max_concurrency=1)
+    
+    async with throttle.slot("query"):
+        waiter = asyncio.create_task(throttle.slot("query").__aenter__())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+    
+    # The slot is free again
+    await asyncio.wait_for(throttle.slot("query").__aenter__(), timeout=0.1)
+    assert throttle.snapshot()["families"]["query"]["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_reserved_lane_capacity_with_saturated_queries():
+    """Test that metadata calls get a reserved slot while queries fill the shared pool."""
+    throttle = Throttle(max_concurrency=3, lane_reservations={"interactive": 1, "write": 0, "query": 0})
+    release_queries = asyncio.Event()
+    
+    async def query():
+        async with throttle.slot("query"):
+            await release_queries.wait()
+    
+    queries = [asyncio.create_task(query()) for _ in range(4)]
+    await asyncio.sleep(0)
+    
+    lanes = throttle.snapshot()["lanes"]
+    assert lanes["shared_in_use"] == 2
+    assert lanes["lanes"]["query"]["waiting"] == 2
+    
+    # The interactive lane is admitted immediately despite queued queries
+    lookup = throttle.slot("metadata")
+    await asyncio.wait_for(lookup.__aenter__(), timeout=0.1)
+    assert throttle.snapshot()["lanes"]["lanes"]["interactive"]["reserved_in_use"] == 1
+    
+    release_queries.set()
+    await asyncio.gather(*queries)
+    await lookup.__aexit__(None, None, None)
+
+
+@pytest.mark.asyncio
+async def test_waiting_lanes_admitted_in_priority_order():
+    """Test that a freed shared slot goes to the highest-priority waiting lane."""
+    lanes = PriorityLanes(capacity=1, reservations={})
+    order = []
+    
+    async def request(lane):
+        shared = await lanes.acquire(lane)
+        order.append(lane)
+        lanes.release(lane, shared)
+    
+    first = await lanes.acquire("query")
+    waiting = [asyncio.create_task(request(lane)) for lane in ("query", "write", "interactive")]
+    await asyncio.sleep(0)
+    
+    lanes.release("query", first)
+    await asyncio.gather(*waiting)
+    
+    assert order == ["interactive", "write", "query"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_lane_waiter_is_removed():
+    """Test that a cancelled lane waiter does not hold a slot or block the queue."""
+    throttle = Throttle(max_concurrency=1, lane_reservations={"query": 1})
+    
+    async with throttle.slot("query"):
+        waiter = asyncio.create_task(throttle.slot("query").__aenter__())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert throttle.snapshot()["lanes"]["lanes"]["query"]["waiting"] == 0
+    
+    await asyncio.wait_for(throttle.slot("query").__aenter__(), timeout=0.1)